@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark end-to-end book lookups of fetch-toc.py against the stand-in server.
+
+Writes synthetic fixtures for --books books (LitRes XML with a long tail
+after </toc>, Open Library editions, Google Books volumes; every other
+book is missing from LitRes, so the lookup falls through to Open
+Library), starts bookserver.py with the given latency, errors and
+redirects, and times `--info` and TOC lookups for every book:
+    sequential / concurrent    --sequential vs the default race
+    cold / cached              empty HTTP cache vs one filled by a
+                               previous pass (fresh entries, no requests)
+
+Each row reports the mean and p95 lookup time and the requests that
+reached the server. Nothing leaves 127.0.0.1.
+
+Usage:
+    python benchmarks/bench_fetch_toc.py [--books N] [--latency MS] [--jitter MS]
+                                         [--error-rate F] [--redirect-rate F]
+                                         [--seed N]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from bookserver import start_server
+from common import load_script
+
+fetch_toc = load_script('plugins/books/skills/extracting-book-toc/scripts/fetch-toc.py')
+import bookhttp  # noqa: E402  (importable once the script's directory is on sys.path)
+
+WORDS = ('глубокая', 'работа', 'привычки', 'внимание', 'система', 'фокус', 'время', 'решения', 'энергия')
+
+
+def litres_xml(rng: random.Random, title: str, chapters: int) -> bytes:
+    items = [f'<toc-item deep="0" id="0">Автор {rng.randint(1, 99)}. {title}</toc-item>']
+    position = 0
+    for number in range(1, chapters + 1):
+        position += rng.randint(500, 5000)
+        items.append(f'<toc-item id="{position}" deep="1">Глава {number}. {rng.choice(WORDS)} &amp; '
+                     f'{rng.choice(WORDS)}</toc-item>')
+    tail = ''.join(f'<p>{rng.choice(WORDS)}</p>' for _ in range(20000))  # annotation, reviews, ...
+    return (f'<?xml version="1.0" encoding="utf-8"?><book><toc>{"".join(items)}</toc>'
+            f'<annotation>{tail}</annotation></book>').encode('utf-8')
+
+
+def generate_fixtures(directory: Path, books: int, seed: int) -> list:
+    """Write fixtures for `books` books; return their queries (isbn, litres_id)."""
+    rng = random.Random(seed)
+    store = bookhttp.FixtureStore(directory)
+    json_type = {'Content-Type': 'application/json'}
+    queries = []
+    for number in range(books):
+        isbn = f'978{rng.randrange(10 ** 9, 10 ** 10)}'
+        litres_id = str(10_000_000 + number * 7919)
+        title = f'{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)} {number}'
+        chapters = [f'Глава {i}. {rng.choice(WORDS)}' for i in range(1, rng.randint(10, 40))]
+
+        litres_url = f'https://cv{litres_id[-2]}.litres.ru/pub/c/cover/{litres_id}.xml'
+        if number % 2 == 0:
+            store.put(litres_url, 200, litres_xml(rng, title, len(chapters)),
+                      {'Content-Type': 'application/xml', 'ETag': f'"{litres_id}"'})
+        else:
+            store.put(litres_url, 404)
+        store.put(f'https://openlibrary.org/isbn/{isbn}.json', 200,
+                  json.dumps({'title': title, 'table_of_contents': [{'title': c} for c in chapters]}).encode(),
+                  json_type)
+        volume = {'title': title, 'authors': [f'Автор {number}'], 'pageCount': rng.randint(150, 600),
+                  'previewLink': f'https://books.google.com/books?id={number}',
+                  'industryIdentifiers': [{'type': 'ISBN_13', 'identifier': isbn}]}
+        store.put(f'https://www.googleapis.com/books/v1/volumes?q=isbn:{isbn}', 200,
+                  json.dumps({'totalItems': 1, 'items': [{'volumeInfo': volume}]}).encode(), json_type)
+        queries.append((isbn, litres_id))
+    return queries
+
+
+def run_pass(server, queries: list, mode: str, sequential: bool, cache_dir: Path) -> tuple:
+    """Look up every book once; return (per-lookup seconds, sources, server requests)."""
+    fetch_toc.CLIENT = bookhttp.StandInClient(fetch_toc.HttpClient(fetch_toc.HEADERS), server.url)
+    fetch_toc.CACHE = bookhttp.HttpCache(cache_dir)
+    requests_before = server.stats['requests']
+    times, sources = [], []
+    for isbn, litres_id in queries:
+        lookups = (fetch_toc.info_lookups(isbn, None, litres_id) if mode == 'info'
+                   else fetch_toc.toc_lookups(isbn, None, litres_id))
+        start = time.perf_counter()
+        source, _ = fetch_toc.first_found(lookups, fetch_toc.DEFAULT_DEADLINE, sequential)
+        times.append(time.perf_counter() - start)
+        sources.append(source)
+    fetch_toc.CLIENT.close()
+    return times, sources, server.stats['requests'] - requests_before
+
+
+def p95(times: list) -> float:
+    return sorted(times)[max(0, round(len(times) * 0.95) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark fetch-toc.py lookups against a local stand-in server')
+    parser.add_argument('--books', type=int, default=20, help='Books to look up (default: 20)')
+    parser.add_argument('--latency', type=float, default=50, help='Server delay per request, ms (default: 50)')
+    parser.add_argument('--jitter', type=float, default=20, help='Extra random delay up to N ms (default: 20)')
+    parser.add_argument('--error-rate', type=float, default=0, help='Share of requests answered 503 (default: 0)')
+    parser.add_argument('--redirect-rate', type=float, default=0.1,
+                        help='Share of requests bounced through a 302 (default: 0.1)')
+    parser.add_argument('--seed', type=int, default=1, help='Fixture and server seed (default: 1)')
+    args = parser.parse_args()
+
+    fetch_toc.VERBOSE = False
+    fetch_toc.BREAKER = None  # injected errors must not take a source out of later passes
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queries = generate_fixtures(Path(tmp) / 'fixtures', args.books, args.seed)
+        server = start_server(bookhttp.FixtureStore(Path(tmp) / 'fixtures'), latency=args.latency / 1000,
+                              jitter=args.jitter / 1000, error_rate=args.error_rate,
+                              redirect_rate=args.redirect_rate, seed=args.seed)
+        print(f'books={args.books}, latency={args.latency:g}ms, jitter={args.jitter:g}ms, '
+              f'error_rate={args.error_rate:g}, redirect_rate={args.redirect_rate:g}')
+        print(f'{"lookup":<8}{"order":<12}{"cache":<8}{"mean, s":>10}{"p95, s":>10}{"total, s":>10}{"requests":>10}')
+
+        # fetch-toc reports failed requests on stderr; injected errors would flood the table
+        with contextlib.redirect_stderr(io.StringIO()):
+            for mode in ('info', 'toc'):
+                found = {}
+                for order, sequential in (('sequential', True), ('concurrent', False)):
+                    cache_dir = Path(tmp) / f'cache-{mode}-{order}'
+                    for cache in ('cold', 'cached'):
+                        times, sources, requests = run_pass(server, queries, mode, sequential, cache_dir)
+                        if not args.error_rate:
+                            # both orders must pick the same source for every book
+                            assert found.setdefault(cache, sources) == sources, (mode, order, cache)
+                        print(f'{mode:<8}{order:<12}{cache:<8}{statistics.mean(times):>10.4f}'
+                              f'{p95(times):>10.4f}{sum(times):>10.3f}{requests:>10}')
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
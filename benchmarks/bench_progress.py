@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark the ## Прогресс parser and progress rollup of calculate-progress.py.
+
+Compares the current single-pass tokenizer + tree rollup with the
+previous implementation (DOTALL section regex, per-line re.match with two
+re.search/re.sub per item, several passes in calculate_progress) on
+nested tables of contents of weight, page and plain-chapter books.
+
+Usage:
+    python benchmarks/bench_progress.py [--items N] [--repeat N]
+"""
+
+import argparse
+import random
+import re
+
+from common import best_of, load_script
+from vaultgen import book_note
+
+calculate_progress = load_script('plugins/books/skills/extracting-book-toc/scripts/calculate-progress.py')
+ProgressItem = calculate_progress.ProgressItem
+
+
+def legacy_parse_progress_section(content: str) -> list:
+    """The parser as it was before the single-pass rewrite, for reference."""
+    items = []
+    progress_match = re.search(r'## Прогресс\s*\n(.*?)(?=\n## |\Z)', content, re.DOTALL)
+    if not progress_match:
+        return items
+    for line in progress_match.group(1).split('\n'):
+        match = re.match(r'^(\s*)-\s*\[([ xX])\]\s*(.+)$', line)
+        if not match:
+            continue
+        title_part = match.group(3).strip()
+        weight = None
+        weight_match = re.search(r'\[w:(\d+)\]', title_part)
+        if weight_match:
+            weight = int(weight_match.group(1))
+            title_part = re.sub(r'\s*\[w:\d+\]', '', title_part)
+        pages_start = pages_end = None
+        pages_match = re.search(r'\[(\d+)-(\d+)\]', title_part)
+        if pages_match:
+            pages_start, pages_end = int(pages_match.group(1)), int(pages_match.group(2))
+            title_part = re.sub(r'\s*\[\d+-\d+\]', '', title_part)
+        items.append(ProgressItem(title_part.strip(), match.group(2).lower() == 'x',
+                                  weight, pages_start, pages_end, len(match.group(1))))
+    return items
+
+
+def legacy_calculate_progress(items: list, total_pages: int = None) -> dict:
+    """Flat multi-pass calculation without per-part progress, for reference."""
+    total_items = len(items)
+    completed_items = sum(1 for item in items if item.completed)
+    result = {'progress': round(completed_items / total_items * 100, 1), 'method': 'items'}
+    items_with_weight = [item for item in items if item.weight is not None]
+    if items_with_weight:
+        total_weight = sum(item.weight for item in items_with_weight)
+        completed_weight = sum(item.weight for item in items_with_weight if item.completed)
+        if total_weight > 0:
+            result.update(progress=round(completed_weight / total_weight * 100, 1), method='weight')
+    items_with_pages = [item for item in items if item.pages_start is not None]
+    if items_with_pages:
+        completed_pages = sum(
+            item.pages_end - item.pages_start + 1 for item in items_with_pages if item.completed
+        )
+        total = total_pages or max(item.pages_end for item in items_with_pages)
+        result.update(progress=round(completed_pages / total * 100, 1), method='pages')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the progress parser')
+    parser.add_argument('--items', type=int, default=5000, help='ToC entries per book (default: 5000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing repetitions (default: 5)')
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    print(f'{"book":<10}{"items":>8}{"parts":>7}{"legacy, s":>12}{"current, s":>12}{"speedup":>10}')
+    for method in ('weight', 'pages', 'items'):
+        content = book_note(rng, args.items, method)
+        total = calculate_progress.get_total_pages(content)
+
+        def legacy():
+            return legacy_calculate_progress(legacy_parse_progress_section(content), total)
+
+        def current():
+            return calculate_progress.calculate_progress(calculate_progress.parse_progress_section(content), total)
+
+        result = current()
+        assert result['progress'] == legacy()['progress'], method
+        legacy_time = best_of(legacy, args.repeat)
+        current_time = best_of(current, args.repeat)
+        print(f'{method:<10}{result["total_items"]:>8}{len(result.get("parts", [])):>7}'
+              f'{legacy_time:>12.4f}{current_time:>12.4f}{legacy_time / current_time:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
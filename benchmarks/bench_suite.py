@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Day and Books scripts on a synthetic vault.
+
+Generates a vault with vaultgen.py (or reuses --vault) and measures, for
+each target:
+    cold    first call in a fresh interpreter; for load_tasks also
+            without an on-disk index
+    warm    best of --repeat calls in an already warmed-up process
+    peak    peak Python heap during one call (tracemalloc)
+
+Targets: collect_tasks, filter_tasks (all five filters), load_tasks
+(through the SQLite index), forecast (a quarter by day and by week from
+the query index), parse_progress_section and calculate_progress (over
+every book note).
+
+With --save-baseline FILE the results are written as JSON; with
+--baseline FILE they are compared against it and the script exits 1 when
+a warm time or peak memory grew by more than --tolerance, so it can be
+used as a regression gate.
+
+Usage:
+    python benchmarks/bench_suite.py [--vault DIR] [--notes N] [--book-items N]
+                                     [--repeat N] [--only NAMES] [--json]
+                                     [--save-baseline FILE]
+                                     [--baseline FILE] [--tolerance F]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+
+from common import best_of, load_script
+from vaultgen import ANCHOR_DATE, generate_vault
+
+parse_tasks = load_script('plugins/day/scripts/parse-tasks.py')
+calculate_progress = load_script('plugins/books/skills/extracting-book-toc/scripts/calculate-progress.py')
+
+
+def book_contents(vault: Path) -> list:
+    return [path.read_text(encoding='utf-8') for path in sorted((vault / 'Base' / 'Books').glob('*.md'))]
+
+
+def setup_collect_tasks(vault: Path, cold: bool):
+    return lambda: parse_tasks.collect_tasks(vault)
+
+
+def setup_filter_tasks(vault: Path, cold: bool):
+    tasks = parse_tasks.collect_tasks(vault)
+    return lambda: [parse_tasks.filter_tasks(tasks, name) for name in parse_tasks.FILTERS]
+
+
+def setup_load_tasks(vault: Path, cold: bool):
+    index_path = vault / parse_tasks.INDEX_FILE
+    if cold:
+        index_path.unlink(missing_ok=True)
+    else:
+        parse_tasks.load_tasks(vault)  # make sure the index is built and current
+    return lambda: parse_tasks.load_tasks(vault)
+
+
+def setup_forecast(vault: Path, cold: bool):
+    index = parse_tasks.TaskQueryIndex(parse_tasks.collect_tasks(vault))
+    start, end = ANCHOR_DATE.isoformat(), (ANCHOR_DATE + timedelta(days=90)).isoformat()
+    return lambda: [index.forecast(start, end, by) for by in parse_tasks.FORECAST_PERIODS]
+
+
+def setup_parse_progress_section(vault: Path, cold: bool):
+    contents = book_contents(vault)
+    return lambda: [calculate_progress.parse_progress_section(content) for content in contents]
+
+
+def setup_calculate_progress(vault: Path, cold: bool):
+    books = [
+        (calculate_progress.parse_progress_section(content), calculate_progress.get_total_pages(content))
+        for content in book_contents(vault)
+    ]
+    return lambda: [calculate_progress.calculate_progress(items, total) for items, total in books]
+
+
+TARGETS = {
+    'collect_tasks': setup_collect_tasks,
+    'filter_tasks': setup_filter_tasks,
+    'load_tasks': setup_load_tasks,
+    'forecast': setup_forecast,
+    'parse_progress_section': setup_parse_progress_section,
+    'calculate_progress': setup_calculate_progress,
+}
+
+
+def time_once(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def measure_cold(vault: Path, name: str) -> float:
+    """Time the first call of a target in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, __file__, '--vault', str(vault), '--cold-run', name],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)['seconds']
+
+
+def measure_peak(func) -> int:
+    """Peak traced heap during one call, in KiB."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+
+
+def run_suite(vault: Path, names: list, repeat: int) -> dict:
+    results = {}
+    for name in names:
+        cold = measure_cold(vault, name)
+        func = TARGETS[name](vault, cold=False)
+        func()  # warm-up
+        results[name] = {
+            'cold_s': round(cold, 4),
+            'warm_s': round(best_of(func, repeat), 4),
+            'peak_kib': measure_peak(func),
+        }
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Return human-readable regressions against a saved baseline."""
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get('results', {}).get(name)
+        if not before:
+            continue
+        for metric in ('warm_s', 'peak_kib'):
+            if before.get(metric) and current[metric] > before[metric] * (1 + tolerance):
+                regressions.append(
+                    f'{name}: {metric} {before[metric]} -> {current[metric]} '
+                    f'(+{(current[metric] / before[metric] - 1) * 100:.0f}%)'
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the vault scripts on a synthetic vault')
+    parser.add_argument('--vault', type=str, help='Existing vault to use instead of generating one')
+    parser.add_argument('--notes', type=int, default=2000, help='Notes in the generated vault (default: 2000)')
+    parser.add_argument('--book-items', type=int, default=2000, help='## Прогресс items per book (default: 2000)')
+    parser.add_argument('--seed', type=int, default=1, help='Generator seed (default: 1)')
+    parser.add_argument('--repeat', type=int, default=5, help='Warm timing repetitions (default: 5)')
+    parser.add_argument('--only', type=str, help=f'Comma-separated targets: {",".join(TARGETS)}')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    parser.add_argument('--save-baseline', type=str, metavar='FILE', help='Write results to FILE')
+    parser.add_argument('--baseline', type=str, metavar='FILE', help='Fail on regressions against FILE')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown/growth over the baseline (default: 0.25)')
+    parser.add_argument('--cold-run', type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold_run:
+        func = TARGETS[args.cold_run](Path(args.vault), cold=True)
+        print(json.dumps({'seconds': time_once(func)}))
+        return
+
+    names = args.only.split(',') if args.only else list(TARGETS)
+    unknown = [name for name in names if name not in TARGETS]
+    if unknown:
+        parser.error(f'Unknown target(s): {", ".join(unknown)}')
+
+    params = {'notes': args.notes, 'book_items': args.book_items, 'seed': args.seed}
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.vault:
+            vault = Path(args.vault)
+            params = {'vault': str(vault)}
+        else:
+            vault = Path(tmp) / 'vault'
+            manifest = generate_vault(vault, notes=args.notes, book_items=args.book_items, seed=args.seed)
+            params.update(files=manifest['files'], tasks=manifest['tasks'], bytes=manifest['bytes'])
+        results = run_suite(vault, names, args.repeat)
+
+    report = {'params': params, 'results': results}
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(', '.join(f'{key}={value}' for key, value in params.items()))
+        print(f'{"target":<24}{"cold, s":>10}{"warm, s":>10}{"peak, KiB":>12}')
+        for name, row in results.items():
+            print(f'{name:<24}{row["cold_s"]:>10.4f}{row["warm_s"]:>10.4f}{row["peak_kib"]:>12}')
+
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(report, indent=2) + '\n', encoding='utf-8')
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        if baseline.get('params') != params:
+            print(f'warning: baseline was recorded with {baseline.get("params")}', file=sys.stderr)
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f'REGRESSION {line}', file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark the parse-tasks.py extractor on multi-megabyte notes.
+
+Compares the current single-pass extractor with the previous
+implementation (per-match prefix line counting and four re.sub calls)
+on a large kanban board, a long callout-heavy daily log and an archive
+note without any #task.
+
+Usage:
+    python benchmarks/bench_task_extractor.py [--size-mb N] [--repeat N]
+"""
+
+import argparse
+import re
+import tempfile
+from pathlib import Path
+
+from common import best_of, load_script
+
+parse_tasks = load_script('plugins/day/scripts/parse-tasks.py')
+
+LEGACY_TASK_PATTERN = re.compile(r'^[>\s]*- \[([ xX])\]\s*(.+)', re.MULTILINE)
+
+
+def legacy_parse_tasks_from_file(filepath: Path, root: Path) -> list:
+    """The extractor as it was before the single-pass rewrite, for reference."""
+    tasks = []
+    content = filepath.read_text(encoding='utf-8')
+    for match in LEGACY_TASK_PATTERN.finditer(content):
+        status, raw_text = match.groups()
+        if '#task' not in raw_text:
+            continue
+        priority = ''
+        for p in ['⏫', '🔼', '🔽', '⚡']:
+            if p in raw_text:
+                priority = p
+                break
+        due_match = re.search(r'📅\s*(\d{4}-\d{2}-\d{2})', raw_text)
+        text = raw_text
+        text = re.sub(r'#\w+', '', text)
+        text = re.sub(r'[⏫🔼🔽⚡]', '', text)
+        text = re.sub(r'📅\s*\d{4}-\d{2}-\d{2}', '', text)
+        text = re.sub(r'✅\s*\d{4}-\d{2}-\d{2}', '', text)
+        tasks.append({
+            'file': filepath.relative_to(root).as_posix(),
+            'text': text.strip(),
+            'raw_text': raw_text,
+            'done': status.lower() == 'x',
+            'priority': priority,
+            'due': due_match.group(1) if due_match else '',
+            'line': content[:match.start()].count('\n') + 1,
+        })
+    return tasks
+
+
+def write_note(path: Path, size: int, line_for) -> None:
+    """Write lines produced by line_for(i) until the note reaches `size` bytes."""
+    written = 0
+    i = 0
+    with path.open('w', encoding='utf-8') as fh:
+        while written < size:
+            line = line_for(i) + '\n'
+            fh.write(line)
+            written += len(line.encode('utf-8'))
+            i += 1
+
+
+def kanban_line(i: int) -> str:
+    if i % 12 == 0:
+        return f'\n## Колонка {i // 12}\n'
+    done = 'x' if i % 5 == 0 else ' '
+    return f'- [{done}] Карточка {i} ⏫ #task #work 📅 2026-{i % 12 + 1:02d}-{i % 28 + 1:02d}'
+
+
+def callout_line(i: int) -> str:
+    if i % 4 == 0:
+        return f'Заметка о дне номер {i}, просто текст без задач.'
+    return f'> - [ ] Пункт {i} 🔼 #task #inbox'
+
+
+def archive_line(i: int) -> str:
+    return f'Сообщение {i}: длинная выгрузка канала без задач, только текст и ссылки.'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the task extractor')
+    parser.add_argument('--size-mb', type=float, default=4, help='Note size in MiB (default: 4)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions (default: 3)')
+    args = parser.parse_args()
+
+    size = int(args.size_mb * (1 << 20))
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        notes = {
+            'kanban board': kanban_line,
+            'callout log': callout_line,
+            'archive (no #task)': archive_line,
+        }
+        print(f'{"note":<22}{"tasks":>8}{"legacy, s":>12}{"current, s":>12}{"speedup":>10}')
+        for name, line_for in notes.items():
+            path = root / f'{name}.md'
+            write_note(path, size, line_for)
+            count = len(parse_tasks.parse_tasks_from_file(path, root))
+            legacy = best_of(lambda: legacy_parse_tasks_from_file(path, root), args.repeat)
+            current = best_of(lambda: parse_tasks.parse_tasks_from_file(path, root), args.repeat)
+            print(f'{name:<22}{count:>8}{legacy:>12.3f}{current:>12.3f}{legacy / current:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for LitRes, Open Library and Google Books.
+
+Serves responses recorded with `fetch-toc.py --record DIR` (or written by
+bench_fetch_toc.py) to clients that rewrite source URLs with
+bookhttp.stand_in_url, i.e. `fetch-toc.py --replay http://127.0.0.1:PORT`.
+A request for /https/openlibrary.org/isbn/1.json is answered with the
+fixture recorded for https://openlibrary.org/isbn/1.json; unknown URLs
+get 404.
+
+To make the HTTP layer do real work, every request can be delayed
+(--latency plus up to --jitter ms), answered with 503 (--error-rate) or
+bounced through a 302 (--redirect-rate). Bodies are gzipped when the
+client asks for it, and If-None-Match is answered with 304.
+
+Usage:
+    python benchmarks/bookserver.py FIXTURES [--port N] [--latency MS]
+                                             [--jitter MS] [--error-rate F]
+                                             [--redirect-rate F] [--seed N]
+"""
+
+import argparse
+import gzip
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from common import REPO_ROOT
+
+sys.path.append(str(REPO_ROOT / 'plugins/books/skills/extracting-book-toc/scripts'))
+from bookhttp import FixtureStore, original_url  # noqa: E402
+
+REDIRECT_PREFIX = '/moved'
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, store: FixtureStore, port: int = 0, latency: float = 0, jitter: float = 0,
+                 error_rate: float = 0, redirect_rate: float = 0, seed: int = 1):
+        super().__init__(('127.0.0.1', port), StandInHandler)
+        self.store = store
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.redirect_rate = redirect_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'redirects': 0, 'not_modified': 0}
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def draw(self) -> tuple:
+        """(delay in seconds, inject an error, inject a redirect) for one request."""
+        with self.lock:
+            delay = self.latency + self.rng.uniform(0, self.jitter)
+            return delay, self.rng.random() < self.error_rate, self.rng.random() < self.redirect_rate
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)  # a client hanging up is not an error
+
+    def count(self, key: str):
+        with self.lock:
+            self.stats[key] += 1
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        server.count('requests')
+        delay, error, redirect = server.draw()
+        time.sleep(delay)
+
+        path = self.path
+        moved = path.startswith(REDIRECT_PREFIX + '/')
+        if moved:
+            path = path[len(REDIRECT_PREFIX):]
+        if error:
+            server.count('errors')
+            return self.reply(503, b'injected error')
+        if redirect and not moved:
+            server.count('redirects')
+            return self.reply(302, b'', {'Location': REDIRECT_PREFIX + path})
+
+        url = original_url(path)
+        response = server.store.get(url) if url else None
+        if response is None:
+            return self.reply(404, b'no fixture')
+        etag = response.headers.get('ETag')
+        if etag and self.headers.get('If-None-Match') == etag:
+            server.count('not_modified')
+            return self.reply(304, b'', {'ETag': etag})
+        headers = {name: value for name, value in response.headers.items()}
+        self.reply(response.status, response.body, headers)
+
+    def reply(self, status: int, body: bytes, headers: dict = None):
+        headers = dict(headers or {})
+        if body and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=5)
+            headers['Content-Encoding'] = 'gzip'
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client stopped reading early (streamed LitRes XML)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(store: FixtureStore, **options) -> StandInServer:
+    """Start a stand-in server on a free port in a background thread."""
+    server = StandInServer(store, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve recorded book-source responses locally')
+    parser.add_argument('fixtures', help='Directory written by fetch-toc.py --record')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    parser.add_argument('--latency', type=float, default=0, help='Delay per request, ms (default: 0)')
+    parser.add_argument('--jitter', type=float, default=0, help='Extra random delay up to N ms (default: 0)')
+    parser.add_argument('--error-rate', type=float, default=0, help='Share of requests answered 503 (default: 0)')
+    parser.add_argument('--redirect-rate', type=float, default=0,
+                        help='Share of requests bounced through a 302 (default: 0)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+
+    server = StandInServer(FixtureStore(args.fixtures), args.port, args.latency / 1000, args.jitter / 1000,
+                           args.error_rate, args.redirect_rate, args.seed)
+    print(f'Serving {args.fixtures} at {server.url}', file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""Shared helpers for the benchmark scripts."""
+
+import importlib.util
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def load_script(relpath: str):
+    """Import a plugin script with a dashed file name as a module."""
+    path = REPO_ROOT / relpath
+    name = path.stem.replace('-', '_')
+    if name in sys.modules:
+        return sys.modules[name]
+    if str(path.parent) not in sys.path:
+        sys.path.append(str(path.parent))  # scripts import vaultcore from their directory
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def best_of(func, repeat: int = 5) -> float:
+    """Return the fastest wall time of `repeat` calls, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic Obsidian vault for the benchmarks.
+
+The output depends only on the arguments and --seed, so two runs with the
+same options produce byte-identical vaults and timings stay comparable
+between commits.
+
+Layout:
+    Dailies/YYYY-MM-DD.md        daily notes with plain and callout tasks
+    Base/Area N/Topic N/...       project notes nested --depth levels deep
+    Base/Boards/Board N.md        kanban boards (## columns of task cards)
+    Base/Books/Book N.md          book notes with a long ## Прогресс checklist
+    Archive/Export N.md          huge notes without a single #task
+    .obsidian/, _templates/       ignored folders that must not be scanned
+
+Usage:
+    python benchmarks/vaultgen.py OUT [--notes N] [--tasks-per-note N]
+                                      [--depth N] [--boards N] [--archive-mb N]
+                                      [--books N] [--book-items N] [--seed N]
+"""
+
+import argparse
+import json
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+# Due dates are spread around this day instead of the real today
+ANCHOR_DATE = date(2026, 1, 15)
+
+PRIORITIES = ('', '', '', '⏫', '🔼', '🔽', '⚡')
+TAGS = ('#work', '#home', '#inbox', '#wait', '#project/alpha', '#errand')
+WORDS = (
+    'позвонить', 'написать', 'проверить', 'обновить', 'отчёт', 'договор',
+    'встреча', 'review', 'deploy', 'план', 'бюджет', 'презентация', 'клиент',
+    'черновик', 'заметки', 'исследование', 'релиз', 'backlog', 'тесты',
+)
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def task_line(rng: random.Random, prefix: str = '') -> str:
+    """One Obsidian Tasks line with random status, priority, tags and dates."""
+    parts = [sentence(rng, rng.randint(2, 7))]
+    priority = rng.choice(PRIORITIES)
+    if priority:
+        parts.append(priority)
+    parts.append('#task')
+    parts.extend(rng.sample(TAGS, rng.randint(0, 2)))
+    done = rng.random() < 0.3
+    if rng.random() < 0.7:
+        due = ANCHOR_DATE + timedelta(days=rng.randint(-30, 30))
+        parts.append(f'📅 {due.isoformat()}')
+    if done:
+        finished = ANCHOR_DATE - timedelta(days=rng.randint(0, 30))
+        parts.append(f'✅ {finished.isoformat()}')
+    return f'{prefix}- [{"x" if done else " "}] {" ".join(parts)}'
+
+
+def filler(rng: random.Random) -> str:
+    kind = rng.random()
+    if kind < 0.5:
+        return sentence(rng, rng.randint(5, 15)) + '.'
+    if kind < 0.7:
+        return f'- {sentence(rng, rng.randint(2, 6))}'
+    if kind < 0.8:
+        return f'- [ ] {sentence(rng, 3)}'  # checkbox without #task
+    return ''
+
+
+def task_note(rng: random.Random, tasks: int, callouts: bool = False) -> str:
+    """A note with `tasks` task lines mixed with prose and plain checkboxes."""
+    lines = [f'# {sentence(rng, 3)}', '']
+    for i in range(tasks):
+        for _ in range(rng.randint(0, 3)):
+            lines.append(filler(rng))
+        if callouts and i % 3 == 0:
+            lines.append('> [!todo] ' + sentence(rng, 2))
+            lines.append(task_line(rng, '> '))
+        else:
+            lines.append(task_line(rng, '  ' * rng.randint(0, 1) if i else ''))
+    return '\n'.join(lines) + '\n'
+
+
+def kanban_note(rng: random.Random, cards: int) -> str:
+    lines = ['---', 'kanban-plugin: basic', '---', '']
+    for i in range(cards):
+        if i % 15 == 0:
+            lines.extend(['', f'## {rng.choice(("Backlog", "В работе", "Ревью", "Готово"))}', ''])
+        lines.append(task_line(rng))
+    return '\n'.join(lines) + '\n'
+
+
+def book_note(rng: random.Random, items: int, method: str) -> str:
+    """A book note whose ## Прогресс section has `items` checklist entries.
+
+    method is 'weight' ([w:N] from LitRes), 'pages' ([N-M] ranges) or
+    'items' (plain chapters). Entries form a three-level tree: a part
+    every 40 entries, chapters every 4, sections in between.
+    """
+    page = 1
+    done_until = rng.randint(0, items)
+    progress = []
+    for i in range(items):
+        if i % 40 == 0:
+            indent, title = '', f'Часть {i // 40 + 1}'
+        elif i % 4 == 0:
+            indent, title = '  ', f'Глава {i // 4 + 1}'
+        else:
+            indent, title = '    ', f'{i // 4 + 1}.{i % 4} {sentence(rng, 3)}'
+        suffix = ''
+        if method == 'weight':
+            suffix = f' [w:{rng.randint(200, 20000)}]'
+        elif method == 'pages':
+            end = page + rng.randint(1, 12)
+            suffix = f' [{page}-{end}]'
+            page = end + 1
+        check = 'x' if i < done_until else ' '
+        progress.append(f'{indent}- [{check}] {title}{suffix}')
+
+    frontmatter = ['---', 'type: book', f'status: {rng.choice(("reading", "done", "to-read"))}']
+    if method == 'pages':
+        frontmatter.append(f'total: {page - 1}')
+    frontmatter.append('---')
+    return '\n'.join([
+        *frontmatter,
+        '',
+        f'# {sentence(rng, 3)}',
+        '',
+        '## Прогресс',
+        '',
+        *progress,
+        '',
+        '## Заметки',
+        '',
+        *(sentence(rng, 12) + '.' for _ in range(20)),
+    ]) + '\n'
+
+
+def archive_note(rng: random.Random, size: int) -> str:
+    """A large export with no #task, as produced by channel or mail dumps."""
+    lines = []
+    written = 0
+    i = 0
+    while written < size:
+        line = f'Сообщение {i}: {sentence(rng, 12)} https://example.org/{i}'
+        lines.append(line)
+        written += len(line.encode('utf-8')) + 1
+        i += 1
+    return '\n'.join(lines) + '\n'
+
+
+def generate_vault(root: Path, notes: int = 2000, tasks_per_note: int = 10, depth: int = 4,
+                   boards: int = 20, archive_mb: float = 4, books: int = 20,
+                   book_items: int = 2000, seed: int = 1) -> dict:
+    """Write a vault under root and return a manifest of what was generated."""
+    rng = random.Random(seed)
+    root.mkdir(parents=True, exist_ok=True)
+    manifest = {'seed': seed, 'files': 0, 'tasks': 0, 'bytes': 0, 'books': []}
+
+    def write(rel: str, content: str, tasks: int = 0):
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+        manifest['files'] += 1
+        manifest['tasks'] += tasks
+        manifest['bytes'] += len(content.encode('utf-8'))
+
+    dailies = notes // 4
+    for i in range(dailies):
+        day = ANCHOR_DATE - timedelta(days=dailies - i)
+        count = rng.randint(0, tasks_per_note * 2)
+        write(f'Dailies/{day.isoformat()}.md', task_note(rng, count, callouts=True), count)
+
+    for i in range(notes - dailies):
+        folders = [f'Area {i % 7}'] + [f'Topic {(i // 7 + level) % 5}' for level in range(rng.randint(0, depth - 1))]
+        count = rng.randint(0, tasks_per_note * 2)
+        write(f'Base/{"/".join(folders)}/Note {i}.md', task_note(rng, count), count)
+
+    for i in range(boards):
+        cards = rng.randint(50, 300)
+        write(f'Base/Boards/Board {i}.md', kanban_note(rng, cards), cards)
+
+    methods = ('weight', 'pages', 'items')
+    for i in range(books):
+        rel = f'Base/Books/Book {i}.md'
+        write(rel, book_note(rng, book_items, methods[i % 3]))
+        manifest['books'].append(rel)
+
+    if archive_mb > 0:
+        for i in range(2):
+            write(f'Archive/Export {i}.md', archive_note(rng, int(archive_mb * (1 << 20) / 2)))
+
+    # Ignored folders: tasks here must never show up in results
+    (root / '.obsidian').mkdir(exist_ok=True)
+    (root / '.obsidian' / 'workspace.json').write_text('{}', encoding='utf-8')
+    (root / '_templates').mkdir(exist_ok=True)
+    (root / '_templates' / 'Daily.md').write_text(task_note(rng, 5), encoding='utf-8')
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic Obsidian vault')
+    parser.add_argument('out', help='Directory to create the vault in')
+    parser.add_argument('--notes', type=int, default=2000, help='Daily + project notes (default: 2000)')
+    parser.add_argument('--tasks-per-note', type=int, default=10, help='Average tasks per note (default: 10)')
+    parser.add_argument('--depth', type=int, default=4, help='Max folder depth under Base/ (default: 4)')
+    parser.add_argument('--boards', type=int, default=20, help='Kanban boards (default: 20)')
+    parser.add_argument('--archive-mb', type=float, default=4, help='Total size of task-free archive notes (default: 4)')
+    parser.add_argument('--books', type=int, default=20, help='Book notes (default: 20)')
+    parser.add_argument('--book-items', type=int, default=2000, help='## Прогресс items per book (default: 2000)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+
+    manifest = generate_vault(
+        Path(args.out), args.notes, args.tasks_per_note, args.depth, args.boards,
+        args.archive_mb, args.books, args.book_items, args.seed,
+    )
+    manifest.pop('books')
+    print(json.dumps(manifest))
+
+
+if __name__ == '__main__':
+    main()
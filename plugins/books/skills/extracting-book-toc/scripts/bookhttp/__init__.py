@@ -0,0 +1,15 @@
+"""
+HTTP-слой fetch-toc.py: клиент с пулом keep-alive соединений, дисковый
+кэш ответов, ограничение частоты запросов по хостам, повторы временных
+сбоев, размыкатель цепи для недоступных хостов, запись и
+воспроизведение ответов для тестов и бенчмарков.
+
+Пакет лежит рядом со скриптом и импортируется из его папки.
+"""
+
+from .breaker import DEFAULT_BREAKER_PATH, CircuitBreaker
+from .cache import DEFAULT_CACHE_DIR, CacheEntry, HttpCache, source_ttl
+from .client import HttpClient, Response, ResponseTooLarge, TooManyRedirects
+from .ratelimit import HostRateLimiter, TokenBucket
+from .replay import FixtureStore, RecordingClient, ReplayClient, StandInClient, original_url, stand_in_url
+from .retry import TRANSIENT_STATUSES, RetryPolicy, is_transient
@@ -0,0 +1,92 @@
+"""Размыкатель цепи по хостам: упавший хост пропускается сразу, даже в следующих запусках."""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_BREAKER_PATH = ".claude/books-http-breaker.json"
+FAILURE_THRESHOLD = 3  # сбоев подряд, после которых хост считается недоступным
+COOLDOWN = 5 * 60  # секунд до пробного запроса
+
+
+class CircuitBreaker:
+    """Счётчики сбоев подряд по хостам, сохраняются в JSON-файл.
+
+    После threshold сбоев подряд цепь размыкается: allow() отказывает
+    cooldown секунд. Затем пропускается один пробный запрос: успех
+    замыкает цепь, сбой размыкает её снова. path=None — без файла.
+    """
+
+    def __init__(self, path: str | Path | None = DEFAULT_BREAKER_PATH, threshold: int = FAILURE_THRESHOLD,
+                 cooldown: float = COOLDOWN):
+        self.path = Path(path) if path else None
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.hosts = self._load()  # {хост: {"failures": N, "opened": время или None}}
+        self._probing = set()
+        self._lock = threading.Lock()
+
+    def allow(self, host: str) -> bool:
+        with self._lock:
+            state = self.hosts.get(host)
+            if not state or not state.get("opened"):
+                return True
+            if time.time() - state["opened"] < self.cooldown or host in self._probing:
+                return False
+            self._probing.add(host)
+            return True
+
+    def retry_at(self, host: str) -> float | None:
+        """Когда хост снова можно пробовать (time.time()); None — цепь замкнута."""
+        state = self.hosts.get(host)
+        return state["opened"] + self.cooldown if state and state.get("opened") else None
+
+    def success(self, host: str):
+        with self._lock:
+            self._probing.discard(host)
+            if self.hosts.pop(host, None) is None:
+                return
+            self._save()
+
+    def release(self, host: str):
+        """Запрос закончился без вердикта о хосте (отменён, срок поиска вышел):
+        следующий снова может быть пробным."""
+        with self._lock:
+            self._probing.discard(host)
+
+    def failure(self, host: str):
+        with self._lock:
+            self._probing.discard(host)
+            state = self.hosts.setdefault(host, {"failures": 0, "opened": None})
+            state["failures"] += 1
+            if state["failures"] >= self.threshold:
+                state["opened"] = time.time()
+            self._save()
+
+    def _load(self) -> dict:
+        if not self.path:
+            return {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return {host: state for host, state in data.items()
+                if isinstance(state, dict) and isinstance(state.get("failures"), int)}
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp = None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.hosts, f, indent=2)
+            os.replace(tmp, self.path)
+        except OSError:
+            # состояние необязательно: папка только для чтения и т.п.
+            if tmp:
+                Path(tmp).unlink(missing_ok=True)
@@ -0,0 +1,125 @@
+"""Дисковый кэш HTTP-ответов: TTL по источнику, ревалидация, кэш 404."""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import urlsplit
+
+DEFAULT_CACHE_DIR = ".claude/books-http-cache"
+CACHE_VERSION = 1
+
+DAY = 24 * 60 * 60
+# Сколько ответ считается свежим, по суффиксу хоста
+SOURCE_TTLS = {
+    "litres.ru": 30 * DAY,  # оглавление вышедшей книги не меняется
+    "openlibrary.org": 7 * DAY,
+    "googleapis.com": DAY,
+}
+DEFAULT_TTL = DAY
+NEGATIVE_TTL = DAY  # 404: книги нет в источнике, но она может появиться
+
+
+@dataclass
+class CacheEntry:
+    """Сохранённый ответ. body — None для отрицательной записи (404)."""
+    url: str
+    status: int
+    fetched: float
+    ttl: int
+    etag: str | None = None
+    last_modified: str | None = None
+    body: bytes | None = None
+
+    def is_fresh(self, now: float | None = None) -> bool:
+        return (now or time.time()) - self.fetched < self.ttl
+
+    def validators(self) -> dict:
+        """Заголовки условного запроса: сервер ответит 304, если ничего не изменилось."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def source_ttl(url: str, status: int) -> int:
+    if status == 404:
+        return NEGATIVE_TTL
+    host = urlsplit(url).hostname or ""
+    for suffix, ttl in SOURCE_TTLS.items():
+        if host == suffix or host.endswith("." + suffix):
+            return ttl
+    return DEFAULT_TTL
+
+
+class HttpCache:
+    """Ответы по URL, по файлу на URL: строка JSON с метаданными, затем тело.
+
+    Файлы заменяются атомарно, так что кэшем могут одновременно
+    пользоваться несколько потоков и запусков скрипта.
+    offline=True — отдавать записи независимо от свежести и не ходить в сеть.
+    """
+
+    def __init__(self, directory: str | Path = DEFAULT_CACHE_DIR, offline: bool = False):
+        self.directory = Path(directory)
+        self.offline = offline
+
+    def path(self, url: str) -> Path:
+        return self.directory / (hashlib.sha256(url.encode("utf-8")).hexdigest()[:32] + ".http")
+
+    def get(self, url: str) -> CacheEntry | None:
+        try:
+            with open(self.path(url), "rb") as f:
+                meta = json.loads(f.readline())
+                body = f.read() if meta["status"] != 404 else None
+        except (OSError, ValueError, KeyError):
+            return None
+        if meta.get("version") != CACHE_VERSION or meta.get("url") != url:
+            return None
+        return CacheEntry(url, meta["status"], meta["fetched"], meta["ttl"],
+                          meta.get("etag"), meta.get("last_modified"), body)
+
+    def put(self, url: str, status: int, body: bytes | None = None, headers=None) -> CacheEntry:
+        """Сохранить ответ (200 или 404); headers — заголовки ответа с валидаторами."""
+        headers = headers or {}
+        entry = CacheEntry(url, status, time.time(), source_ttl(url, status),
+                           headers.get("ETag"), headers.get("Last-Modified"), body)
+        self.write(entry)
+        return entry
+
+    def revalidated(self, entry: CacheEntry, headers=None) -> CacheEntry:
+        """Сервер ответил 304: запись снова свежая, новые валидаторы — если пришли."""
+        headers = headers or {}
+        entry.fetched = time.time()
+        entry.etag = headers.get("ETag") or entry.etag
+        entry.last_modified = headers.get("Last-Modified") or entry.last_modified
+        self.write(entry)
+        return entry
+
+    def write(self, entry: CacheEntry):
+        meta = {
+            "version": CACHE_VERSION,
+            "url": entry.url,
+            "status": entry.status,
+            "fetched": entry.fetched,
+            "ttl": entry.ttl,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+        }
+        tmp = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(meta).encode("utf-8") + b"\n")
+                f.write(entry.body or b"")
+            os.replace(tmp, self.path(entry.url))
+        except OSError:
+            # кэш необязателен: папка только для чтения и т.п.
+            if tmp:
+                Path(tmp).unlink(missing_ok=True)
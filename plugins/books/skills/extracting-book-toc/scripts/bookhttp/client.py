@@ -0,0 +1,196 @@
+"""HTTP-клиент с пулом keep-alive соединений: gzip, редиректы, предел размера."""
+
+import http.client
+import ssl
+import threading
+import zlib
+from dataclasses import dataclass
+from urllib.parse import urljoin, urlsplit
+from urllib.request import getproxies, proxy_bypass
+
+DEFAULT_TIMEOUT = 15
+MAX_REDIRECTS = 5
+MAX_BODY = 32 * 1024 * 1024  # после распаковки; оглавления ЛитРес — сотни КБ
+CHUNK_SIZE = 64 * 1024
+MAX_IDLE = 4  # свободных соединений на хост
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+# Ошибки, после которых соединение из пула стоит открыть заново:
+# сервер закрыл keep-alive, пока оно лежало без дела
+STALE_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                ConnectionResetError, BrokenPipeError)
+
+
+class ResponseTooLarge(OSError):
+    """Тело ответа больше max_body."""
+
+
+class TooManyRedirects(OSError):
+    """Больше MAX_REDIRECTS перенаправлений подряд."""
+
+
+@dataclass
+class Response:
+    url: str  # итоговый адрес после редиректов
+    status: int
+    headers: http.client.HTTPMessage
+    body: bytes
+    complete: bool = True  # False — чтение оборвал consume, body — только начало
+
+
+class HttpClient:
+    """GET-запросы через постоянные соединения, по пулу на (схема, хост, порт).
+
+    Каждый запрос — одна загрузка на каждый шаг цепочки редиректов;
+    тело читается кусками, распаковывается из gzip на лету и
+    обрывается, если превысило max_body. Потокобезопасен: соединение
+    выдаётся одному потоку, после полного чтения ответа возвращается в пул.
+    Прокси берутся из переменных окружения, как в urllib.
+    rate_limiter (HostRateLimiter) — если задан, каждый запрос сначала
+    берёт токен для своего хоста.
+    consume — функция, которой тело ответа 200 отдаётся кусками по мере
+    чтения; вернула True — чтение прекращается, соединение закрывается.
+    """
+
+    def __init__(self, headers: dict | None = None, max_body: int = MAX_BODY, rate_limiter=None,
+                 max_idle: int = MAX_IDLE):
+        self.headers = {"Accept-Encoding": "gzip", **(headers or {})}
+        self.max_body = max_body
+        self.rate_limiter = rate_limiter
+        self.max_idle = max_idle
+        self.stats = {"requests": 0, "connections": 0, "bytes": 0}
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._proxies = getproxies()
+        self._ssl_context = None
+
+    def get(self, url: str, headers: dict | None = None, timeout: float = DEFAULT_TIMEOUT,
+            consume=None) -> Response:
+        """Загрузить URL, следуя редиректам; ответ любого статуса, кроме 3xx."""
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._request(url, headers, timeout, consume)
+            location = response.headers.get("Location")
+            if response.status not in REDIRECT_CODES or not location:
+                return response
+            url = urljoin(url, location)
+        raise TooManyRedirects(f"больше {MAX_REDIRECTS} редиректов: {url}")
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn in connections:
+                conn.close()
+
+    def _request(self, url: str, headers: dict | None, timeout: float, consume=None) -> Response:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"неподдерживаемая схема: {url}")
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        request_headers = {**self.headers, **(headers or {})}
+        if self.rate_limiter:
+            self.rate_limiter.acquire(parts.hostname)
+
+        conn, reused = self._checkout(key, timeout)
+        if self._http_proxy(key):
+            target = url  # обычный HTTP через прокси — полный адрес в строке запроса
+        try:
+            try:
+                conn.request("GET", target, headers=request_headers)
+                response = conn.getresponse()
+            except STALE_ERRORS:
+                if not reused:
+                    raise
+                conn.close()
+                conn = self._connect(key, timeout)
+                conn.request("GET", target, headers=request_headers)
+                response = conn.getresponse()
+            if response.status != 200:
+                consume = None
+            body, wire_bytes, complete = self._read_body(response, consume)
+        except BaseException:
+            conn.close()
+            raise
+
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["bytes"] += wire_bytes
+        if response.will_close or not complete:
+            conn.close()  # недочитанный ответ не даст отправить следующий запрос
+        else:
+            self._checkin(key, conn)
+        return Response(url, response.status, response.headers, body, complete)
+
+    def _read_body(self, response: http.client.HTTPResponse, consume=None) -> tuple:
+        """(тело, сколько байт пришло по сети, прочитано ли до конца)."""
+        gzipped = response.headers.get("Content-Encoding", "").lower() == "gzip"
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+        chunks = []
+        size = wire_bytes = 0
+        while True:
+            chunk = response.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            wire_bytes += len(chunk)
+            if decoder:
+                chunk = decoder.decompress(chunk, self.max_body - size + 1)
+            size += len(chunk)
+            if size > self.max_body:
+                raise ResponseTooLarge(f"ответ больше {self.max_body} байт")
+            chunks.append(chunk)
+            if consume and consume(chunk):
+                return b"".join(chunks), wire_bytes, False
+        if decoder:
+            chunks.append(decoder.flush())
+            if consume:
+                consume(chunks[-1])
+        return b"".join(chunks), wire_bytes, True
+
+    def _checkout(self, key: tuple, timeout: float) -> tuple:
+        """(соединение, взято ли из пула)."""
+        with self._lock:
+            idle = self._idle.get(key)
+            conn = idle.pop() if idle else None
+        if conn:
+            conn.timeout = timeout
+            if conn.sock:
+                conn.sock.settimeout(timeout)
+            return conn, True
+        return self._connect(key, timeout), False
+
+    def _checkin(self, key: tuple, conn: http.client.HTTPConnection):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def _proxy(self, key: tuple) -> str | None:
+        scheme, host, _ = key
+        proxy = self._proxies.get(scheme)
+        return proxy if proxy and not proxy_bypass(host) else None
+
+    def _http_proxy(self, key: tuple) -> bool:
+        return key[0] == "http" and self._proxy(key) is not None
+
+    def _connect(self, key: tuple, timeout: float) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        with self._lock:
+            self.stats["connections"] += 1
+        proxy = self._proxy(key)
+        if proxy:
+            proxy_parts = urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+            conn_host, conn_port = proxy_parts.hostname, proxy_parts.port or 8080
+        else:
+            conn_host, conn_port = host, port
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            conn = http.client.HTTPSConnection(conn_host, conn_port, timeout=timeout, context=self._ssl_context)
+            if proxy:
+                conn.set_tunnel(host, port)
+        else:
+            conn = http.client.HTTPConnection(conn_host, conn_port, timeout=timeout)
+        return conn
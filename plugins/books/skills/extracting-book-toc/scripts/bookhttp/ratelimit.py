@@ -0,0 +1,62 @@
+"""Ограничение частоты запросов: token bucket на каждый хост."""
+
+import threading
+import time
+
+# Запросов в секунду и размер всплеска, по суффиксу хоста
+HOST_RATES = {
+    "litres.ru": (5, 5),
+    "openlibrary.org": (3, 3),  # просят не долбить API пакетными загрузками
+    "googleapis.com": (5, 5),
+}
+DEFAULT_RATE = (2, 4)
+
+
+class TokenBucket:
+    """rate токенов в секунду, не больше burst про запас."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Взять токен, при необходимости подождав; ждёт без блокировки."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    """По ведру на хост; rate задаёт одну частоту для всех хостов."""
+
+    def __init__(self, rate: float | None = None):
+        if rate is not None and not rate > 0:
+            raise ValueError(f"частота должна быть больше нуля: {rate}")
+        self.rate = rate
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def limits(self, host: str) -> tuple:
+        if self.rate:
+            return self.rate, max(1, self.rate)
+        for suffix, limits in HOST_RATES.items():
+            if host == suffix or host.endswith("." + suffix):
+                return limits
+        return DEFAULT_RATE
+
+    def acquire(self, host: str):
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(*self.limits(host))
+        bucket.acquire()
@@ -0,0 +1,149 @@
+"""Запись и воспроизведение ответов: fetch-toc.py без обращения к настоящим источникам."""
+
+import hashlib
+import http.client
+import json
+import os
+import tempfile
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from .client import DEFAULT_TIMEOUT, MAX_IDLE, Response
+
+FIXTURE_VERSION = 1
+# Остальные заголовки описывают передачу (gzip, длина), а тело хранится распакованным
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+def make_headers(pairs) -> http.client.HTTPMessage:
+    headers = http.client.HTTPMessage()
+    for name, value in pairs:
+        headers[name] = value
+    return headers
+
+
+class FixtureStore:
+    """Записанные ответы, по файлу на URL запроса: строка JSON, затем тело.
+
+    Тот же формат, что у кэша ответов, но без срока годности: запись
+    отдаётся всегда, пока её не перезапишут.
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+
+    def path(self, url: str) -> Path:
+        return self.directory / (hashlib.sha256(url.encode("utf-8")).hexdigest()[:32] + ".fixture")
+
+    def get(self, url: str) -> Response | None:
+        try:
+            with open(self.path(url), "rb") as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        if meta.get("version") != FIXTURE_VERSION or meta.get("url") != url:
+            return None
+        return Response(url, meta["status"], make_headers(meta.get("headers", [])), body)
+
+    def put(self, url: str, status: int, body: bytes = b"", headers=None):
+        headers = headers or {}
+        meta = {
+            "version": FIXTURE_VERSION,
+            "url": url,
+            "status": status,
+            "headers": [[name, headers[name]] for name in KEPT_HEADERS if headers.get(name)],
+        }
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(meta, ensure_ascii=False).encode("utf-8") + b"\n")
+                f.write(body)
+            os.replace(tmp, self.path(url))
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+
+class RecordingClient:
+    """Обёртка над HttpClient: каждый ответ ещё и записывается в store.
+
+    Тело читается целиком, даже если consume остановил бы чтение
+    раньше, — запись должна годиться для любого разборщика. 304 не
+    записывается: fetch-toc.py --record работает без кэша ответов.
+    """
+
+    def __init__(self, client, store: FixtureStore):
+        self.client = client
+        self.store = store
+
+    def get(self, url: str, headers: dict | None = None, timeout: float = DEFAULT_TIMEOUT,
+            consume=None) -> Response:
+        response = self.client.get(url, headers, timeout)
+        if response.status != 304:
+            self.store.put(url, response.status, response.body, response.headers)
+        if consume and response.status == 200:
+            consume(response.body)
+        return response
+
+    def __getattr__(self, name):
+        # stats, rate_limiter, max_idle, close — у настоящего клиента
+        return getattr(self.client, name)
+
+
+class ReplayClient:
+    """Отвечает записанными ответами, в сеть не ходит; нет записи — 404."""
+
+    def __init__(self, store: FixtureStore):
+        self.store = store
+        self.rate_limiter = None
+        self.max_idle = MAX_IDLE
+        self.stats = {"requests": 0, "connections": 0, "bytes": 0}
+
+    def get(self, url: str, headers: dict | None = None, timeout: float = DEFAULT_TIMEOUT,
+            consume=None) -> Response:
+        response = self.store.get(url) or Response(url, 404, make_headers([]), b"")
+        self.stats["requests"] += 1
+        self.stats["bytes"] += len(response.body)
+        if consume and response.status == 200:
+            consume(response.body)
+        return response
+
+    def close(self):
+        pass
+
+
+def stand_in_url(server: str, url: str) -> str:
+    """https://host/path?q → http://server/https/host/path?q."""
+    parts = urlsplit(url)
+    query = f"?{parts.query}" if parts.query else ""
+    return f"{server.rstrip('/')}/{parts.scheme}/{parts.netloc}{parts.path or '/'}{query}"
+
+
+def original_url(path: str) -> str | None:
+    """Обратное к stand_in_url: путь запроса к подменному серверу → исходный URL."""
+    scheme, _, rest = path.lstrip("/").partition("/")
+    if scheme not in ("http", "https") or not rest:
+        return None
+    return f"{scheme}://{rest}"
+
+
+class StandInClient:
+    """HttpClient, который вместо источников ходит на подменный сервер.
+
+    Запрос проходит весь HTTP-слой — пул соединений, gzip, редиректы,
+    потоковое чтение, — но отвечает локальный сервер с записанными
+    ответами (benchmarks/bookserver.py).
+    """
+
+    def __init__(self, client, server: str):
+        self.client = client
+        self.server = server
+
+    def get(self, url: str, headers: dict | None = None, timeout: float = DEFAULT_TIMEOUT,
+            consume=None) -> Response:
+        return self.client.get(stand_in_url(self.server, url), headers, timeout, consume)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
@@ -0,0 +1,41 @@
+"""Повторы временных сбоев с экспоненциальной задержкой и случайным разбросом."""
+
+import http.client
+import random
+import socket
+import ssl
+from dataclasses import dataclass
+
+from .client import ResponseTooLarge, TooManyRedirects
+
+# Ответы, которые стоит повторить: сервер перегружен или временно недоступен
+TRANSIENT_STATUSES = (429, 500, 502, 503, 504)
+# Сетевые ошибки: обрыв, отказ в соединении, таймаут, DNS
+TRANSIENT_ERRORS = (OSError, http.client.HTTPException, socket.timeout)
+# Тоже OSError, но повтор дал бы тот же результат
+PERMANENT_ERRORS = (ResponseTooLarge, TooManyRedirects, ssl.CertificateError)
+
+
+@dataclass
+class RetryPolicy:
+    """attempts попыток; перед n-й — случайная пауза до base * 2**n, не больше cap.
+
+    Случайный разброс (full jitter) не даёт потокам пакетного режима
+    повторять запросы к упавшему хосту одновременно.
+    """
+    attempts: int = 3
+    base: float = 0.5
+    cap: float = 8.0
+
+    def delay(self, attempt: int, retry_after: str | None = None) -> float:
+        """Пауза после неудачной попытки attempt (с нуля).
+
+        Retry-After в секундах, если сервер его прислал, важнее расчётной.
+        """
+        if retry_after and retry_after.strip().isdigit():
+            return min(float(retry_after), self.cap)
+        return random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+
+
+def is_transient(error: BaseException) -> bool:
+    return isinstance(error, TRANSIENT_ERRORS) and not isinstance(error, PERMANENT_ERRORS)
@@ -10,16 +10,73 @@
 Использование:
     python calculate-progress.py path/to/book.md
     python calculate-progress.py --format json path/to/book.md
+    python calculate-progress.py --all [--status reading,paused] [--format json]
+    python calculate-progress.py Base/Книги --status all
+    python calculate-progress.py --all --write-frontmatter
+    python calculate-progress.py --all --path ~/Vault
+
+Пакетный режим (--all = папка Base/ vault, либо путь к папке вместо файла):
+находит заметки книг — frontmatter со `status` и секция ## Прогресс,
+считает прогресс для каждой (параллельно, если заметок много) и выводит
+одну сводку, отсортированную по прогрессу.
+
+Кэш `.claude/books-progress-cache.json` в корне vault (--path, по
+умолчанию — текущая папка) — в пакетном режиме; для одной книги — только
+с явным --path, иначе запуск ничего не пишет:
+- заметки с теми же mtime и размером не перечитываются;
+- результат хранится по хэшу секции ## Прогресс, поэтому правка других
+  частей заметки (frontmatter, конспект) не приводит к пересчёту;
+- результаты, на которые не ссылается ни одна заметка, удаляются при
+  каждой записи кэша.
+
+--write-frontmatter записывает `progress:` и `progressMethod:` во
+frontmatter (для Dataview) — только если значения изменились.
 """
 
-import argparse
-import json
+import os
 import re
 import sys
-from dataclasses import dataclass
-
-
-@dataclass
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from vaultcore import (
+    CHECKLIST_PATTERN,
+    lazy_import,
+    read_note,
+    section_text,
+    set_frontmatter,
+    split_frontmatter,
+    vault_path,
+    write_atomic,
+)
+
+# Нужны только при запуске из командной строки и в пакетном режиме
+argparse = lazy_import("argparse")
+futures = lazy_import("concurrent.futures")
+hashlib = lazy_import("hashlib")
+json = lazy_import("json")
+
+PROGRESS_SECTION = "## Прогресс"
+PROGRESS_MARKER = PROGRESS_SECTION.encode("utf-8")
+
+# Пакетный режим
+BOOKS_DIR = "Base"
+DEFAULT_STATUSES = ("reading",)
+CACHE_FILE = ".claude/books-progress-cache.json"
+CACHE_VERSION = 3  # увеличить при изменении формата результата или кэша
+PARALLEL_THRESHOLD = 64  # меньше заметок дешевле посчитать в одном процессе
+
+HUMAN_PARTS_LIMIT = 12  # больше частей — в текстовом выводе только начатые
+
+# Метки в названии главы: вес [w:N] из ЛитРес и диапазон страниц [N-M].
+# Обычно метка одна и стоит в конце — её проверяет TRAILING_MARKER_PATTERN
+# без поиска по строке; остальные случаи разбирает MARKER_PATTERN
+TRAILING_MARKER_PATTERN = re.compile(r"\[(?:w:(\d+)|(\d+)-(\d+))\]\s*$")
+MARKER_PATTERN = re.compile(r"\s*\[(?:w:(\d+)|(\d+)-(\d+))\]")
+TOTAL_PATTERN = re.compile(r"^total:\s*(\d+)", re.MULTILINE)
+
+
+@dataclass(slots=True)
 class ProgressItem:
     """Элемент прогресса (глава)."""
     title: str
@@ -30,64 +87,168 @@ class ProgressItem:
     indent: int = 0
 
 
+@dataclass(slots=True)
+class Totals:
+    """Суммы по поддереву оглавления: пункт и все вложенные в него."""
+    items: int = 0
+    completed: int = 0
+    weighted: int = 0
+    weight: int = 0
+    completed_weight: int = 0
+    paged: int = 0
+    pages: int = 0
+    completed_pages: int = 0
+    max_page: int = 0
+
+    def add_item(self, item: ProgressItem):
+        self.items += 1
+        self.completed += item.completed
+        if item.weight is not None:
+            self.weighted += 1
+            self.weight += item.weight
+            if item.completed:
+                self.completed_weight += item.weight
+        if item.pages_start is not None:
+            span = item.pages_end - item.pages_start + 1
+            self.paged += 1
+            self.pages += span
+            if item.completed:
+                self.completed_pages += span
+            self.max_page = max(self.max_page, item.pages_end)
+
+    def merge(self, other: "Totals"):
+        self.items += other.items
+        self.completed += other.completed
+        self.weighted += other.weighted
+        self.weight += other.weight
+        self.completed_weight += other.completed_weight
+        self.paged += other.paged
+        self.pages += other.pages
+        self.completed_pages += other.completed_pages
+        self.max_page = max(self.max_page, other.max_page)
+
+
+@dataclass(slots=True)
+class ProgressNode:
+    """Узел дерева оглавления: пункт, вложенные пункты и суммы по поддереву."""
+    item: ProgressItem | None
+    children: list = field(default_factory=list)
+    totals: Totals | None = None  # None у листьев: их суммы — сам пункт
+
+
 def parse_progress_section(content: str) -> list[ProgressItem]:
     """Извлечь чеклист из секции ## Прогресс."""
+    return parse_progress_text(section_text(content, PROGRESS_SECTION) or "")
+
+
+def parse_progress_text(progress_text: str) -> list[ProgressItem]:
+    """Разобрать чеклист — тело секции ## Прогресс."""
     items = []
 
-    # Найти секцию Прогресс
-    progress_match = re.search(r'## Прогресс\s*\n(.*?)(?=\n## |\Z)', content, re.DOTALL)
-    if not progress_match:
-        return items
+    # Формат: "- [x] Название [w:123]" или "- [ ] Название [1-89]"
+    for match in CHECKLIST_PATTERN.finditer(progress_text):
+        prefix, status, title = match.groups()
+        weight = pages_start = pages_end = None
+        marker_start = title.find("[")
+        if marker_start >= 0:
+            marker = TRAILING_MARKER_PATTERN.match(title, marker_start)
+            if marker and title.find("[", marker_start + 1) < 0:
+                if marker.group(1):
+                    weight = int(marker.group(1))
+                else:
+                    pages_start, pages_end = int(marker.group(2)), int(marker.group(3))
+                title = title[:marker_start]
+            else:
+                title, weight, pages_start, pages_end = split_markers(title)
+        items.append(ProgressItem(title.strip(), status != " ", weight, pages_start, pages_end, len(prefix)))
 
-    progress_text = progress_match.group(1)
+    return items
 
-    # Парсить каждую строку чеклиста
-    for line in progress_text.split('\n'):
-        # Формат: "- [x] Название [w:123]" или "- [ ] Название [1-89]"
-        match = re.match(r'^(\s*)-\s*\[([ xX])\]\s*(.+)$', line)
-        if not match:
-            continue
 
-        indent = len(match.group(1))
-        completed = match.group(2).lower() == 'x'
-        title_part = match.group(3).strip()
-
-        # Извлечь вес [w:N]
-        weight = None
-        weight_match = re.search(r'\[w:(\d+)\]', title_part)
-        if weight_match:
-            weight = int(weight_match.group(1))
-            title_part = re.sub(r'\s*\[w:\d+\]', '', title_part)
-
-        # Извлечь диапазон страниц [N-M]
-        pages_start = None
-        pages_end = None
-        pages_match = re.search(r'\[(\d+)-(\d+)\]', title_part)
-        if pages_match:
-            pages_start = int(pages_match.group(1))
-            pages_end = int(pages_match.group(2))
-            title_part = re.sub(r'\s*\[\d+-\d+\]', '', title_part)
-
-        items.append(ProgressItem(
-            title=title_part.strip(),
-            completed=completed,
-            weight=weight,
-            pages_start=pages_start,
-            pages_end=pages_end,
-            indent=indent,
-        ))
+def split_markers(title: str) -> tuple:
+    """(название, вес, начало, конец) для меток в любом месте названия.
 
-    return items
+    Берутся первые вес и диапазон страниц, все метки убираются.
+    """
+    weight = pages_start = pages_end = None
+    for marker in MARKER_PATTERN.finditer(title):
+        if marker.group(1) is not None:
+            if weight is None:
+                weight = int(marker.group(1))
+        elif pages_start is None:
+            pages_start, pages_end = int(marker.group(2)), int(marker.group(3))
+    if weight is not None or pages_start is not None:
+        title = MARKER_PATTERN.sub("", title)
+    return title, weight, pages_start, pages_end
+
+
+def build_tree(items: list[ProgressItem]) -> ProgressNode:
+    """Построить дерево оглавления по отступам.
+
+    Один проход со стеком открытых разделов: когда раздел закрывается,
+    его суммы добавляются к родителю, так что после прохода у каждого
+    раздела (и у корня — по всей книге) посчитаны суммы по поддереву.
+    """
+    root = ProgressNode(None, [], Totals())
+    stack = [(-1, root)]
+
+    def close():
+        _, node = stack.pop()
+        parent = stack[-1][1]
+        if node.totals is None:
+            parent.totals.add_item(node.item)
+        else:
+            node.totals.add_item(node.item)
+            parent.totals.merge(node.totals)
+
+    for item in items:
+        while stack[-1][0] >= item.indent:
+            close()
+        parent = stack[-1][1]
+        if parent.totals is None:
+            parent.totals = Totals()
+        node = ProgressNode(item, [])
+        parent.children.append(node)
+        stack.append((item.indent, node))
+    while len(stack) > 1:
+        close()
+    return root
 
 
 def get_total_pages(content: str) -> int | None:
     """Извлечь общее количество страниц из frontmatter."""
-    match = re.search(r'^total:\s*(\d+)', content, re.MULTILINE)
+    total = split_frontmatter(content)[0].get("total", "")
+    if total.isdigit():
+        return int(total)
+    # Старые заметки: строка total: N вне frontmatter
+    match = TOTAL_PATTERN.search(content)
     if match:
         return int(match.group(1))
     return None
 
 
+def percent(part: int, whole: int) -> float:
+    return round(part / whole * 100, 1) if whole else 0
+
+
+def choose_method(totals: Totals) -> str:
+    """Страницы приоритетнее весов, веса — пунктов."""
+    if totals.paged:
+        return "pages"
+    if totals.weighted and totals.weight > 0:
+        return "weight"
+    return "items"
+
+
+def section_progress(totals: Totals, method: str) -> float:
+    """Прогресс раздела тем же методом, что и у книги."""
+    if method == "pages":
+        return percent(totals.completed_pages, totals.pages)
+    if method == "weight":
+        return percent(totals.completed_weight, totals.weight)
+    return percent(totals.completed, totals.items)
+
+
 def calculate_progress(items: list[ProgressItem], total_pages: int | None = None) -> dict:
     """Рассчитать прогресс по книге.
 
@@ -99,6 +260,8 @@ def calculate_progress(items: list[ProgressItem], total_pages: int | None = None
     - progress_by_pages: процент по страницам (если есть)
     - progress: итоговый прогресс (лучший из доступных методов)
     - method: использованный метод (weight/pages/items)
+    - parts: прогресс верхнеуровневых разделов с вложенными пунктами
+      (если оглавление многоуровневое)
     """
     if not items:
         return {
@@ -109,56 +272,87 @@ def calculate_progress(items: list[ProgressItem], total_pages: int | None = None
             "method": "items",
         }
 
-    total_items = len(items)
-    completed_items = sum(1 for item in items if item.completed)
-    progress_by_items = round(completed_items / total_items * 100, 1)
+    tree = build_tree(items)
+    totals = tree.totals
+    method = choose_method(totals)
+    progress_by_items = percent(totals.completed, totals.items)
 
     result = {
-        "total_items": total_items,
-        "completed_items": completed_items,
+        "total_items": totals.items,
+        "completed_items": totals.completed,
         "progress_by_items": progress_by_items,
         "progress": progress_by_items,
-        "method": "items",
+        "method": method,
     }
 
     # Расчёт по весам
-    items_with_weight = [item for item in items if item.weight is not None]
-    if items_with_weight:
-        total_weight = sum(item.weight for item in items_with_weight)
-        completed_weight = sum(item.weight for item in items_with_weight if item.completed)
-        if total_weight > 0:
-            progress_by_weight = round(completed_weight / total_weight * 100, 1)
-            result["total_weight"] = total_weight
-            result["completed_weight"] = completed_weight
-            result["progress_by_weight"] = progress_by_weight
-            result["progress"] = progress_by_weight
-            result["method"] = "weight"
-
-    # Расчёт по страницам
-    items_with_pages = [item for item in items if item.pages_start is not None]
-    if items_with_pages:
-        completed_pages = sum(
-            item.pages_end - item.pages_start + 1
-            for item in items_with_pages
-            if item.completed
-        )
-        # Используем total из frontmatter или последнюю страницу
-        if total_pages:
-            progress_by_pages = round(completed_pages / total_pages * 100, 1)
-        else:
-            max_page = max(item.pages_end for item in items_with_pages)
-            progress_by_pages = round(completed_pages / max_page * 100, 1)
-
-        result["completed_pages"] = completed_pages
-        result["total_pages"] = total_pages or max(item.pages_end for item in items_with_pages)
-        result["progress_by_pages"] = progress_by_pages
-        # Страницы приоритетнее весов
-        result["progress"] = progress_by_pages
-        result["method"] = "pages"
+    if totals.weighted and totals.weight > 0:
+        progress_by_weight = percent(totals.completed_weight, totals.weight)
+        result["total_weight"] = totals.weight
+        result["completed_weight"] = totals.completed_weight
+        result["progress_by_weight"] = progress_by_weight
+        result["progress"] = progress_by_weight
+
+    # Расчёт по страницам: total из frontmatter или последняя страница
+    if totals.paged:
+        pages = total_pages or totals.max_page
+        result["completed_pages"] = totals.completed_pages
+        result["total_pages"] = pages
+        result["progress_by_pages"] = percent(totals.completed_pages, pages)
+        result["progress"] = result["progress_by_pages"]
+
+    # Прогресс по частям — суммы уже посчитаны при построении дерева
+    parts = [
+        {
+            "title": node.item.title,
+            "progress": section_progress(node.totals, method),
+            "completed_items": node.totals.completed,
+            "total_items": node.totals.items,
+        }
+        for node in tree.children if node.children
+    ]
+    if parts:
+        result["parts"] = parts
 
     return result
 
 
+def section_key(progress_text: str, total_pages: int | None) -> str:
+    """Ключ кэша результата: хэш секции Прогресс и total из frontmatter."""
+    digest = hashlib.blake2b(progress_text.encode("utf-8"), digest_size=16)
+    digest.update(str(total_pages).encode("ascii"))
+    return digest.hexdigest()
+
+
+def note_progress(content: str, sections: dict | None = None) -> tuple:
+    """(ключ секции, результат calculate_progress) для заметки.
+
+    sections — кэш {ключ: результат}; если секция с тем же содержимым
+    уже считалась, чеклист не разбирается.
+    """
+    progress_text = section_text(content, PROGRESS_SECTION) or ""
+    total_pages = get_total_pages(content)
+    key = section_key(progress_text, total_pages)
+    if sections and key in sections:
+        return key, sections[key]
+    return key, calculate_progress(parse_progress_text(progress_text), total_pages)
+
+
+def frontmatter_fields(result: dict) -> dict:
+    """Поля для Dataview: progress: 36.7, progressMethod: weight."""
+    return {"progress": str(result["progress"]), "progressMethod": result["method"]}
+
+
+def write_frontmatter(path: str, content: str, result: dict) -> bool:
+    """Записать прогресс во frontmatter, если он изменился; True — файл записан."""
+    fields = frontmatter_fields(result)
+    meta = split_frontmatter(content)[0]
+    if all(meta.get(key) == value for key, value in fields.items()):
+        return False
+    write_atomic(Path(path), set_frontmatter(content, fields))
+    return True
+
+
 def format_progress_human(result: dict) -> str:
     """Форматировать результат для человека."""
     lines = []
@@ -178,6 +372,187 @@ def format_progress_human(result: dict) -> str:
         lines.append(f"Прогресс: {progress}% (по главам)")
         lines.append(f"  Глав: {result['completed_items']}/{result['total_items']}")
 
+    parts = result.get("parts")
+    if parts:
+        done = sum(1 for part in parts if part["progress"] >= 100)
+        lines.append(f"  Частей: {done}/{len(parts)}")
+        # Длинное оглавление: только начатые, но не дочитанные части
+        if len(parts) > HUMAN_PARTS_LIMIT:
+            parts = [part for part in parts if 0 < part["progress"] < 100]
+        for part in parts:
+            lines.append(f"    {part['title']}: {part['progress']}%")
+
+    return "\n".join(lines)
+
+
+def book_summary(path: str, sections: dict | None = None) -> dict | None:
+    """Прогресс одной заметки для пакетного режима; None — это не книга.
+
+    Результат — в поле "result", ключ секции — в "section", текущие
+    значения полей прогресса во frontmatter — в "fields".
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        # Быстрая проверка до декодирования: без секции Прогресс это не книга
+        if PROGRESS_MARKER not in data:
+            return None
+        content = data.decode("utf-8")
+    except (OSError, UnicodeDecodeError) as e:
+        return {"error": str(e)}
+
+    meta = split_frontmatter(content)[0]
+    if "status" not in meta:
+        return None
+    key, result = note_progress(content, sections)
+    return {
+        "title": meta.get("title") or Path(path).stem,
+        "author": meta.get("author", "").strip("[]\"'"),
+        "status": meta["status"],
+        "section": key,
+        "fields": [meta.get(name) for name in frontmatter_fields(result)],
+        "result": result,
+    }
+
+
+def iter_notes(directory: Path):
+    """Все .md в папке и подпапках, кроме скрытых и служебных (_templates)."""
+    try:
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except OSError:
+        return
+    for entry in entries:
+        if entry.name.startswith((".", "_")):
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            yield from iter_notes(Path(entry.path))
+        elif entry.name.endswith(".md"):
+            yield entry
+
+
+def load_cache(cache_path: Path | None) -> tuple:
+    """(заметки, результаты по ключу секции) из файла кэша."""
+    try:
+        cache = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (AttributeError, OSError, ValueError):
+        return {}, {}
+    if cache.get("version") != CACHE_VERSION:
+        return {}, {}
+    return cache.get("files", {}), cache.get("sections", {})
+
+
+def save_cache(cache_path: Path, files: dict, sections: dict, keep: tuple = ()):
+    """Записать кэш; из sections остаются результаты заметок из files и ключи keep."""
+    used = {entry["book"].get("section") for entry in files.values() if entry["book"]}
+    used.update(keep)
+    sections = {key: value for key, value in sections.items() if key in used}
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_name(cache_path.name + ".tmp")
+        tmp.write_text(
+            json.dumps({"version": CACHE_VERSION, "files": files, "sections": sections}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp, cache_path)
+    except OSError:
+        pass  # кэш необязателен: папка только для чтения и т.п.
+
+
+def collect_progress(directory: Path, statuses: tuple | None = DEFAULT_STATUSES,
+                     jobs: int = 1, cache_path: Path | None = None,
+                     write_fields: bool = False) -> list:
+    """Прогресс всех книг в папке, по убыванию прогресса.
+
+    statuses=None — книги с любым статусом. Заметки, у которых mtime и
+    размер совпадают с кэшем, не перечитываются; у изменённых чеклист
+    разбирается, только если изменилась сама секция Прогресс. Разбор
+    идёт в пуле процессов, если заметок не меньше PARALLEL_THRESHOLD.
+    write_fields — обновить progress/progressMethod во frontmatter
+    выбранных книг, где значения устарели.
+    """
+    cached, sections = load_cache(cache_path)
+    files = {}
+    stale = []
+    previous = []  # прошлый результат каждой изменённой заметки: {ключ секции: результат} или None
+    for entry in iter_notes(directory):
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        signature = [st.st_mtime_ns, st.st_size]
+        hit = cached.get(entry.path)
+        book = hit and hit["book"]
+        if hit and hit["signature"] == signature and (book is None or book["section"] in sections):
+            files[entry.path] = hit
+        else:
+            files[entry.path] = {"signature": signature, "book": None}
+            stale.append(entry.path)
+            key = book and book.get("section")
+            previous.append({key: sections[key]} if key in sections else None)
+
+    # Каждой заметке — только её прошлый результат, а не весь кэш на каждую порцию пула
+    if jobs > 1 and len(stale) >= PARALLEL_THRESHOLD:
+        chunksize = max(1, len(stale) // (jobs * 4))
+        with futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+            summaries = list(pool.map(book_summary, stale, previous, chunksize=chunksize))
+    else:
+        summaries = list(map(book_summary, stale, previous))
+    for path, summary in zip(stale, summaries):
+        if summary and "result" in summary:
+            sections[summary["section"]] = summary.pop("result")
+        files[path]["book"] = summary
+
+    books = []
+    written = 0
+    for path, entry in files.items():
+        book = entry["book"]
+        if book is None:
+            continue
+        if "error" in book:
+            print(f"Ошибка чтения файла {path}: {book['error']}", file=sys.stderr)
+            continue
+        if statuses is not None and book["status"] not in statuses:
+            continue
+        result = sections[book["section"]]
+        if write_fields and book["fields"] != list(frontmatter_fields(result).values()):
+            try:
+                if write_frontmatter(path, read_note(path), result):
+                    written += 1
+                st = os.stat(path)
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"Ошибка записи файла {path}: {e}", file=sys.stderr)
+            else:
+                book["fields"] = list(frontmatter_fields(result).values())
+                entry["signature"] = [st.st_mtime_ns, st.st_size]
+        summary = {key: value for key, value in result.items() if key != "parts"}  # части — в режиме одной книги
+        books.append({"file": path, "title": book["title"], "author": book["author"],
+                      "status": book["status"], **summary})
+    books.sort(key=lambda book: (-book["progress"], book["title"]))
+    if written:
+        print(f"Обновлён frontmatter: {written}", file=sys.stderr)
+
+    if cache_path and (stale or written or files.keys() != cached.keys()):
+        live = {path: entry for path, entry in files.items()
+                if not (entry["book"] or {}).get("error")}  # ошибки чтения не кэшируем
+        save_cache(cache_path, live, sections)
+    return books
+
+
+METHOD_LABELS = {"weight": "по объёму", "pages": "по страницам", "items": "по главам"}
+
+
+def format_books_human(books: list) -> str:
+    """Сводка по книгам: одна строка на книгу."""
+    if not books:
+        return "Книги не найдены"
+    lines = []
+    for book in books:
+        author = f" — {book['author']}" if book["author"] else ""
+        lines.append(
+            f"{book['progress']:5.1f}%  {book['title']}{author} "
+            f"({METHOD_LABELS[book['method']]}, {book['completed_items']}/{book['total_items']} глав)"
+        )
     return "\n".join(lines)
 
 
@@ -185,15 +560,48 @@ def main():
     parser = argparse.ArgumentParser(
         description="Рассчитать прогресс чтения книги из markdown-файла"
     )
-    parser.add_argument("file", help="Путь к файлу заметки книги (.md)")
+    parser.add_argument("file", nargs="?",
+                        help="Путь к файлу заметки книги (.md) или к папке с книгами")
+    parser.add_argument("--all", action="store_true",
+                        help=f"Все книги в папке {BOOKS_DIR}/ vault (пакетный режим)")
+    parser.add_argument("--path", type=str,
+                        help="Корень vault: там лежат кэш и папка для --all (default: текущая папка)")
+    parser.add_argument("--status", default=",".join(DEFAULT_STATUSES),
+                        help="Статусы книг через запятую или all (default: reading)")
+    parser.add_argument("--jobs", type=int, default=0,
+                        help="Процессов для пакетного режима (default: по числу CPU)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"Не читать и не обновлять {CACHE_FILE}")
+    parser.add_argument("--write-frontmatter", action="store_true",
+                        help="Записать progress/progressMethod во frontmatter, если изменились")
     parser.add_argument("--format", choices=["json", "human"], default="human",
                         help="Формат вывода (default: human)")
 
     args = parser.parse_args()
+    vault = vault_path(args.path)
+    cache_path = None if args.no_cache else vault / CACHE_FILE
+
+    if args.all or (args.file and os.path.isdir(args.file)):
+        # Абсолютный путь: пути заметок — ключи кэша, общего для любой текущей папки
+        directory = Path(args.file).absolute() if args.file else vault.absolute() / BOOKS_DIR
+        statuses = None if args.status == "all" else tuple(s.strip() for s in args.status.split(","))
+        books = collect_progress(
+            directory, statuses,
+            jobs=args.jobs or os.cpu_count() or 1,
+            cache_path=cache_path,
+            write_fields=args.write_frontmatter,
+        )
+        if args.format == "json":
+            print(json.dumps(books, ensure_ascii=False, indent=2))
+        else:
+            print(format_books_human(books))
+        return
+
+    if not args.file:
+        parser.error("укажите файл книги, папку или --all")
 
     try:
-        with open(args.file, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = read_note(args.file)
     except FileNotFoundError:
         print(f"Файл не найден: {args.file}", file=sys.stderr)
         sys.exit(1)
@@ -201,13 +609,24 @@ def main():
         print(f"Ошибка чтения файла: {e}", file=sys.stderr)
         sys.exit(1)
 
-    items = parse_progress_section(content)
-    if not items:
+    if not args.path:
+        cache_path = None  # одна книга без --path: корень vault неизвестен, ничего не пишем
+    files, sections = load_cache(cache_path)
+    key, result = note_progress(content, sections)
+    if not result["total_items"]:
         print("Секция ## Прогресс не найдена или пуста", file=sys.stderr)
         sys.exit(1)
-
-    total_pages = get_total_pages(content)
-    result = calculate_progress(items, total_pages)
+    if cache_path and key not in sections:
+        sections[key] = result
+        save_cache(cache_path, files, sections, keep=(key,))
+
+    if args.write_frontmatter:
+        try:
+            if write_frontmatter(args.file, content, result):
+                print("Обновлён frontmatter", file=sys.stderr)
+        except OSError as e:
+            print(f"Ошибка записи файла: {e}", file=sys.stderr)
+            sys.exit(1)
 
     if args.format == "json":
         print(json.dumps(result, ensure_ascii=False, indent=2))
@@ -2,59 +2,390 @@
 """
 Скрипт для извлечения информации о книге.
 Источники: ЛитРес, Open Library, Google Books.
+
+Ответы источников кэшируются в .claude/books-http-cache/ (от текущей
+папки, обычно корня vault): ЛитРес — 30 дней, Open Library — 7,
+Google Books — 1; «не найдено» (404) — 1 день. Устаревшая запись
+проверяется условным запросом (ETag / Last-Modified) и при ответе 304
+не скачивается заново. --offline — только из кэша, без сети.
+
+Источники опрашиваются одновременно, а побеждает первый по приоритету
+(ЛитРес, Open Library, Google Books), который что-то нашёл: ответ
+возвращается, как только известны результаты всех источников выше
+него. Общее время ограничено --deadline; --sequential — по очереди,
+как раньше.
+
+Пакетный импорт: --batch FILE (или - для stdin) — по книге на строку,
+в виде аргументов (`--isbn 9781455586691`, `--litres-id 48514275`) или
+JSON-объекта ({"title": "Deep Work"}). Книги обрабатываются пулом из
+--jobs потоков, одинаковые запросы — один раз, частота запросов к
+каждому хосту ограничена; результаты выводятся NDJSON по мере готовности:
+    {"line": 1, "query": {...}, "found": true, "source": {"metadata": ..., "toc": ...},
+     "metadata": {...}, "toc": [...], "preview": null, "seconds": 0.4}
 """
 
 import argparse
 import json
-import re
+import queue
+import shlex
 import sys
-import urllib.request
+import threading
+import time
 import urllib.parse
+import xml.parsers.expat as expat
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from html import unescape
+from pathlib import Path
+
+from bookhttp import (DEFAULT_BREAKER_PATH, DEFAULT_CACHE_DIR, TRANSIENT_STATUSES, CircuitBreaker, FixtureStore,
+                      HostRateLimiter, HttpCache, HttpClient, RecordingClient, ReplayClient, RetryPolicy,
+                      StandInClient, is_transient)
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36"
 }
 
+# Один клиент на процесс: соединения с хостом переиспользуются между
+# запросами (поиск и запись Open Library, повторные запросы к ЛитРес).
+# --record/--replay подменяют его обёрткой из bookhttp.replay
+CLIENT = HttpClient(HEADERS)
+
+# Кэш ответов; None — без кэша. Настраивается в main()
+CACHE: HttpCache | None = None
+
+# Повторы временных сбоев и недоступные хосты; None — без размыкателя.
+# Настраиваются в main()
+RETRY = RetryPolicy()
+BREAKER: CircuitBreaker | None = None
+
+DEFAULT_TIMEOUT = 15  # секунд на один запрос
+DEFAULT_DEADLINE = 20  # секунд на весь поиск по всем источникам
+DEFAULT_JOBS = 8  # потоков в пакетном режиме
+
+# Сообщения о ходе поиска; в пакетном режиме выключены
+VERBOSE = True
+
+# Поток источника: stop — Event, который выставляется, когда победитель
+# известен, и проигравшие больше не начинают запросов; deadline — момент
+# (time.monotonic()), после которого запросы и повторы не начинаются;
+# failed — источник не получил ответ из-за сбоя, а не потому, что книги нет;
+# hosts — {хост: был сбой} запросов источника и его вложенных поисков:
+# размыкатель получает по одному сбою на хост, когда источник закончил
+_lookup = threading.local()
+
+
+class StopEvent(threading.Event):
+    """stop поиска; set() выставляет и stop вложенных поисков (link)."""
+
+    def __init__(self):
+        super().__init__()
+        self._children = []
+        self._children_lock = threading.Lock()
 
-def fetch_url(url: str, timeout: int = 15) -> str | None:
-    """Загрузить страницу по URL (с редиректами)."""
+    def link(self, child: threading.Event):
+        with self._children_lock:
+            self._children.append(child)
+            stopped = self.is_set()
+        if stopped:
+            child.set()
+
+    def set(self):
+        super().set()
+        with self._children_lock:
+            children, self._children = self._children, []
+        for child in children:
+            child.set()
+
+
+# URL, которые сейчас загружаются: второй поток с тем же URL ждёт первый
+_inflight = {}
+_inflight_lock = threading.Lock()
+INFLIGHT_POLL = 0.05  # секунд между проверками stop, пока ждём чужую загрузку
+
+
+def log(message: str):
+    if VERBOSE:
+        print(message, file=sys.stderr)
+
+
+def fetch_url(url: str, timeout: float = DEFAULT_TIMEOUT, parser=None):
+    """Загрузить страницу по URL (с редиректами), через кэш ответов.
+
+    Без parser возвращает текст. parser — класс потокового разборщика
+    (feed(bytes) -> True, когда данных достаточно; close() -> результат):
+    тело подаётся ему по мере чтения, загрузка обрывается, как только
+    он закончил, и возвращается результат close(). None — не удалось.
+    Одновременные запросы одного URL из разных потоков выполняются
+    один раз; ждущий поток сдаётся, когда истёк его срок поиска или
+    выставлен его stop. Временные сбои повторяются по RETRY, пока не
+    истёк срок поиска; хосты с разомкнутой цепью (BREAKER) пропускаются
+    без запроса.
+    """
+    stop = getattr(_lookup, "stop", None)
+    if stop is not None and stop.is_set():
+        return None
+    with _inflight_lock:
+        waiter = _inflight.get(url)
+        if waiter is None:
+            _inflight[url] = flight = [threading.Event(), None]
+    if waiter is not None:
+        return waiter[1] if wait_for_flight(waiter[0]) else None
     try:
-        req = urllib.request.Request(url, headers=HEADERS)
-        with urllib.request.urlopen(req, timeout=timeout) as response:
-            # Следуем редиректам вручную если нужно
-            final_url = response.geturl()
-            if final_url != url:
-                req = urllib.request.Request(final_url, headers=HEADERS)
-                with urllib.request.urlopen(req, timeout=timeout) as response2:
-                    return response2.read().decode("utf-8", errors="ignore")
-            return response.read().decode("utf-8", errors="ignore")
-    except Exception as e:
-        print(f"Ошибка загрузки {url}: {e}", file=sys.stderr)
+        flight[1] = _fetch_url(url, timeout, parser)
+        return flight[1]
+    finally:
+        with _inflight_lock:
+            del _inflight[url]
+        flight[0].set()
+
+
+def wait_for_flight(done: threading.Event) -> bool:
+    """Дождаться загрузки из другого потока; False — срок поиска вышел или stop."""
+    stop = getattr(_lookup, "stop", None)
+    deadline = getattr(_lookup, "deadline", None)
+    while True:
+        wait = INFLIGHT_POLL if stop is not None else None
+        if deadline:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                _lookup.failed = True  # как и таймаут собственного запроса
+                return False
+            wait = min(wait, remaining) if wait else remaining
+        if done.wait(wait):
+            return True
+        if stop is not None and stop.is_set():
+            return False
+
+
+def _fetch_url(url: str, timeout: float, parser):
+    def deliver(body: bytes | None):
+        if body is None:
+            return None
+        if parser is None:
+            return body.decode("utf-8", errors="ignore")
+        consumer = parser()
+        consumer.feed(body)
+        return consumer.close()
+
+    entry = CACHE.get(url) if CACHE else None
+    if entry and (entry.is_fresh() or CACHE.offline):
+        return deliver(entry.body)
+    if CACHE and CACHE.offline:
+        log(f"Нет в кэше (--offline): {url}")
+        return None
+
+    result = request_with_retries(url, timeout, parser, entry)
+    if result is not None:
+        consumer, response = result
+        if response.status == 200:
+            # Если разборщик остановил чтение, в кэш попадает прочитанное начало
+            if CACHE:
+                CACHE.put(url, 200, response.body, response.headers)
+            return consumer.close() if consumer else deliver(response.body)
+        if response.status == 304 and entry:
+            return deliver(CACHE.revalidated(entry, response.headers).body)
+        if response.status == 404 and CACHE:
+            CACHE.put(url, 404, headers=response.headers)
+        print(f"Ошибка загрузки {url}: HTTP {response.status}", file=sys.stderr)
+        if response.status in TRANSIENT_STATUSES:
+            _lookup.failed = True
+    else:
+        _lookup.failed = True
+    if entry and entry.body is not None:
+        # Источник недоступен: лучше устаревший ответ, чем никакого
+        print(f"Использую устаревшую копию из кэша: {url}", file=sys.stderr)
+        return deliver(entry.body)
+    return None
+
+
+def request_with_retries(url: str, timeout: float, parser, entry) -> tuple | None:
+    """(разборщик или None, ответ) с повторами временных сбоев.
+
+    None — ответа нет: сетевая ошибка, хост недоступен или срок вышел.
+    Ответ с временным статусом (503 и т.п.) после последней попытки
+    возвращается как есть. Сбой хоста засчитывается, когда повторы
+    кончились, — в поиске источника один раз за весь поиск (run_lookup);
+    429 и таймаут запроса, укороченного остатком срока поиска, хост не
+    винят.
+    """
+    host = urllib.parse.urlsplit(url).hostname
+    stop = getattr(_lookup, "stop", None)
+    deadline = getattr(_lookup, "deadline", None)
+    headers = entry.validators() if entry else None
+
+    if BREAKER and not BREAKER.allow(host):
+        retry_at = time.strftime("%H:%M", time.localtime(BREAKER.retry_at(host)))
+        print(f"{host} недоступен, пропускаю до {retry_at}: {url}", file=sys.stderr)
+        return None
+
+    consumer = response = None
+    host_failed = stopped = False
+    for attempt in range(max(1, RETRY.attempts)):
+        remaining = deadline - time.monotonic() if deadline else timeout
+        if remaining <= 0:
+            log(f"Время поиска истекло: {url}")
+            break
+
+        request_timeout = min(timeout, remaining)
+        consumer = parser() if parser else None
+        retry_after = None
+        try:
+            response = CLIENT.get(url, headers=headers, timeout=request_timeout,
+                                  consume=consumer.feed if consumer else None)
+        except Exception as e:
+            print(f"Ошибка загрузки {url}: {e}", file=sys.stderr)
+            if not is_transient(e):
+                if BREAKER:
+                    BREAKER.release(host)
+                return None
+            response = None
+            # Не успел за остаток срока поиска — хост мог бы ответить за полный таймаут
+            host_failed |= not (isinstance(e, TimeoutError) and request_timeout < timeout)
+        else:
+            if response.status not in TRANSIENT_STATUSES:
+                if BREAKER:
+                    BREAKER.success(host)
+                hosts = getattr(_lookup, "hosts", None)
+                if hosts is not None:
+                    hosts[host] = False  # хост отвечает: сбои других запросов поиска ему не в счёт
+                return consumer, response
+            retry_after = response.headers.get("Retry-After")
+            host_failed |= response.status != 429  # 429 — хост жив, просто просит помедленнее
+
+        if attempt + 1 >= RETRY.attempts:
+            break
+        delay = RETRY.delay(attempt, retry_after)
+        if deadline and time.monotonic() + delay >= deadline:
+            break
+        log(f"Повтор через {delay:.1f} с: {url}")
+        if stop is not None:
+            if stop.wait(delay):
+                stopped = True
+                break
+        else:
+            time.sleep(delay)
+
+    if BREAKER:
+        charged = host_failed and not stopped
+        hosts = getattr(_lookup, "hosts", None)
+        if charged and hosts is None:
+            BREAKER.failure(host)
+        else:
+            if charged:
+                hosts.setdefault(host, True)  # засчитает run_lookup
+            BREAKER.release(host)
+    if stopped or response is None:
         return None
+    return consumer, response
 
 
 # ==================== ЛитРес ====================
 
-def fetch_litres_xml(book_id: str) -> str | None:
-    """Загрузить XML с ЛитРес."""
-    server_num = book_id[-2] if len(book_id) >= 2 else "0"
-    url = f"https://cv{server_num}.litres.ru/pub/c/cover/{book_id}.xml"
-    return fetch_url(url)
+class LitresToc:
+    """Потоковый разбор XML оглавления ЛитРес.
+
+    Байты подаются кусками через feed() прямо из ответа; разбор идёт
+    expat, так что порядок атрибутов и сущности (&amp;, &#171;, &nbsp;)
+    не важны. После </toc> feed() возвращает True — остаток ответа
+    можно не читать. Веса глав считаются по ходу разбора.
+
+    Атрибут id — позиция главы в электронной книге; разница между id
+    соседних глав даёт относительный вес (объём) главы.
+    """
+
+    def __init__(self):
+        self.full_title = None  # текст первого toc-item с deep="0": "Автор. Название"
+        self.chapters = []
+        self.has_toc = False
+        self.done = False
+        self._stack = []  # открытые toc-item: [атрибуты, куски текста, есть ли вложенные]
+        self._weights = 0
+        self._parser = expat.ParserCreate()
+        self._parser.UseForeignDTD(True)  # неизвестные сущности — в SkippedEntityHandler
+        self._parser.StartElementHandler = self._start
+        self._parser.EndElementHandler = self._end
+        self._parser.CharacterDataHandler = self._text
+        self._parser.SkippedEntityHandler = self._entity
+
+    def feed(self, data: bytes | str) -> bool:
+        """Разобрать очередной кусок; True — оглавление прочитано целиком."""
+        if not self.done:
+            try:
+                self._parser.Parse(data, False)
+            except expat.ExpatError:
+                self.done = True  # после </toc> — не наше дело, до него — битый XML
+        return self.done
+
+    def close(self) -> "LitresToc":
+        """Конец данных: вес последней главы — средний по остальным."""
+        if self.chapters and "weight" not in self.chapters[-1]:
+            avg_weight = self._weights // max(len(self.chapters) - 1, 1)
+            self.chapters[-1]["weight"] = avg_weight if avg_weight > 0 else 100
+        return self
+
+    def _start(self, name: str, attrs: dict):
+        if name == "toc":
+            self.has_toc = True
+        elif name == "toc-item":
+            if self._stack:
+                self._stack[-1][2] = True
+            self._stack.append([attrs, [], False])
+
+    def _text(self, data: str):
+        if self._stack:
+            self._stack[-1][1].append(data)
+
+    def _entity(self, name: str, is_parameter: bool):
+        # HTML-сущности, которых нет в XML
+        self._text(unescape(f"&{name};"))
+
+    def _end(self, name: str):
+        if name == "toc":
+            self.done = True
+        elif name == "toc-item" and self._stack:
+            attrs, text, nested = self._stack.pop()
+            if not nested:  # только листья: у раздела с вложенными свой текст не название
+                self._item(attrs.get("deep", ""), attrs.get("id", ""), "".join(text).strip())
 
+    def _item(self, deep: str, item_id: str, title: str):
+        if deep == "0":
+            # Автор и название в первом toc-item с deep="0"
+            if self.full_title is None:
+                self.full_title = title
+            return
+        if not (title and deep.isdigit() and item_id.isdigit()):
+            return
+        chapter = {"title": title, "deep": int(deep), "id": int(item_id)}
+        if self.chapters:
+            previous = self.chapters[-1]
+            previous["weight"] = chapter["id"] - previous["id"]
+            self._weights += previous["weight"]
+        self.chapters.append(chapter)
 
-def extract_litres_metadata(xml: str, book_id: str) -> dict | None:
-    """Извлечь метаданные книги из XML ЛитРес."""
+
+def parse_litres_xml(xml: bytes | str | None) -> LitresToc | None:
+    """Разобрать XML ЛитРес, уже загруженный целиком."""
     if not xml:
         return None
+    toc = LitresToc()
+    toc.feed(xml)
+    return toc.close()
 
-    # Автор и название в первом toc-item с deep="0"
-    # Формат: "Автор. Название книги"
-    title_match = re.search(r'<toc-item[^>]*deep="0"[^>]*>([^<]+)</toc-item>', xml)
-    if not title_match:
+
+def fetch_litres_toc(book_id: str) -> LitresToc | None:
+    """Загрузить и разобрать XML с ЛитРес, не читая ответ дальше </toc>."""
+    server_num = book_id[-2] if len(book_id) >= 2 else "0"
+    url = f"https://cv{server_num}.litres.ru/pub/c/cover/{book_id}.xml"
+    return fetch_url(url, parser=LitresToc)
+
+
+def extract_litres_metadata(toc: LitresToc | None, book_id: str) -> dict | None:
+    """Извлечь метаданные книги из разобранного XML ЛитРес."""
+    if not toc or not toc.full_title:
         return None
 
-    full_title = unescape(title_match.group(1).strip())
+    # Формат: "Автор. Название книги"
+    full_title = toc.full_title
 
     # Разделяем автора и название по первой точке с пробелом
     parts = full_title.split(". ", 1)
@@ -81,39 +412,11 @@ def extract_litres_metadata(xml: str, book_id: str) -> dict | None:
     }
 
 
-def extract_litres_toc(xml: str) -> list[dict] | None:
-    """Извлечь оглавление из XML ЛитРес с весами глав.
-
-    Атрибут id в XML — это позиция в электронной книге.
-    Разница между id соседних глав даёт относительный вес (объём) главы.
-    """
-    if not xml or "<toc>" not in xml:
-        return None
-
-    chapters = []
-    # Парсим deep, id и title
-    for match in re.finditer(
-        r'<toc-item[^>]*deep="(\d+)"[^>]*id="(\d+)"[^>]*>([^<]+)</toc-item>', xml
-    ):
-        deep = int(match.group(1))
-        item_id = int(match.group(2))
-        title = unescape(match.group(3).strip())
-        if title and deep > 0:
-            chapters.append({"title": title, "deep": deep, "id": item_id})
-
-    if not chapters:
+def extract_litres_toc(toc: LitresToc | None) -> list[dict] | None:
+    """Оглавление ЛитРес с весами глав: [{title, deep, id, weight}]."""
+    if not toc or not toc.has_toc or not toc.chapters:
         return None
-
-    # Рассчитываем веса как разницу между id соседних глав
-    for i, ch in enumerate(chapters):
-        if i + 1 < len(chapters):
-            ch["weight"] = chapters[i + 1]["id"] - ch["id"]
-        else:
-            # Последняя глава — используем среднее или фиксированное значение
-            avg_weight = sum(c.get("weight", 0) for c in chapters[:-1]) // max(len(chapters) - 1, 1)
-            ch["weight"] = avg_weight if avg_weight > 0 else 100
-
-    return chapters
+    return toc.chapters
 
 
 def format_litres_toc(chapters: list[dict], include_weights: bool = True) -> list[str]:
@@ -136,31 +439,14 @@ def format_litres_toc(chapters: list[dict], include_weights: bool = True) -> lis
 
 # ==================== Open Library ====================
 
-def fetch_open_library(isbn: str = None, title: str = None) -> dict | None:
-    """Поиск книги в Open Library API."""
-    if isbn:
-        url = f"https://openlibrary.org/isbn/{isbn}.json"
-    elif title:
-        search_url = f"https://openlibrary.org/search.json?title={urllib.parse.quote(title)}&limit=1"
-        html = fetch_url(search_url)
-        if not html:
-            return None
-        try:
-            data = json.loads(html)
-            if data.get("docs"):
-                key = data["docs"][0].get("key")
-                if key:
-                    url = f"https://openlibrary.org{key}.json"
-                else:
-                    return None
-            else:
-                return None
-        except Exception:
-            return None
-    else:
-        return None
+OPEN_LIBRARY_FIELDS = "key,cover_edition_key,edition_key"  # только то, что нужно для выбора изданий
+OPEN_LIBRARY_DOCS = 3  # результатов поиска
+OPEN_LIBRARY_EDITIONS = 6  # изданий, запрашиваемых одновременно
 
-    html = fetch_url(url)
+
+def fetch_open_library_json(path: str) -> dict | None:
+    """Запись Open Library по ключу (/books/OL…M, /works/OL…W, /isbn/…)."""
+    html = fetch_url(f"https://openlibrary.org{path}.json")
     if html:
         try:
             return json.loads(html)
@@ -169,6 +455,59 @@ def fetch_open_library(isbn: str = None, title: str = None) -> dict | None:
     return None
 
 
+def open_library_candidates(docs: list) -> list[str]:
+    """Ключи записей, где стоит искать оглавление, в порядке приоритета.
+
+    Оглавление в Open Library почти всегда у издания, а не у работы:
+    сначала издания с обложкой, потом остальные издания найденных работ
+    (не больше OPEN_LIBRARY_EDITIONS), последней — сама лучшая работа.
+    """
+    covers, editions = [], []
+    for doc in docs:
+        if doc.get("cover_edition_key"):
+            covers.append(f"/books/{doc['cover_edition_key']}")
+        editions.extend(f"/books/{olid}" for olid in doc.get("edition_key") or [])
+    candidates = list(dict.fromkeys(covers + editions))[:OPEN_LIBRARY_EDITIONS]
+    if docs and docs[0].get("key"):
+        candidates.append(docs[0]["key"])
+    return candidates
+
+
+def fetch_open_library(isbn: str = None, title: str = None) -> dict | None:
+    """Поиск книги в Open Library API.
+
+    По названию: поиск, затем одним раундом одновременно запрашиваются
+    издания-кандидаты, и берётся первое по приоритету с оглавлением.
+    """
+    if isbn:
+        return fetch_open_library_json(f"/isbn/{isbn}")
+    if not title:
+        return None
+
+    search_url = (f"https://openlibrary.org/search.json?title={urllib.parse.quote(title)}"
+                  f"&fields={OPEN_LIBRARY_FIELDS}&limit={OPEN_LIBRARY_DOCS}")
+    html = fetch_url(search_url)
+    if not html:
+        return None
+    try:
+        docs = json.loads(html).get("docs") or []
+    except Exception:
+        return None
+
+    def with_toc(key):
+        data = fetch_open_library_json(key)
+        return data if data and extract_toc_from_open_library(data) else None
+
+    lookups = [(key, lambda key=key: with_toc(key)) for key in open_library_candidates(docs)]
+    deadline = getattr(_lookup, "deadline", None)
+    remaining = max(0.1, deadline - time.monotonic()) if deadline else DEFAULT_DEADLINE
+    timings = {}
+    _, data = first_found(lookups, remaining, timings=timings)
+    if not data and any(timing["status"] in ("error", "timeout") for timing in timings.values()):
+        _lookup.failed = True  # оглавление могло быть в издании, которое не загрузилось
+    return data
+
+
 def extract_toc_from_open_library(data: dict) -> list[str] | None:
     """Извлечь оглавление из данных Open Library."""
     toc = data.get("table_of_contents")
@@ -246,6 +585,13 @@ def format_metadata_json(meta: dict) -> str:
     return json.dumps(meta, ensure_ascii=False, indent=2)
 
 
+def format_timings(timings: dict) -> str:
+    """Строка для stderr: сколько ответа ждали от каждого источника."""
+    return "Источники: " + ", ".join(
+        f"{name} — {timing['status']}, {timing['seconds']:.2f} с" for name, timing in timings.items()
+    )
+
+
 def format_metadata_yaml(meta: dict) -> str:
     """Форматировать метаданные как YAML frontmatter."""
     lines = ["---"]
@@ -275,8 +621,307 @@ def format_metadata_yaml(meta: dict) -> str:
     return "\n".join(lines)
 
 
+# ==================== Выбор источника ====================
+
+def litres_metadata(book_id: str) -> dict | None:
+    log(f"Загружаю метаданные с ЛитРес (ID: {book_id})...")
+    return extract_litres_metadata(fetch_litres_toc(book_id), book_id)
+
+
+def litres_toc(book_id: str, include_weights: bool) -> list[str] | None:
+    log(f"Загружаю с ЛитРес (ID: {book_id})...")
+    chapters = extract_litres_toc(fetch_litres_toc(book_id))
+    return format_litres_toc(chapters, include_weights=include_weights) if chapters else None
+
+
+def open_library_toc(isbn: str = None, title: str = None) -> list[str] | None:
+    log("Ищу в Open Library...")
+    data = fetch_open_library(isbn=isbn, title=title)
+    return extract_toc_from_open_library(data) if data else None
+
+
+def google_metadata(isbn: str = None, title: str = None) -> dict | None:
+    log("Ищу в Google Books...")
+    return extract_google_metadata(fetch_google_books(isbn=isbn, title=title))
+
+
+def google_preview(isbn: str = None, title: str = None) -> str | None:
+    """Ссылка на превью Google Books — оглавления там нет, только подсказка."""
+    log("Ищу в Google Books...")
+    data = fetch_google_books(isbn=isbn, title=title)
+    return data.get("previewLink") if data else None
+
+
+def run_lookup(lookup, hosts: dict | None = None) -> tuple:
+    """(результат, статус, секунды).
+
+    Статус: found — найдено, empty — источник ответил, но книги нет,
+    error — источник не ответил (сбой, хост недоступен, срок вышел).
+    hosts — сбои хостов внешнего поиска, если это вложенный поиск; иначе
+    сбои собираются здесь и по окончании засчитываются BREAKER по одному
+    на хост, который за весь поиск ни разу не ответил.
+    """
+    start = time.monotonic()
+    _lookup.failed = False
+    outer = getattr(_lookup, "hosts", None)
+    _lookup.hosts = {} if hosts is None else hosts
+    try:
+        result = lookup()
+    except Exception as e:
+        print(f"Ошибка источника: {e}", file=sys.stderr)
+        result, status = None, "error"
+    else:
+        status = "found" if result else "error" if _lookup.failed else "empty"
+    finally:
+        # list() — снимок: проигравшие вложенные поиски ещё могут дописывать
+        failed = [host for host, failure in list(_lookup.hosts.items()) if failure]
+        _lookup.hosts = outer
+    if hosts is None and BREAKER:
+        for host in failed:
+            BREAKER.failure(host)
+    return result, status, round(time.monotonic() - start, 3)
+
+
+def first_found(lookups: list, deadline: float | None = None, sequential: bool = False,
+                timings: dict | None = None) -> tuple:
+    """(имя, результат) первого по приоритету источника, который что-то нашёл.
+
+    lookups — [(имя, функция без аргументов)] в порядке приоритета;
+    функция возвращает None, если источник ничего не нашёл. Источники
+    запускаются одновременно в фоновых потоках; ответ готов, как только
+    все источники выше победителя закончили ни с чем. Потоки
+    проигравших не ждём: они daemon и, когда победитель известен, не
+    начинают новых запросов. Через deadline секунд новые запросы и
+    повторы не начинаются, и возвращается лучший из уже полученных
+    результатов. (None, None) — ничего не найдено.
+
+    timings — словарь, куда записывается {имя: {"status", "seconds"}}
+    по каждому источнику; кроме статусов run_lookup, timeout — не
+    успел к сроку, skipped — не понадобился. Вызванный из источника
+    внешнего поиска (издания Open Library) поиск останавливается вместе
+    с ним.
+    """
+    timings = {} if timings is None else timings
+    end = time.monotonic() + deadline if deadline else None
+    hosts = getattr(_lookup, "hosts", None)  # вложенный поиск: сбои засчитает внешний
+
+    if sequential:
+        _lookup.deadline = end
+        try:
+            winner = None, None
+            for name, lookup in lookups:
+                if winner[0] or (end and time.monotonic() >= end):
+                    timings[name] = {"status": "skipped" if winner[0] else "timeout", "seconds": 0}
+                    continue
+                result, status, seconds = run_lookup(lookup, hosts)
+                timings[name] = {"status": status, "seconds": seconds}
+                if result:
+                    winner = name, result
+            return winner
+        finally:
+            _lookup.deadline = None
+
+    results = queue.Queue()
+    stop = StopEvent()
+    parent = getattr(_lookup, "stop", None)
+    if parent is not None:
+        parent.link(stop)  # внешний поиск нашёл победителя — этот больше не нужен
+    start = time.monotonic()
+
+    def run(index, lookup):
+        _lookup.stop = stop
+        _lookup.deadline = end
+        results.put((index, *run_lookup(lookup, hosts)))
+
+    for index, (_, lookup) in enumerate(lookups):
+        threading.Thread(target=run, args=(index, lookup), daemon=True).start()
+
+    finished = {}
+
+    def report(unfinished: str) -> None:
+        for index, (name, _) in enumerate(lookups):
+            if index in finished:
+                _, status, seconds = finished[index]
+                timings[name] = {"status": status, "seconds": seconds}
+            else:
+                timings[name] = {"status": unfinished, "seconds": round(time.monotonic() - start, 3)}
+
+    while True:
+        # Победитель — первый найденный результат, выше которого все закончили
+        for index, (name, _) in enumerate(lookups):
+            if index not in finished:
+                break
+            if finished[index][0]:
+                stop.set()
+                report("skipped")
+                return name, finished[index][0]
+        else:
+            report("skipped")
+            return None, None  # все закончили ни с чем
+
+        timeout = max(0, end - time.monotonic()) if end else None
+        try:
+            index, *outcome = results.get(timeout=timeout)
+        except queue.Empty:
+            break
+        finished[index] = outcome
+        if stop.is_set():
+            report("skipped")
+            return None, None
+
+    stop.set()
+    log(f"Время поиска истекло ({deadline} с)")
+    report("timeout")
+    for index, (name, _) in enumerate(lookups):
+        if index in finished and finished[index][0]:
+            return name, finished[index][0]
+    return None, None
+
+
+def info_lookups(isbn: str = None, title: str = None, litres_id: str = None) -> list:
+    """Источники метаданных в порядке приоритета."""
+    lookups = []
+    # 1. ЛитРес
+    if litres_id:
+        lookups.append(("ЛитРес", lambda: litres_metadata(litres_id)))
+    # 2. Google Books (fallback)
+    if isbn or title:
+        lookups.append(("Google Books", lambda: google_metadata(isbn, title)))
+    return lookups
+
+
+def toc_lookups(isbn: str = None, title: str = None, litres_id: str = None,
+                include_weights: bool = True) -> list:
+    """Источники оглавления в порядке приоритета."""
+    lookups = []
+    # 1. ЛитРес
+    if litres_id:
+        lookups.append(("ЛитРес", lambda: litres_toc(litres_id, include_weights)))
+    # 2. Open Library
+    if isbn or title:
+        lookups.append(("Open Library", lambda: open_library_toc(isbn, title)))
+    # 3. Google Books — только для превью
+    if isbn or title:
+        lookups.append(("Google Books", lambda: google_preview(isbn, title)))
+    return lookups
+
+
+# ==================== Пакетный режим ====================
+
+BATCH_FIELDS = ("isbn", "title", "litres_id")
+
+
+def parse_batch_line(line: str) -> dict:
+    """Запрос из строки: JSON-объект или аргументы --isbn/--title/--litres-id."""
+    if line.startswith("{"):
+        data = json.loads(line)
+        if not isinstance(data, dict):
+            raise ValueError("ожидается JSON-объект")
+        data = {key.replace("-", "_"): value for key, value in data.items()}
+    else:
+        words = shlex.split(line)
+        data = {}
+        while words:
+            option = words.pop(0)
+            key = option.lstrip("-").replace("-", "_")
+            if not option.startswith("--") or key not in BATCH_FIELDS or not words:
+                raise ValueError(f"непонятный аргумент: {option}")
+            data[key] = words.pop(0)
+    query = {key: str(data[key]).strip() for key in BATCH_FIELDS if data.get(key)}
+    if not query:
+        raise ValueError("нужен isbn, title или litres_id")
+    return query
+
+
+def read_batch(path: str) -> list:
+    """[(номер строки, запрос)]; пустые строки и # комментарии пропускаются."""
+    text = sys.stdin.read() if path == "-" else Path(path).read_text(encoding="utf-8")
+    entries = []
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            entries.append((number, parse_batch_line(line)))
+        except ValueError as e:
+            raise ValueError(f"строка {number}: {e}") from None
+    return entries
+
+
+def query_key(query: dict) -> tuple:
+    """Одинаковые книги, записанные по-разному, дают один ключ."""
+    return (
+        query.get("isbn", "").replace("-", "").replace(" ", ""),
+        " ".join(query.get("title", "").casefold().split()),
+        query.get("litres_id", ""),
+    )
+
+
+def resolve_book(query: dict, include_weights: bool = True, deadline: float | None = DEFAULT_DEADLINE,
+                 sequential: bool = False) -> dict:
+    """Метаданные и оглавление одной книги; XML ЛитРес загружается один раз.
+
+    deadline ограничивает оба поиска вместе.
+    """
+    start = time.monotonic()
+    timings = {"metadata": {}, "toc": {}}
+    isbn, title, litres_id = (query.get(key) for key in BATCH_FIELDS)
+    meta_source, meta = first_found(info_lookups(isbn, title, litres_id), deadline, sequential,
+                                    timings["metadata"])
+    remaining = max(0.1, deadline - (time.monotonic() - start)) if deadline else None
+    toc_source, found = first_found(toc_lookups(isbn, title, litres_id, include_weights), remaining, sequential,
+                                    timings["toc"])
+    preview = found if toc_source == "Google Books" else None
+    toc = found if toc_source and not preview else None
+    return {
+        "found": bool(meta or toc),
+        "source": {"metadata": meta_source, "toc": toc_source if toc else None},
+        "metadata": meta,
+        "toc": toc,
+        "preview": preview,
+        "seconds": round(time.monotonic() - start, 3),
+        "timings": timings,
+    }
+
+
+def run_batch(entries: list, jobs: int = DEFAULT_JOBS, out=None, **options) -> int:
+    """Обработать запросы пулом потоков, печатая NDJSON по мере готовности.
+
+    Возвращает число книг, по которым ничего не найдено.
+    """
+    out = out or sys.stdout
+    groups = {}
+    for number, query in entries:
+        groups.setdefault(query_key(query), []).append((number, query))
+
+    missing = 0
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        pending = {pool.submit(resolve_book, group[0][1], **options): key for key, group in groups.items()}
+        for future in as_completed(pending):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"found": False, "error": str(e)}
+            for number, query in groups[pending[future]]:
+                missing += not result["found"]
+                out.write(json.dumps({"line": number, "query": query, **result}, ensure_ascii=False) + "\n")
+            out.flush()
+    return missing
+
+
 # ==================== Main ====================
 
+def positive_float(value: str) -> float:
+    """Тип аргумента argparse: число больше нуля."""
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"не число: {value}")
+    if not number > 0:  # отсекает и nan
+        raise argparse.ArgumentTypeError(f"должно быть больше нуля: {value}")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Извлечь информацию о книге (ЛитРес, Open Library, Google Books)"
@@ -290,40 +935,91 @@ def main():
                         help="Формат вывода (default: markdown)")
     parser.add_argument("--no-weights", action="store_true",
                         help="Не добавлять веса [w:N] к главам (по умолчанию веса включены)")
+    parser.add_argument("--offline", action="store_true",
+                        help="Только из кэша, без обращения к сети")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Не читать и не обновлять кэш ответов")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help=f"Папка кэша ответов (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--deadline", type=positive_float, default=DEFAULT_DEADLINE,
+                        help=f"Предел времени на поиск, секунд (default: {DEFAULT_DEADLINE})")
+    parser.add_argument("--retries", type=int, default=RETRY.attempts - 1,
+                        help=f"Повторов запроса при временном сбое (default: {RETRY.attempts - 1})")
+    parser.add_argument("--no-breaker", action="store_true",
+                        help="Обращаться к хостам, даже если они недавно были недоступны")
+    parser.add_argument("--sequential", action="store_true",
+                        help="Опрашивать источники по очереди, а не одновременно")
+    parser.add_argument("--record", metavar="DIR",
+                        help="Записывать ответы источников в папку; кэш ответов и размыкатель "
+                             "не используются")
+    parser.add_argument("--replay", metavar="DIR|URL",
+                        help="Отвечать записанными ответами из папки или через подменный сервер "
+                             "(benchmarks/bookserver.py), без обращения к источникам; кэш ответов "
+                             "и размыкатель не используются")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="Пакетный импорт: книги из файла (- для stdin), вывод NDJSON")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS,
+                        help=f"Книг одновременно в пакетном режиме (default: {DEFAULT_JOBS})")
+    parser.add_argument("--rate", type=positive_float,
+                        help="Запросов в секунду к одному хосту в пакетном режиме "
+                             "(default: свой предел для каждого источника)")
 
     args = parser.parse_args()
 
+    global CACHE, BREAKER, CLIENT, VERBOSE
+    if args.offline and args.no_cache:
+        parser.error("--offline и --no-cache несовместимы")
+    if args.record and args.replay:
+        parser.error("--record и --replay несовместимы")
+    # Запись и воспроизведение не трогают настоящие кэш и размыкатель: записанные
+    # ответы не должны попасть в кэш, а сбои подменного сервера — в состояние хостов
+    isolated = bool(args.record or args.replay)
+    if isolated and args.offline:
+        parser.error("--offline несовместим с --record и --replay")
+    if args.batch:
+        # Настоящий клиент настраивается до обёртки --record/--replay: обёртки
+        # только читают его атрибуты, запись осталась бы на обёртке
+        CLIENT.rate_limiter = HostRateLimiter(args.rate)
+        CLIENT.max_idle = max(CLIENT.max_idle, args.jobs)
+    if args.record:
+        CLIENT = RecordingClient(CLIENT, FixtureStore(args.record))
+    elif args.replay and args.replay.startswith(("http://", "https://")):
+        CLIENT = StandInClient(CLIENT, args.replay)
+    elif args.replay:
+        CLIENT = ReplayClient(FixtureStore(args.replay))
+    if not (args.no_cache or isolated):
+        CACHE = HttpCache(args.cache_dir, offline=args.offline)
+    RETRY.attempts = max(0, args.retries) + 1
+    if not (args.no_breaker or isolated):
+        BREAKER = CircuitBreaker(DEFAULT_BREAKER_PATH)
+
+    if args.batch:
+        try:
+            entries = read_batch(args.batch)
+        except (OSError, ValueError) as e:
+            print(f"Ошибка чтения {args.batch}: {e}", file=sys.stderr)
+            sys.exit(1)
+        VERBOSE = False
+        missing = run_batch(entries, args.jobs, include_weights=not args.no_weights,
+                            deadline=args.deadline, sequential=args.sequential)
+        print(f"Обработано книг: {len(entries)}, не найдено: {missing}", file=sys.stderr)
+        sys.exit(1 if missing else 0)
+
     if not args.isbn and not args.title and not args.litres_id:
         print("Укажи --litres-id (рекомендуется) или --isbn / --title", file=sys.stderr)
         sys.exit(1)
 
     # Режим получения метаданных
     if args.info:
-        meta = None
-        source = None
-
-        # 1. ЛитРес
-        if args.litres_id:
-            print(f"Загружаю метаданные с ЛитРес (ID: {args.litres_id})...", file=sys.stderr)
-            xml = fetch_litres_xml(args.litres_id)
-            if xml:
-                meta = extract_litres_metadata(xml, args.litres_id)
-                if meta:
-                    source = "ЛитРес"
-
-        # 2. Google Books (fallback)
-        if not meta and (args.isbn or args.title):
-            print("Ищу в Google Books...", file=sys.stderr)
-            gb_data = fetch_google_books(isbn=args.isbn, title=args.title)
-            if gb_data:
-                meta = extract_google_metadata(gb_data)
-                if meta:
-                    source = "Google Books"
+        lookups = info_lookups(args.isbn, args.title, args.litres_id)
+        timings = {}
+        source, meta = first_found(lookups, args.deadline, args.sequential, timings)
+        log(format_timings(timings))
 
         if meta:
             print(f"Найдено в {source}", file=sys.stderr)
             if args.format == "json":
-                print(format_metadata_json(meta))
+                print(format_metadata_json({**meta, "timings": timings}))
             elif args.format == "yaml":
                 print(format_metadata_yaml(meta))
             else:
@@ -334,40 +1030,19 @@ def main():
         return
 
     # Режим получения оглавления
+    lookups = toc_lookups(args.isbn, args.title, args.litres_id, include_weights=not args.no_weights)
+    timings = {}
+    source, found = first_found(lookups, args.deadline, args.sequential, timings)
+    log(format_timings(timings))
+
     chapters = None
-    source = None
     book_url = None
-
-    include_weights = not args.no_weights
-
-    # 1. ЛитРес
-    if args.litres_id:
-        print(f"Загружаю с ЛитРес (ID: {args.litres_id})...", file=sys.stderr)
-        xml = fetch_litres_xml(args.litres_id)
-        if xml:
-            litres_chapters = extract_litres_toc(xml)
-            if litres_chapters:
-                chapters = format_litres_toc(litres_chapters, include_weights=include_weights)
-                source = "ЛитРес"
-                book_url = f"https://www.litres.ru/book/-{args.litres_id}/"
-
-    # 2. Open Library
-    if not chapters and (args.isbn or args.title):
-        print("Ищу в Open Library...", file=sys.stderr)
-        ol_data = fetch_open_library(isbn=args.isbn, title=args.title)
-        if ol_data:
-            chapters = extract_toc_from_open_library(ol_data)
-            if chapters:
-                source = "Open Library"
-
-    # 3. Google Books — только для превью
-    if not chapters and (args.isbn or args.title):
-        print("Ищу в Google Books...", file=sys.stderr)
-        gb_data = fetch_google_books(isbn=args.isbn, title=args.title)
-        if gb_data:
-            preview_link = gb_data.get("previewLink")
-            if preview_link:
-                print(f"Превью: {preview_link}", file=sys.stderr)
+    if source == "Google Books":
+        print(f"Превью: {found}", file=sys.stderr)
+    elif found:
+        chapters = found
+        if source == "ЛитРес":
+            book_url = f"https://www.litres.ru/book/-{args.litres_id}/"
 
     if chapters:
         print(f"Найдено в {source}: {len(chapters)} пунктов", file=sys.stderr)
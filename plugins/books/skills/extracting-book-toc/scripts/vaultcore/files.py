@@ -0,0 +1,42 @@
+"""Vault paths, note reading and atomic writes."""
+
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+SETTINGS_FILE = '.claude/day-patterns.md'
+
+
+def vault_path(path: str = None) -> Path:
+    """Vault root: the --path argument when given, else the working directory."""
+    return Path(path) if path else Path.cwd()
+
+
+def read_note(path: Path) -> str:
+    """Read a note as UTF-8; raises OSError / UnicodeDecodeError."""
+    with open(path, 'rb') as fh:
+        return fh.read().decode('utf-8')
+
+
+@lru_cache(maxsize=8)
+def read_settings(vault: Path) -> str:
+    """Content of the Day settings file, read once per process.
+
+    Raises OSError / UnicodeDecodeError like read_note(); failures are not
+    cached.
+    """
+    return read_note(vault / SETTINGS_FILE)
+
+
+def write_atomic(path: Path, content: str):
+    """Replace a file through a temporary sibling so readers never see a partial note."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as fh:
+            fh.write(content)
+        os.chmod(tmp, path.stat().st_mode & 0o777)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
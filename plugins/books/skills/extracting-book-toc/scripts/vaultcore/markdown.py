@@ -0,0 +1,116 @@
+"""Markdown primitives: checklist items, frontmatter and `## Section` bodies."""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+# `- [ ] text` / `- [x] text`, nested or inside `>` callouts and quotes.
+# Horizontal whitespace only, so a match never spans lines.
+CHECKLIST_PATTERN = re.compile(r'^([ \t>]*)-[ \t]+\[([ xX])\][ \t]*(\S.*)', re.MULTILINE)
+
+# `#tag` as the task parser reads it; `#project/alpha` is the tag `#project`
+TAG_PATTERN = re.compile(r'#\w+')
+
+FRONTMATTER_PATTERN = re.compile(r'\A---[ \t]*\r?\n(.*?)^---[ \t]*\r?$', re.MULTILINE | re.DOTALL)
+FIELD_PATTERN = re.compile(r'^([\w-]+):[ \t]*(.*?)[ \t]*\r?$', re.MULTILINE)
+HEADING_PATTERN = re.compile(r'^(#{1,6})[ \t]', re.MULTILINE)
+
+
+class ChecklistItem(NamedTuple):
+    line: int  # 1-based line number in the note
+    indent: int  # characters before `-`, including `>` of callouts
+    checked: bool
+    text: str  # everything after the checkbox, as written
+
+
+def iter_checklist(content: str, start: int = 0, end: int = None):
+    """Yield ChecklistItem for every checkbox line in content[start:end].
+
+    Line numbers are counted incrementally between matches, so a note is
+    scanned once however many items it has.
+    """
+    line = content.count('\n', 0, start) + 1
+    pos = start
+    for match in CHECKLIST_PATTERN.finditer(content, start, len(content) if end is None else end):
+        line += content.count('\n', pos, match.start())
+        pos = match.start()
+        prefix, status, text = match.groups()
+        yield ChecklistItem(line, len(prefix), status != ' ', text)
+
+
+def split_frontmatter(content: str) -> tuple:
+    """Return ({key: value}, body offset) for a leading `---` block.
+
+    Only scalar `key: value` lines are read; values are strings with
+    surrounding quotes removed. Notes without frontmatter give ({}, 0).
+    """
+    match = FRONTMATTER_PATTERN.match(content)
+    if not match:
+        return {}, 0
+    fields = {}
+    for key, value in FIELD_PATTERN.findall(match.group(1)):
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+            value = value[1:-1]
+        fields[key] = value
+    return fields, match.end()
+
+
+def set_frontmatter(content: str, fields: dict) -> str:
+    """Return content with scalar frontmatter `key: value` lines set.
+
+    Existing keys are rewritten in place, new ones appended at the end
+    of the block; a block is created when the note has none. Everything
+    else, including line endings, is left as written.
+    """
+    match = FRONTMATTER_PATTERN.match(content)
+    if not match:
+        block = ''.join(f'{key}: {value}\n' for key, value in fields.items())
+        return f'---\n{block}---\n{content}'
+    body = match.group(1)
+    newline = '\r\n' if body.endswith('\r\n') else '\n'
+    missing = dict(fields)
+
+    def replace(field: re.Match) -> str:
+        key = field.group(1)
+        if key not in missing:
+            return field.group(0)
+        return f'{key}: {missing.pop(key)}' + ('\r' if field.group(0).endswith('\r') else '')
+
+    body = FIELD_PATTERN.sub(replace, body)
+    if missing:
+        if body and not body.endswith('\n'):
+            body += newline
+        body += ''.join(f'{key}: {value}{newline}' for key, value in missing.items())
+    return content[:match.start(1)] + body + content[match.end(1):]
+
+
+@lru_cache(maxsize=None)
+def _heading(heading: str, prefix: bool) -> re.Pattern:
+    if prefix:
+        return re.compile(rf'^{re.escape(heading)}\b.*$', re.MULTILINE)
+    return re.compile(rf'^{re.escape(heading)}[ \t]*\r?$', re.MULTILINE)
+
+
+def find_section(content: str, heading: str, prefix: bool = False) -> tuple | None:
+    """(start, end) offsets of the body under `heading`, e.g. '## Прогресс'.
+
+    With prefix, the heading may go on after a word boundary:
+    '## Утренняя рутина' finds '## Утренняя рутина (до планирования)'.
+    The body runs to the next heading of the same or a higher level, or
+    to the end of the note. Returns None when the heading is missing.
+    """
+    match = _heading(heading, prefix).search(content)
+    if not match:
+        return None
+    level = len(heading) - len(heading.lstrip('#'))
+    start = min(match.end() + 1, len(content))
+    for next_heading in HEADING_PATTERN.finditer(content, start):
+        if len(next_heading.group(1)) <= level:
+            return start, next_heading.start()
+    return start, len(content)
+
+
+def section_text(content: str, heading: str) -> str | None:
+    """Body of a section as text, or None when the heading is missing."""
+    span = find_section(content, heading)
+    return content[span[0]:span[1]] if span else None
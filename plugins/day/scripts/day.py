@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Run several Day plugin scripts in one process.
+
+Usage:
+    python day.py COMMAND [ARGS...] [+ COMMAND [ARGS...] ...]
+
+Commands:
+    tasks      parse-tasks.py
+    edit       task-edit.py
+    validate   validate-settings.py
+
+With one command the output and exit code are exactly those of the
+script. With several, they run in order in one interpreter, all `tasks`
+commands share a single vault scan (re-done after an `edit`), and the
+output is one JSON array:
+    [{"command": "validate --quiet", "exit": 0, "output": {...}}, ...]
+
+Example (morning planning):
+    python day.py validate --quiet + tasks --buckets due-today,overdue,inbox + tasks --no-date
+"""
+
+import contextlib
+import importlib
+import importlib.abc
+import importlib.util
+import io
+import sys
+from pathlib import Path
+
+from vaultcore import lazy_import
+
+json = lazy_import('json')
+
+SCRIPTS = {
+    'tasks': 'parse-tasks.py',
+    'edit': 'task-edit.py',
+    'validate': 'validate-settings.py',
+}
+SEPARATOR = '+'
+MODULES = {script[:-len('.py')].replace('-', '_'): script for script in SCRIPTS.values()}
+
+
+class ScriptFinder(importlib.abc.MetaPathFinder):
+    """Makes `import parse_tasks` load parse-tasks.py.
+
+    Installed at import time, so it is also there in worker processes
+    started with spawn: they re-import day.py and then unpickle
+    `parse_tasks.parse_tasks_from_file` and friends by module name.
+    """
+
+    def find_spec(self, fullname, path=None, target=None):
+        script = MODULES.get(fullname)
+        if script is None:
+            return None
+        return importlib.util.spec_from_file_location(fullname, Path(__file__).with_name(script))
+
+
+sys.meta_path.append(ScriptFinder())
+
+
+def load_command(name: str):
+    """Import a command's script once per process."""
+    return importlib.import_module(SCRIPTS[name][:-len('.py')].replace('-', '_'))
+
+
+def split_commands(argv: list) -> list:
+    """Split `a --x + b --y` into [['a', '--x'], ['b', '--y']]."""
+    commands = [[]]
+    for arg in argv:
+        if arg == SEPARATOR:
+            commands.append([])
+        else:
+            commands[-1].append(arg)
+    return [command for command in commands if command]
+
+
+def run_command(argv: list, capture: bool) -> tuple:
+    """Run one command's main(); returns (exit code, captured stdout)."""
+    module = load_command(argv[0])
+    out = io.StringIO()
+    code = 0
+    try:
+        with contextlib.redirect_stdout(out) if capture else contextlib.nullcontext():
+            module.main(argv[1:])
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else int(e.code is not None)
+    return code, out.getvalue()
+
+
+def decode_output(text: str):
+    """JSON document, NDJSON lines as a list, or the raw text."""
+    if not text.strip():
+        return None
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    try:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    except ValueError:
+        return text
+
+
+def main():
+    commands = split_commands(sys.argv[1:])
+    unknown = [command[0] for command in commands if command[0] not in SCRIPTS]
+    if not commands or unknown:
+        print(__doc__.strip(), file=sys.stderr)
+        if unknown:
+            print(f'\nUnknown command(s): {", ".join(unknown)}', file=sys.stderr)
+        sys.exit(2)
+
+    if len(commands) == 1:
+        code, _ = run_command(commands[0], capture=False)
+        sys.exit(code)
+
+    parse_tasks = load_command('tasks')
+    parse_tasks.TASK_CACHE = {}
+    results = []
+    for command in commands:
+        code, output = run_command(command, capture=True)
+        if command[0] == 'edit':
+            parse_tasks.TASK_CACHE.clear()  # notes changed, rescan on the next `tasks`
+        results.append({'command': ' '.join(command), 'exit': code, 'output': decode_output(output)})
+
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    sys.exit(max(result['exit'] for result in results))
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except BrokenPipeError:
+        # Output piped into `head` and friends: stop quietly
+        import os
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
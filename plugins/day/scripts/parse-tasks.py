@@ -4,109 +4,1294 @@ Parse tasks from Obsidian vault markdown files.
 
 Usage:
     python parse-tasks.py [--due-today | --overdue | --no-date | --inbox] [--path PATH]
+                          [--query QUERY] [--buckets NAMES] [--no-index] [--jobs N]
+                          [--forecast WINDOW [--forecast-by day|week]]
+                          [--stats] [--serve | --no-daemon] [--since-snapshot [FILE]]
+                          [--ndjson] [--fields NAMES] [--slowest N]
 
 Output: JSON array of tasks with metadata.
+
+Parsed tasks are cached in `.claude/tasks-index.sqlite` inside the vault,
+keyed by file path + mtime + size, so repeated runs only re-parse files
+that changed since the previous run. `--jobs N` parses files across N
+worker processes (0 = one per CPU) for cold scans of large vaults.
+
+Hidden folders (`.obsidian`, `.git`, `.trash`), `_templates` and
+`TG Channel` are never scanned. More globs can be listed in `.taskignore`
+at the vault root or under `## Исключения из поиска задач` in
+`.claude/day-patterns.md`; ignored folders are pruned before descending.
+
+`--query` accepts Obsidian Tasks-style filters, one per line, AND-ed:
+    done | not done | no due date | has due date
+    due today | due before/after/on/on or before/on or after DATE
+    due in next N days | due between DATE and DATE
+    path includes/does not include/starts with TEXT
+    tag includes/does not include #tag
+    priority is high/medium/low/none
+DATE is YYYY-MM-DD, today, tomorrow or yesterday.
+
+`--buckets due-today,overdue,dailies,inbox` scans once and prints a single
+JSON object {"date": ..., "buckets": {name: {"count": N, "tasks": [...]}}}.
+
+`--forecast WINDOW` (N days from today, or FROM..TO with the --query date
+words) prints the due-date load of undone tasks per day, or per ISO week
+with `--forecast-by week`: {"date", "from", "to", "by", "carried", "total",
+"periods": [{"period", "start", "end", "count", "load", "tasks"}]}. Overdue
+tasks are carried into its first period; tasks due between today and a
+later window start are left out. `load` weighs ⏫ 3, 🔼/⚡ 2, none 1,
+🔽 0.5. Filters and --query narrow the forecast.
+
+`--serve` keeps the task table in memory, watches the vault (inotify on
+Linux, mtime polling elsewhere) and answers on `.claude/tasks.sock`. Other
+invocations use the daemon transparently when it is running and scan
+directly otherwise.
+
+`--since-snapshot` compares the vault with `.claude/tasks-snapshot.json`
+and prints {"added", "completed", "rescheduled", "deleted"} task lists,
+re-parsing only files whose mtime moved; the snapshot is then replaced.
+Tasks are matched by `id` (file + clean text), not by line number.
+`--fields` applies to the listed tasks; `--ndjson` writes one change per
+line as {"change": kind, ...task}.
+
+`--ndjson` writes one task per line as soon as it is parsed (path/line
+order, no priority sort); `--fields id,file,line,text` limits the output
+to the listed fields in either format.
+
+`--stats` (alias `--profile`) prints one JSON object to stderr: per-phase
+wall time (walk, read, parse, index_write, index_read, query, output,
+total), visited/skipped/parsed file counts, bytes read, tasks per second
+of read+parse time, the `--slowest N` files and files that failed to read
+or decode. With `--jobs`, read/parse are summed across workers.
 """
 
-import argparse
-import json
+import fnmatch
+import hashlib
+import heapq
+import mmap
 import os
 import re
-from datetime import datetime, date
+import signal
+import struct
+import sys
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, date, timedelta
+from functools import partial
 from pathlib import Path
 
+from vaultcore import TAG_PATTERN, iter_checklist, lazy_import, read_settings, section_text, vault_path
+
+# Needed on some code paths only; loaded on first use
+argparse = lazy_import('argparse')
+ctypes = lazy_import('ctypes')
+futures = lazy_import('concurrent.futures')
+json = lazy_import('json')
+selectors = lazy_import('selectors')
+socket = lazy_import('socket')
+sqlite3 = lazy_import('sqlite3')
+
 VAULT_PATH = Path.cwd()  # Use current directory as vault root
 TODAY = date.today().isoformat()
+INDEX_FILE = '.claude/tasks-index.sqlite'
+INDEX_VERSION = 4  # bump when the stored task fields change
+MMAP_THRESHOLD = 1 << 20  # search notes of 1 MiB and up through mmap
+TASK_TAG = b'#task'
 
-# Task regex pattern
-# Handles:
-#   - [ ] text #task (regular markdown, kanban)
-#   - > - [ ] text #task (callout blocks)
-#   - - [ ] #task text (tag at start)
-TASK_PATTERN = re.compile(
-    r'^[>\s]*- \[([ xX])\]\s*(.+)',
-    re.MULTILINE
+# Paths never scanned for tasks; extended by the Day settings and .taskignore
+DEFAULT_IGNORE = ('.*', '_templates', 'TG Channel')
+IGNORE_SECTION = '## Исключения из поиска задач'
+TASKIGNORE_FILE = '.taskignore'
+
+SNAPSHOT_FILE = '.claude/tasks-snapshot.json'
+SNAPSHOT_FIELDS = ('id', 'line', 'text', 'done', 'due')
+
+# Set to {} by the multi-command runner (day.py) so several commands in one
+# process share a single vault scan
+TASK_CACHE = None
+
+SOCKET_FILE = '.claude/tasks.sock'
+POLL_INTERVAL = 2.0  # seconds between re-stats when inotify is unavailable
+DAEMON_TIMEOUT = 5.0
+
+# Metadata tokens inside task text, consumed by a single re.sub pass
+TOKEN_PATTERN = re.compile(
+    r'📅\s*(?P<due>\d{4}-\d{2}-\d{2})'
+    r'|✅\s*(?P<done_date>\d{4}-\d{2}-\d{2})'
+    rf'|(?P<tag>{TAG_PATTERN.pattern})'
+    r'|(?P<priority>[⏫🔼🔽⚡])'
 )
+PRIORITIES = ('⏫', '🔼', '🔽', '⚡')  # precedence when several are present
 
-def parse_tasks_from_file(filepath: Path) -> list:
-    """Extract tasks from a markdown file."""
+# Query vocabulary for --query
+RELATIVE_DAYS = {'today': 0, 'tomorrow': 1, 'yesterday': -1}
+QUERY_PRIORITIES = {'high': '⏫', 'medium': '🔼', 'low': '🔽', 'none': ''}
+
+# Named buckets for --buckets, all answered from a single scan
+BUCKET_QUERIES = {
+    'due-today': 'not done\ndue today',
+    'overdue': 'not done\ndue before today',
+    'no-date': 'not done\nno due date',
+    'dailies': 'not done\nno due date\npath starts with Dailies/',
+    'inbox': 'not done\ntag includes #inbox',
+    'undone': 'not done',
+}
+PRIORITY_ORDER = {'⏫': 0, '🔼': 1, '⚡': 1, '': 2, '🔽': 3}
+
+# --forecast: load of a task by priority (a ⏫ task weighs as much as three plain ones)
+FORECAST_WEIGHTS = {'⏫': 3.0, '🔼': 2.0, '⚡': 2.0, '': 1.0, '🔽': 0.5}
+FORECAST_PERIODS = ('day', 'week')
+
+# SQL equivalents of filter_tasks() for answering filters from the index;
+# both select the same tasks as BUCKET_QUERIES, which the daemon uses
+FILTER_SQL = {
+    'due-today': "NOT done AND due = :today",
+    'overdue': "NOT done AND due != '' AND due < :today",
+    'no-date': "NOT done AND due = ''",
+    'inbox': "NOT done AND instr(lower(tags), '#inbox') > 0",
+    'undone': "NOT done",
+}
+
+SLOWEST_FILES = 10  # files listed under "slowest_files" in --stats
+
+TASK_FIELDS = ('id', 'file', 'text', 'raw_text', 'done', 'priority', 'due', 'line', 'done_date', 'tags', 'hash')
+
+def read_task_source(filepath: Path) -> str | None:
+    """Read a note, or return None when it never mentions `#task`.
+
+    The check runs on raw bytes before decoding; large notes are searched
+    through mmap so files without tasks are skipped without being copied.
+    """
+    with open(filepath, 'rb') as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm.find(TASK_TAG) < 0:
+                    return None
+                data = mm[:]
+        else:
+            data = fh.read()
+            if TASK_TAG not in data:
+                return None
+    return data.decode('utf-8')
+
+def parse_task_text(raw_text: str) -> dict:
+    """Split task text into clean text, priority, due/done dates and tags in one pass."""
+    found = {'due': '', 'done_date': ''}
+    priorities = set()
+    tags = []
+
+    def consume(match: re.Match) -> str:
+        kind = match.lastgroup
+        if kind == 'tag':
+            tags.append(match.group('tag'))
+        elif kind == 'priority':
+            priorities.add(match.group('priority'))
+        elif not found[kind]:
+            found[kind] = match.group(kind)
+        return ''
+
+    text = TOKEN_PATTERN.sub(consume, raw_text).strip()
+    priority = next((p for p in PRIORITIES if p in priorities), '')
+    return {
+        'text': text,
+        'priority': priority,
+        'due': found['due'],
+        'done_date': found['done_date'],
+        'tags': tags,
+    }
+
+def task_id(rel: str, text: str, occurrence: int = 0) -> str:
+    """Stable task identity: file + clean text (+ repeat count within the file).
+
+    Status, dates, priority, tags and line number are left out, so a task
+    keeps its id when it is completed, rescheduled, retagged or moved
+    within its note.
+    """
+    key = f'{rel}\0{" ".join(text.split())}\0{occurrence}'
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+
+def line_hash(done: bool, raw_text: str) -> str:
+    """Hash of everything an edit can change: status, dates, priority, tags, text."""
+    return hashlib.sha1(f'{"x" if done else " "}\0{raw_text}'.encode('utf-8')).hexdigest()[:12]
+
+class Task:
+    """Compact task record.
+
+    Uses __slots__ instead of a dict per task; the file path and tags are
+    interned so every task of a note shares one string, and the clean
+    `text` is derived from `raw_text` on demand instead of being stored.
+    """
+
+    __slots__ = ('id', 'file', 'line', 'raw_text', 'done', 'priority', 'due', 'done_date', 'tags')
+
+    def __init__(self, id: str, file: str, line: int, raw_text: str, done: bool,
+                 priority: str, due: str, done_date: str, tags: tuple):
+        self.id = id
+        self.file = file
+        self.line = line
+        self.raw_text = raw_text
+        self.done = done
+        self.priority = priority
+        self.due = due
+        self.done_date = done_date
+        self.tags = tags
+
+    @property
+    def text(self) -> str:
+        return TOKEN_PATTERN.sub('', self.raw_text).strip()
+
+    @property
+    def hash(self) -> str:
+        """Content hash of the line (status + text); task-edit.py refuses stale edits."""
+        return line_hash(self.done, self.raw_text)
+
+    def as_dict(self, fields: tuple = None) -> dict:
+        """JSON-ready dict of the given fields (all TASK_FIELDS by default)."""
+        return {field: getattr(self, field) for field in fields or TASK_FIELDS}
+
+def parse_tasks_from_text(content: str, rel: str) -> list:
+    """Extract tasks from note content; rel is the vault-relative path."""
     tasks = []
+    seen = {}
+    rel = sys.intern(rel)
+    # Checklist items anywhere: plain lists, kanban cards, > callouts
+    for line, _, done, raw_text in iter_checklist(content):
+        # Skip if not a #task
+        if '#task' not in raw_text:
+            continue
+
+        fields = parse_task_text(raw_text)
+        occurrence = seen[fields['text']] = seen.get(fields['text'], -1) + 1
+        tasks.append(Task(
+            task_id(rel, fields['text'], occurrence),
+            rel,
+            line,
+            raw_text,
+            done,
+            fields['priority'],
+            fields['due'],
+            fields['done_date'],
+            tuple(sys.intern(tag) for tag in fields['tags']),
+        ))
+    return tasks
+
+def parse_tasks_from_file(filepath: Path, root: Path = VAULT_PATH) -> list:
+    """Extract tasks from a markdown file."""
     try:
-        content = filepath.read_text(encoding='utf-8')
-        for match in TASK_PATTERN.finditer(content):
-            status, raw_text = match.groups()
+        content = read_task_source(filepath)
+    except (OSError, UnicodeDecodeError):
+        return []
+    if content is None:
+        return []
+    return parse_tasks_from_text(content, filepath.relative_to(root).as_posix())
 
-            # Skip if not a #task
-            if '#task' not in raw_text:
-                continue
+def profile_file(filepath: Path, root: Path = VAULT_PATH) -> tuple:
+    """parse_tasks_from_file() with timings for --stats.
 
-            # Extract priority emoji
-            priority = ''
-            for p in ['⏫', '🔼', '🔽', '⚡']:
-                if p in raw_text:
-                    priority = p
-                    break
-
-            # Extract due date
-            due_match = re.search(r'📅\s*(\d{4}-\d{2}-\d{2})', raw_text)
-            due_date = due_match.group(1) if due_match else ''
-
-            # Clean text: remove tags, priority, dates
-            text = raw_text
-            text = re.sub(r'#\w+', '', text)  # remove tags
-            text = re.sub(r'[⏫🔼🔽⚡]', '', text)  # remove priority
-            text = re.sub(r'📅\s*\d{4}-\d{2}-\d{2}', '', text)  # remove due date
-            text = re.sub(r'✅\s*\d{4}-\d{2}-\d{2}', '', text)  # remove done date
-            text = text.strip()
-
-            tasks.append({
-                'file': str(filepath.relative_to(VAULT_PATH)),
-                'text': text,
-                'raw_text': raw_text,
-                'done': status.lower() == 'x',
-                'priority': priority,
-                'due': due_date,
-                'line': content[:match.start()].count('\n') + 1
-            })
-    except Exception as e:
-        pass
+    Returns (tasks, bytes read, read seconds, parse seconds, error); a file
+    that cannot be read or decoded is reported instead of silently dropped.
+    """
+    start = time.perf_counter()
+    try:
+        size = os.stat(filepath).st_size
+        content = read_task_source(filepath)
+    except (OSError, UnicodeDecodeError) as e:
+        return [], 0, time.perf_counter() - start, 0.0, f'{type(e).__name__}: {e}'
+    read_done = time.perf_counter()
+    tasks = [] if content is None else parse_tasks_from_text(content, filepath.relative_to(root).as_posix())
+    return tasks, size, read_done - start, time.perf_counter() - read_done, None
+
+def new_stats(slowest: int = SLOWEST_FILES) -> dict:
+    """Empty --stats accumulator; phases are only timed when this is passed down."""
+    return {
+        'phases': {},
+        'files_parsed': 0,
+        'files_failed': 0,
+        'bytes_read': 0,
+        'tasks_parsed': 0,
+        'failed_files': [],
+        'slowest_files': [],
+        '_keep': slowest,
+    }
+
+def add_phase(stats: dict, phase: str, seconds: float):
+    if stats is not None and 'phases' in stats:
+        stats['phases'][phase] = stats['phases'].get(phase, 0.0) + seconds
+
+def timed(iterable, stats: dict, phase: str):
+    """Yield from iterable, charging the time spent producing items to a phase."""
+    if stats is None or 'phases' not in stats:
+        yield from iterable
+        return
+    it = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(it)
+        except StopIteration:
+            return
+        finally:
+            add_phase(stats, phase, time.perf_counter() - start)
+        yield item
+
+def record_profile(stats: dict, rel: str, profile: tuple) -> list:
+    """Fold one profile_file() result into stats and return its tasks."""
+    tasks, size, read_seconds, parse_seconds, error = profile
+    stats['files_parsed'] += 1
+    stats['bytes_read'] += size
+    stats['tasks_parsed'] += len(tasks)
+    add_phase(stats, 'read', read_seconds)
+    add_phase(stats, 'parse', parse_seconds)
+    if error:
+        stats['files_failed'] += 1
+        if len(stats['failed_files']) < stats['_keep']:
+            stats['failed_files'].append({'file': rel, 'error': error})
+    # Min-heap of the N slowest files seen so far
+    entry = (read_seconds + parse_seconds, rel, size, len(tasks))
+    if len(stats['slowest_files']) < stats['_keep']:
+        heapq.heappush(stats['slowest_files'], entry)
+    elif entry > stats['slowest_files'][0]:
+        heapq.heapreplace(stats['slowest_files'], entry)
     return tasks
 
-def collect_tasks(path: Path = VAULT_PATH) -> list:
+def finish_stats(stats: dict, started: float) -> dict:
+    """Turn the accumulator into the JSON report printed on stderr."""
+    report = {key: value for key, value in stats.items() if not key.startswith('_')}
+    phases = report.pop('phases', {})
+    report['phases'] = {name: round(seconds, 4) for name, seconds in phases.items()}
+    report['phases']['total'] = round(time.perf_counter() - started, 4)
+    work = phases.get('read', 0.0) + phases.get('parse', 0.0)
+    if 'tasks_parsed' in report:
+        report['tasks_per_second'] = round(report['tasks_parsed'] / work) if work else None
+    if 'slowest_files' in report:
+        report['slowest_files'] = [
+            {'file': rel, 'seconds': round(seconds, 4), 'bytes': size, 'tasks': count}
+            for seconds, rel, size, count in sorted(report['slowest_files'], reverse=True)
+        ]
+    return report
+
+class IgnoreRules:
+    """Glob rules for paths excluded from the task scan.
+
+    A pattern without `/` matches any file or directory name (`.obsidian`,
+    `*.excalidraw.md`); a pattern with `/` matches the vault-relative path
+    (`Base/Archive/*`). Ignored directories are pruned before descending.
+    """
+
+    def __init__(self, patterns):
+        names = [p for p in patterns if '/' not in p.strip('/')]
+        paths = [p.strip('/') for p in patterns if '/' in p.strip('/')]
+        self.patterns = list(patterns)
+        self._name = self._compile(p.strip('/') for p in names)
+        self._path = self._compile(paths)
+
+    @staticmethod
+    def _compile(patterns):
+        regex = '|'.join(fnmatch.translate(p) for p in patterns)
+        return re.compile(regex) if regex else None
+
+    def match(self, name: str, rel: str) -> bool:
+        return bool(
+            (self._name and self._name.match(name)) or
+            (self._path and self._path.match(rel))
+        )
+
+def _read_settings_ignores(vault: Path) -> list:
+    """Read globs listed under the ignore section of the Day settings."""
+    patterns = []
+    for line in (section_text(read_settings(vault), IGNORE_SECTION) or '').splitlines():
+        if line.lstrip().startswith('- '):
+            pattern = line.lstrip()[2:].strip().strip('`')
+            if pattern:
+                patterns.append(pattern)
+    return patterns
+
+def load_ignore_rules(vault: Path) -> IgnoreRules:
+    """Combine default ignores with the Day settings and `.taskignore`."""
+    patterns = list(DEFAULT_IGNORE)
+    try:
+        patterns += _read_settings_ignores(vault)
+    except (OSError, UnicodeDecodeError):
+        pass
+    try:
+        for line in (vault / TASKIGNORE_FILE).read_text(encoding='utf-8').splitlines():
+            line = line.strip()
+            if line and not line.startswith('#'):
+                patterns.append(line)
+    except (OSError, UnicodeDecodeError):
+        pass
+    return IgnoreRules(patterns)
+
+def walk_markdown(path: Path, ignore: IgnoreRules = None, stats: dict = None,
+                  dirs: list = None):
+    """Yield (relative path, DirEntry) for vault markdown files in path order.
+
+    Uses os.scandir and prunes ignored directories before descending, so
+    excluded archives and attachment folders cost one directory entry each.
+    Visited directory prefixes ('' for the root, 'Base/' ...) are appended
+    to dirs when given.
+    """
+    if ignore is None:
+        ignore = load_ignore_rules(path)
+    if stats is None:
+        stats = {}
+    for key in ('dirs_visited', 'dirs_skipped', 'files_visited', 'files_skipped'):
+        stats.setdefault(key, 0)
+
+    def walk(directory: str, prefix: str):
+        try:
+            with os.scandir(directory) as it:
+                entries = [(e, e.is_dir(follow_symlinks=False)) for e in it]
+        except OSError:
+            return
+        stats['dirs_visited'] += 1
+        if dirs is not None:
+            dirs.append(prefix)
+        # Directories sort as 'name/' so output follows full-path order
+        entries.sort(key=lambda item: item[0].name + '/' if item[1] else item[0].name)
+        for entry, is_dir in entries:
+            rel = prefix + entry.name
+            if ignore.match(entry.name, rel):
+                stats['dirs_skipped' if is_dir else 'files_skipped'] += 1
+                continue
+            if is_dir:
+                yield from walk(entry.path, rel + '/')
+            elif entry.name.endswith('.md'):
+                stats['files_visited'] += 1
+                yield rel, entry
+            else:
+                stats['files_skipped'] += 1
+
+    yield from timed(walk(str(path), ''), stats, 'walk')
+
+def iter_markdown_files(path: Path, ignore: IgnoreRules = None, stats: dict = None):
+    """Yield vault markdown files in path order, skipping ignored paths."""
+    for _, entry in walk_markdown(path, ignore, stats):
+        yield Path(entry.path)
+
+def parse_files(files, root: Path, jobs: int = 1, stats: dict = None):
+    """Yield (file, tasks) for each file in input order.
+
+    Serially, files are consumed lazily so results stream out while the
+    walk is still running. With jobs > 1 files are parsed in a process
+    pool; batches are sent in chunks to amortise IPC, and results come
+    back in submission order so output stays deterministic. A new_stats()
+    accumulator switches parsing to profile_file().
+    """
+    profiling = stats is not None and 'phases' in stats
+    parse = partial(profile_file if profiling else parse_tasks_from_file, root=root)
+
+    def results(parsed):
+        for md_file, result in parsed:
+            if profiling:
+                result = record_profile(stats, md_file.relative_to(root).as_posix(), result)
+            yield md_file, result
+
+    if jobs <= 1:
+        yield from results((md_file, parse(md_file)) for md_file in files)
+        return
+
+    files = list(files)
+    chunksize = max(1, min(256, len(files) // (jobs * 4)))
+    with futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from results(zip(files, pool.map(parse, files, chunksize=chunksize)))
+
+def iter_vault_tasks(path: Path = VAULT_PATH, jobs: int = 1, stats: dict = None):
+    """Yield all vault tasks in path/line order as files are parsed."""
+    for _, tasks in parse_files(iter_markdown_files(path, stats=stats), path, jobs, stats):
+        yield from tasks
+
+def collect_tasks(path: Path = VAULT_PATH, jobs: int = 1, stats: dict = None) -> list:
     """Collect all tasks from vault."""
-    all_tasks = []
+    return list(iter_vault_tasks(path, jobs, stats))
 
-    # Scan markdown files
-    for md_file in path.rglob('*.md'):
-        # Skip templates and archives
-        if '_templates' in str(md_file) or 'TG Channel' in str(md_file):
-            continue
-        all_tasks.extend(parse_tasks_from_file(md_file))
+class TaskIndex:
+    """On-disk task index keyed by file path + mtime + size.
+
+    Only files whose mtime or size changed since the last refresh are
+    re-parsed; deleted files are dropped from the index.
+    """
+
+    def __init__(self, vault: Path, db_path: Path = None):
+        self.vault = vault
+        self.db_path = db_path or vault / INDEX_FILE
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self._ensure_schema()
+
+    def _ensure_schema(self):
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != INDEX_VERSION:
+            self.conn.executescript('DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS tasks;')
+        self.conn.executescript(f'''
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS tasks (
+                id TEXT NOT NULL,
+                file TEXT NOT NULL,
+                line INTEGER NOT NULL,
+                raw_text TEXT NOT NULL,
+                done INTEGER NOT NULL,
+                priority TEXT NOT NULL,
+                due TEXT NOT NULL,
+                done_date TEXT NOT NULL,
+                tags TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS tasks_file ON tasks (file);
+            CREATE INDEX IF NOT EXISTS tasks_due ON tasks (done, due);
+            PRAGMA user_version = {INDEX_VERSION};
+        ''')
+
+    def refresh(self, jobs: int = 1, stats: dict = None) -> int:
+        """Re-parse changed files and drop deleted ones. Returns files re-parsed."""
+        known = {
+            path: (mtime_ns, size)
+            for path, mtime_ns, size in self.conn.execute('SELECT path, mtime_ns, size FROM files')
+        }
+        stale = {}
+        for rel, entry in walk_markdown(self.vault, stats=stats):
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            signature = known.pop(rel, None)
+            if signature != (st.st_mtime_ns, st.st_size):
+                stale[Path(entry.path)] = (rel, st)
+
+        with self.conn:
+            for md_file, tasks in parse_files(list(stale), self.vault, jobs, stats):
+                rel, st = stale[md_file]
+                start = time.perf_counter()
+                self._store(rel, st, tasks)
+                add_phase(stats, 'index_write', time.perf_counter() - start)
+            for rel in known:
+                self.conn.execute('DELETE FROM files WHERE path = ?', (rel,))
+                self.conn.execute('DELETE FROM tasks WHERE file = ?', (rel,))
+        return len(stale)
+
+    def _store(self, rel: str, st: os.stat_result, tasks: list):
+        self.conn.execute('DELETE FROM tasks WHERE file = ?', (rel,))
+        self.conn.executemany(
+            f'INSERT INTO tasks ({", ".join(Task.__slots__)}) VALUES ({", ".join("?" * len(Task.__slots__))})',
+            [
+                (t.id, t.file, t.line, t.raw_text, t.done, t.priority, t.due, t.done_date, ' '.join(t.tags))
+                for t in tasks
+            ]
+        )
+        self.conn.execute(
+            'INSERT OR REPLACE INTO files (path, mtime_ns, size) VALUES (?, ?, ?)',
+            (rel, st.st_mtime_ns, st.st_size)
+        )
+
+    def iter_tasks(self, filter_type: str = None):
+        """Yield indexed tasks from a cursor, optionally narrowed by a filter_tasks() filter."""
+        where = FILTER_SQL.get(filter_type, '1')
+        rows = self.conn.execute(
+            f'SELECT {", ".join(Task.__slots__)} FROM tasks WHERE {where} ORDER BY file, line',
+            {'today': TODAY}
+        )
+        for id, file, line, raw_text, done, priority, due, done_date, tags in rows:
+            yield Task(
+                id, sys.intern(file), line, raw_text, bool(done), priority, due, done_date,
+                tuple(sys.intern(tag) for tag in tags.split())
+            )
 
-    return all_tasks
+    def tasks(self, filter_type: str = None) -> list:
+        return list(self.iter_tasks(filter_type))
+
+    def close(self):
+        self.conn.close()
+
+# Per-task predicates behind filter_tasks() and the streaming pipeline
+FILTERS = {
+    'due-today': lambda t: not t.done and t.due == TODAY,
+    'overdue': lambda t: not t.done and t.due and t.due < TODAY,
+    'no-date': lambda t: not t.done and not t.due,
+    'inbox': lambda t: not t.done and any('#inbox' in tag.lower() for tag in t.tags),
+    'undone': lambda t: not t.done,
+}
 
 def filter_tasks(tasks: list, filter_type: str) -> list:
     """Filter tasks by criteria."""
-    today = date.today()
+    predicate = FILTERS.get(filter_type)
+    if predicate is None:
+        return tasks
+    return [t for t in tasks if predicate(t)]
+
+class QueryError(ValueError):
+    """Raised for a query line that is not understood."""
+
+def _query_date(word: str, today: date) -> str:
+    """Resolve today/tomorrow/yesterday or an ISO date to YYYY-MM-DD."""
+    word = word.strip().lower()
+    if word in RELATIVE_DAYS:
+        return (today + timedelta(days=RELATIVE_DAYS[word])).isoformat()
+    try:
+        return date.fromisoformat(word).isoformat()
+    except ValueError:
+        raise QueryError(f'Unknown date: {word}') from None
+
+def forecast_window(text: str, today: date) -> tuple:
+    """Parse a --forecast window: N days from today, or FROM..TO (inclusive)."""
+    text = text.strip()
+    if text.isdigit():
+        if int(text) < 1:
+            raise QueryError('Forecast window must be at least 1 day')
+        return today.isoformat(), (today + timedelta(days=int(text) - 1)).isoformat()
+    start, sep, end = text.partition('..')
+    if not sep:
+        raise QueryError(f'Unknown forecast window: {text} (use N or FROM..TO)')
+    start, end = _query_date(start, today), _query_date(end, today)
+    if start > end:
+        raise QueryError(f'Forecast window ends before it starts: {text}')
+    return start, end
+
+def forecast_periods(start: date, end: date, by: str) -> list:
+    """(label, first day, last day) of each day or ISO week in start..end."""
+    periods = []
+    day = start
+    while day <= end:
+        if by == 'week':
+            last = min(end, day + timedelta(days=6 - day.weekday()))
+            year, week, _ = day.isocalendar()
+            label = f'{year}-W{week:02d}'
+        else:
+            last = day
+            label = day.isoformat()
+        periods.append((label, day, last))
+        day = last + timedelta(days=1)
+    return periods
+
+class TaskQueryIndex:
+    """Secondary indexes over a task list for Tasks-plugin-style queries.
+
+    Tasks are kept in (file, line) order and addressed by position. Due
+    dates live in a sorted array searched by bisection, tags and files map
+    to posting lists, so each query line touches only matching tasks (or
+    the distinct tags/files) instead of every task in the vault.
+    """
+
+    def __init__(self, tasks: list):
+        self.tasks = sorted(tasks, key=lambda t: (t.file, t.line))
+        self.done = set()
+        self.no_due = set()
+        by_due = []
+        self.by_tag = {}
+        self.by_file = {}
+        self.by_priority = {}
+        for i, task in enumerate(self.tasks):
+            if task.done:
+                self.done.add(i)
+            if task.due:
+                by_due.append((task.due, i))
+            else:
+                self.no_due.add(i)
+            for tag in task.tags:
+                self.by_tag.setdefault(tag.lower(), []).append(i)
+            self.by_file.setdefault(task.file, []).append(i)
+            self.by_priority.setdefault(task.priority, []).append(i)
+        by_due.sort()
+        self.due_keys = [due for due, _ in by_due]
+        self.due_ids = [i for _, i in by_due]
+        self.files = sorted(self.by_file)
+        self.files_lower = [f.lower() for f in self.files]
+        self.all = range(len(self.tasks))
+        self._open_due = None
+
+    def due_range(self, start: str = '', end: str = '\uffff') -> set:
+        """Tasks with start <= due <= end, found by bisection."""
+        lo = bisect_left(self.due_keys, start)
+        hi = bisect_right(self.due_keys, end)
+        return set(self.due_ids[lo:hi])
 
-    if filter_type == 'due-today':
-        return [t for t in tasks if not t['done'] and t['due'] == TODAY]
+    def open_due(self) -> tuple:
+        """(due dates, task ids) of undone dated tasks in date order; built on first use."""
+        if self._open_due is None:
+            keys, ids = [], []
+            for due, i in zip(self.due_keys, self.due_ids):
+                if i not in self.done:
+                    keys.append(due)
+                    ids.append(i)
+            self._open_due = (keys, ids)
+        return self._open_due
 
-    elif filter_type == 'overdue':
-        return [t for t in tasks if not t['done'] and t['due'] and t['due'] < TODAY]
+    def due_before(self, day: str) -> set:
+        """Tasks due strictly before day."""
+        return set(self.due_ids[:bisect_left(self.due_keys, day)])
 
-    elif filter_type == 'no-date':
-        return [t for t in tasks if not t['done'] and not t['due']]
+    def due_after(self, day: str) -> set:
+        """Tasks due strictly after day."""
+        return set(self.due_ids[bisect_right(self.due_keys, day):])
 
-    elif filter_type == 'inbox':
-        return [t for t in tasks if not t['done'] and '#inbox' in t.get('raw_text', '')]
+    def path_prefix(self, prefix: str) -> set:
+        """Tasks in files whose path starts with prefix (case-insensitive)."""
+        prefix = prefix.lower()
+        lo = bisect_left(self.files_lower, prefix)
+        hi = bisect_left(self.files_lower, prefix + '\uffff')
+        return {i for f in self.files[lo:hi] for i in self.by_file[f]}
 
-    elif filter_type == 'undone':
-        return [t for t in tasks if not t['done']]
+    def path_includes(self, fragment: str) -> set:
+        """Tasks in files whose path contains fragment (case-insensitive)."""
+        fragment = fragment.lower()
+        return {
+            i
+            for f, lower in zip(self.files, self.files_lower) if fragment in lower
+            for i in self.by_file[f]
+        }
 
+    def tag_includes(self, fragment: str) -> set:
+        """Tasks with a tag containing fragment, e.g. `#inbox` or `wait`."""
+        fragment = fragment.lower()
+        return {i for tag, ids in self.by_tag.items() if fragment in tag for i in ids}
+
+    def _match_line(self, line: str, today: date):
+        """Return (ids, negate) for one query line."""
+        lowered = line.lower()
+        if lowered == 'done':
+            return self.done, False
+        if lowered == 'not done':
+            return self.done, True
+        if lowered == 'no due date':
+            return self.no_due, False
+        if lowered == 'has due date':
+            return self.no_due, True
+
+        m = re.fullmatch(r'due in next (\d+) days?', lowered)
+        if m:
+            end = today + timedelta(days=int(m.group(1)))
+            return self.due_range(today.isoformat(), end.isoformat()), False
+        m = re.fullmatch(r'due between (\S+) and (\S+)', lowered)
+        if m:
+            return self.due_range(_query_date(m.group(1), today), _query_date(m.group(2), today)), False
+        m = re.fullmatch(r'due (?:(before|after|on or before|on or after|on) )?(\S+)', lowered)
+        if m:
+            op, day = m.group(1) or 'on', _query_date(m.group(2), today)
+            if op == 'before':
+                return self.due_before(day), False
+            if op == 'after':
+                return self.due_after(day), False
+            if op == 'on or before':
+                return self.due_range(end=day), False
+            if op == 'on or after':
+                return self.due_range(start=day), False
+            return self.due_range(day, day), False
+
+        m = re.fullmatch(r'path (includes|does not include|starts with) (.+)', line, re.IGNORECASE)
+        if m:
+            op, value = m.group(1).lower(), m.group(2).strip()
+            if op == 'starts with':
+                return self.path_prefix(value), False
+            return self.path_includes(value), op != 'includes'
+        m = re.fullmatch(r'tags? (includes?|does not include|do not include) (.+)', line, re.IGNORECASE)
+        if m:
+            return self.tag_includes(m.group(2).strip()), 'not' in m.group(1).lower()
+        m = re.fullmatch(r'priority is (high|medium|low|none)', lowered)
+        if m:
+            return set(self.by_priority.get(QUERY_PRIORITIES[m.group(1)], ())), False
+
+        raise QueryError(f'Unknown query line: {line}')
+
+    def query(self, text: str, today: date = None) -> list:
+        """Evaluate query lines (AND-ed together) and return matching tasks."""
+        return [self.tasks[i] for i in sorted(self.select(text, today))]
+
+    def select(self, text: str, today: date = None) -> set:
+        """Positions of the tasks matching the query lines."""
+        today = today or date.fromisoformat(TODAY)
+        include, exclude = [], []
+        for line in re.split(r'\n|\\n', text):
+            line = line.strip()
+            if line:
+                ids, negate = self._match_line(line, today)
+                (exclude if negate else include).append(ids)
+
+        if include:
+            include.sort(key=len)
+            result = set(include[0])
+            for ids in include[1:]:
+                result &= ids
+        else:
+            result = set(self.all)
+        for ids in exclude:
+            result -= ids
+        return result
+
+    def forecast(self, start: str, end: str, by: str = 'day', ids: set = None,
+                 today: str = None) -> dict:
+        """Undone dated tasks per day or ISO week of start..end, in one pass.
+
+        Walks the date-ordered undone tasks up to `end` once. Overdue tasks
+        (due before `today`, default `start`) are still waiting, so they
+        are carried forward into the first period (and counted under
+        "carried"); tasks due from today up to a later `start` fall before
+        the window and are left out. `ids` narrows the forecast to a query
+        result. Load weighs tasks by FORECAST_WEIGHTS.
+        """
+        periods = forecast_periods(date.fromisoformat(start), date.fromisoformat(end), by)
+        starts = [first.isoformat() for _, first, _ in periods]
+        buckets = [[] for _ in periods]
+        carried = []
+        overdue = min(start, today or start)
+        keys, open_ids = self.open_due()
+        for i in open_ids[:bisect_right(keys, end)]:
+            if ids is not None and i not in ids:
+                continue
+            task = self.tasks[i]
+            if task.due < overdue:
+                carried.append(task)
+                buckets[0].append(task)
+            elif task.due < start:
+                continue  # not overdue yet, due before the window
+            else:
+                buckets[bisect_right(starts, task.due) - 1].append(task)
+
+        def load(tasks):
+            return sum(FORECAST_WEIGHTS.get(t.priority, 1.0) for t in tasks)
+
+        return {
+            'from': start, 'to': end, 'by': by,
+            'carried': {'count': len(carried), 'load': load(carried)},
+            'total': {'count': sum(map(len, buckets)), 'load': sum(map(load, buckets))},
+            'periods': [
+                {'period': label, 'start': first.isoformat(), 'end': last.isoformat(),
+                 'count': len(tasks), 'load': load(tasks), 'tasks': sort_by_priority(tasks)}
+                for (label, first, last), tasks in zip(periods, buckets)
+            ],
+        }
+
+def sort_by_priority(tasks: list) -> list:
+    """Stable sort by priority emoji (⏫ first, 🔽 last)."""
+    tasks.sort(key=lambda t: PRIORITY_ORDER.get(t.priority, 2))
     return tasks
 
-def main():
+def answer_request(index: TaskQueryIndex, request: dict):
+    """Answer a filter/query/buckets/forecast request; shared by the CLI and --serve.
+
+    The filter and query narrow every bucket and the forecast; without
+    either the matching tasks are returned sorted by priority, or in
+    path/line order with `order: path` (what --ndjson streams without a
+    daemon).
+    """
+    today = date.fromisoformat(request.get('today') or TODAY)
+    base = []
+    if request.get('filter'):
+        base.append(BUCKET_QUERIES[request['filter']])
+    if request.get('query'):
+        base.append(request['query'])
+
+    if request.get('forecast'):
+        window = request['forecast']
+        if window.get('by', 'day') not in FORECAST_PERIODS:
+            raise QueryError(f'Unknown forecast period: {window["by"]}')
+        start, end = forecast_window(window['window'], today)
+        ids = index.select('\n'.join(base), today) if base else None
+        forecast = index.forecast(start, end, window.get('by', 'day'), ids, today.isoformat())
+        return {'date': today.isoformat(), **forecast}
+
+    if request.get('buckets'):
+        buckets = {}
+        for name in request['buckets']:
+            found = sort_by_priority(index.query('\n'.join([BUCKET_QUERIES[name]] + base), today))
+            buckets[name] = {'count': len(found), 'tasks': found}
+        return {'date': today.isoformat(), 'buckets': buckets}
+
+    tasks = index.query('\n'.join(base), today) if base else list(index.tasks)
+    return tasks if request.get('order') == 'path' else sort_by_priority(tasks)
+
+def stream_tasks(vault: Path, filter_type: str = None, use_index: bool = True,
+                 jobs: int = 1, stats: dict = None):
+    """Yield tasks in path/line order: walker -> parser -> filter, nothing materialised.
+
+    Reads through the on-disk index when possible (rows stream from the
+    cursor) and falls back to a direct scan. When TASK_CACHE is enabled
+    the vault is loaded once per process and later calls filter in memory.
+    """
+    if TASK_CACHE is not None:
+        key = (str(vault), use_index)
+        if key not in TASK_CACHE:
+            TASK_CACHE[key] = list(_scan_tasks(vault, None, use_index, jobs, stats))
+        elif stats is not None:
+            stats['served_by'] = 'cache'
+        predicate = FILTERS.get(filter_type)
+        yield from (t for t in TASK_CACHE[key] if predicate is None or predicate(t))
+        return
+    yield from _scan_tasks(vault, filter_type, use_index, jobs, stats)
+
+def _scan_tasks(vault: Path, filter_type: str, use_index: bool, jobs: int, stats: dict):
+    if use_index:
+        try:
+            index = TaskIndex(vault)
+        except (OSError, sqlite3.Error):
+            index = None  # read-only vault or broken index file
+        if index:
+            yielded = False
+            try:
+                reparsed = index.refresh(jobs, stats)
+                if stats is not None:
+                    stats['files_reparsed'] = reparsed
+                for task in timed(index.iter_tasks(filter_type), stats, 'index_read'):
+                    yielded = True
+                    yield task
+                return
+            except sqlite3.Error:
+                if yielded:
+                    raise
+            finally:
+                index.close()
+
+    if use_index and stats is not None:
+        # drop counters from a failed index refresh
+        fresh = new_stats(stats['_keep']) if 'phases' in stats else {}
+        stats.clear()
+        stats.update(fresh)
+    predicate = FILTERS.get(filter_type)
+    for task in iter_vault_tasks(vault, jobs, stats):
+        if predicate is None or predicate(task):
+            yield task
+
+def load_tasks(vault: Path, filter_type: str = None, use_index: bool = True,
+               jobs: int = 1, stats: dict = None) -> list:
+    """Load tasks through the on-disk index, falling back to a direct scan."""
+    return list(stream_tasks(vault, filter_type, use_index, jobs, stats))
+
+def to_json(result, fields: tuple = None):
+    """Turn Task records, or buckets or forecast periods of them, into JSON-ready dicts."""
+    if isinstance(result, dict) and 'periods' in result:
+        return dict(result, periods=[
+            dict(period, tasks=[t.as_dict(fields) for t in period['tasks']])
+            for period in result['periods']
+        ])
+    if isinstance(result, dict):
+        return dict(result, buckets={
+            name: {'count': bucket['count'], 'tasks': [t.as_dict(fields) for t in bucket['tasks']]}
+            for name, bucket in result['buckets'].items()
+        })
+    return [t.as_dict(fields) for t in result]
+
+def write_ndjson(records, out=None):
+    """Write one JSON object per line as records arrive."""
+    out = out or sys.stdout
+    for record in records:
+        out.write(json.dumps(record, ensure_ascii=False))
+        out.write('\n')
+
+def load_snapshot(path: Path) -> dict | None:
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+def save_snapshot(path: Path, snapshot: dict):
+    """Write the snapshot atomically so an interrupted run keeps the old one."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_text(json.dumps(snapshot, ensure_ascii=False, separators=(',', ':')), encoding='utf-8')
+    os.replace(tmp, path)
+
+def diff_tasks(old: list, new: list, changes: dict):
+    """Record added/completed/rescheduled/deleted tasks of one file into changes."""
+    old_by_id = {t['id']: t for t in old}
+    for task in new:
+        before = old_by_id.pop(task.id, None)
+        if before is None:
+            changes['added'].append(task.as_dict())
+            continue
+        if task.done and not before['done']:
+            changes['completed'].append(task.as_dict())
+        if task.due != before['due']:
+            changes['rescheduled'].append(dict(task.as_dict(), previous_due=before['due']))
+    changes['deleted'].extend(old_by_id.values())
+
+def snapshot_changes(vault: Path, snapshot_path: Path, jobs: int = 1, stats: dict = None) -> dict:
+    """Diff the vault against the stored snapshot, then replace the snapshot.
+
+    Only files whose mtime or size moved since the snapshot are parsed;
+    the first run just records a baseline and reports no changes.
+    """
+    previous = load_snapshot(snapshot_path)
+    known = previous['files'] if previous else {}
+    files = {}
+    stale = {}
+    for rel, entry in walk_markdown(vault, stats=stats):
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        entry_state = known.get(rel)
+        if entry_state and (entry_state['mtime_ns'], entry_state['size']) == (st.st_mtime_ns, st.st_size):
+            files[rel] = entry_state
+        else:
+            stale[Path(entry.path)] = (rel, st)
+
+    changes = {'added': [], 'completed': [], 'rescheduled': [], 'deleted': []}
+    for md_file, tasks in parse_files(list(stale), vault, jobs, stats):
+        rel, st = stale[md_file]
+        old = [dict(t, file=rel) for t in known.get(rel, {}).get('tasks', [])]
+        if previous:
+            diff_tasks(old, tasks, changes)
+        files[rel] = {
+            'mtime_ns': st.st_mtime_ns,
+            'size': st.st_size,
+            'tasks': [t.as_dict(SNAPSHOT_FIELDS) for t in tasks],
+        }
+    for rel in known.keys() - files.keys():
+        changes['deleted'].extend(dict(t, file=rel) for t in known[rel]['tasks'])
+
+    now = datetime.now().isoformat(timespec='seconds')
+    save_snapshot(snapshot_path, {'taken': now, 'files': files})
+    return {
+        'since': previous['taken'] if previous else None,
+        'now': now,
+        'files_changed': len(stale),
+        **changes,
+    }
+
+CHANGE_KINDS = ('added', 'completed', 'rescheduled', 'deleted')
+
+def project_changes(changes: dict, fields: tuple = None) -> dict:
+    """Limit every task of a snapshot diff to fields (previous_due is kept)."""
+    if not fields:
+        return changes
+    keep = fields + ('previous_due',)
+    return dict(changes, **{
+        kind: [{field: task[field] for field in keep if field in task} for task in changes[kind]]
+        for kind in CHANGE_KINDS
+    })
+
+class TaskTable:
+    """In-memory task table for --serve, refreshed file by file."""
+
+    def __init__(self, vault: Path, jobs: int = 1):
+        self.vault = vault
+        self.jobs = jobs
+        self.ignore = load_ignore_rules(vault)
+        self.files = {}  # relative path -> ((mtime_ns, size), tasks)
+        self.dirs = set()
+        self._index = None
+
+    def rescan(self) -> int:
+        """Re-stat the whole vault and re-parse changed files. Returns files changed."""
+        seen = set()
+        dirs = []
+        stale = {}
+        for rel, entry in walk_markdown(self.vault, self.ignore, dirs=dirs):
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            seen.add(rel)
+            signature = (st.st_mtime_ns, st.st_size)
+            known = self.files.get(rel)
+            if not known or known[0] != signature:
+                stale[Path(entry.path)] = (rel, signature)
+
+        for md_file, tasks in parse_files(list(stale), self.vault, self.jobs):
+            rel, signature = stale[md_file]
+            self.files[rel] = (signature, tasks)
+        removed = self.files.keys() - seen
+        for rel in removed:
+            del self.files[rel]
+        self.dirs = set(dirs)
+
+        changed = len(stale) + len(removed)
+        if changed:
+            self._index = None
+        return changed
+
+    def update_file(self, rel: str) -> bool:
+        """Re-parse or drop one file after a change event. Returns True if tasks changed."""
+        path = self.vault / rel
+        try:
+            st = path.stat()
+        except OSError:
+            st = None
+        if st is None or self.ignore.match(path.name, rel):
+            changed = self.files.pop(rel, None) is not None
+        else:
+            signature = (st.st_mtime_ns, st.st_size)
+            known = self.files.get(rel)
+            changed = not known or known[0] != signature
+            if changed:
+                self.files[rel] = (signature, parse_tasks_from_file(path, self.vault))
+        if changed:
+            self._index = None
+        return changed
+
+    def index(self) -> TaskQueryIndex:
+        """Query index over the current table, rebuilt only after changes."""
+        if self._index is None:
+            self._index = TaskQueryIndex([t for _, tasks in self.files.values() for t in tasks])
+        return self._index
+
+class InotifyWatcher:
+    """Linux inotify watches on every scanned vault directory (via ctypes)."""
+
+    IN_MOVED_FROM = 0x40
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_CLOSE_WRITE = 0x8
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+    IN_ISDIR = 0x40000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT = struct.Struct('iIII')
+
+    def __init__(self, root: Path):
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.root = root
+        self.watched = {}  # watch descriptor -> directory prefix ('' or 'Base/')
+
+    def sync(self, dirs: set):
+        """Add watches for directories not watched yet."""
+        known = set(self.watched.values())
+        for prefix in dirs - known:
+            wd = self._add_watch(self.fd, os.fsencode(self.root / prefix), self.MASK)
+            if wd >= 0:
+                self.watched[wd] = prefix
+
+    def read(self):
+        """Drain pending events as (relative path, is_dir); None after a queue overflow."""
+        changes = []
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return changes
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'surrogateescape')
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                return None
+            if mask & self.IN_IGNORED:
+                self.watched.pop(wd, None)
+                continue
+            if wd in self.watched and name:
+                changes.append((self.watched[wd] + name, bool(mask & self.IN_ISDIR)))
+        return changes
+
+    def close(self):
+        os.close(self.fd)
+
+def socket_path(vault: Path) -> Path:
+    return vault.resolve() / SOCKET_FILE
+
+def serve(vault: Path, jobs: int = 1, poll_interval: float = POLL_INTERVAL):
+    """Keep the vault's tasks in memory and answer requests on a Unix socket.
+
+    Changes are picked up through inotify where available, otherwise by
+    re-statting the vault every poll_interval seconds. Edits to ignore
+    rules in the Day settings need a restart; `.taskignore` is reloaded.
+    """
+    table = TaskTable(vault, jobs)
+    table.rescan()
+    try:
+        watcher = InotifyWatcher(vault)
+        watcher.sync(table.dirs)
+    except (OSError, AttributeError):
+        watcher = None  # not Linux: fall back to mtime polling
+
+    path = socket_path(vault)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        path.unlink()  # stale socket from a previous run
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(path))
+    server.listen()
+    selector = selectors.DefaultSelector()
+    selector.register(server, selectors.EVENT_READ)
+    if watcher:
+        selector.register(watcher.fd, selectors.EVENT_READ)
+    print(json.dumps({
+        'socket': str(path),
+        'files': len(table.files),
+        'watch': 'inotify' if watcher else f'poll {poll_interval}s',
+    }), file=sys.stderr)
+
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # run the cleanup below
+    rescanned = time.monotonic()
+    try:
+        while True:
+            if watcher:
+                events = selector.select()
+            else:
+                # Rescan on schedule even while clients keep the socket busy
+                wait = rescanned + poll_interval - time.monotonic()
+                if wait <= 0:
+                    table.rescan()
+                    rescanned = time.monotonic()
+                    wait = poll_interval
+                events = selector.select(wait)
+            for key, _ in events:
+                if key.fileobj is server:
+                    _answer_client(server, table)
+                    continue
+                changes = watcher.read()
+                if changes is None or any(
+                    is_dir or rel == TASKIGNORE_FILE for rel, is_dir in changes
+                ):
+                    if any(rel == TASKIGNORE_FILE for rel, _ in changes or ()):
+                        table.ignore = load_ignore_rules(vault)
+                    table.rescan()
+                    watcher.sync(table.dirs)
+                    continue
+                for rel in {rel for rel, _ in changes if rel.endswith('.md')}:
+                    table.update_file(rel)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        selector.close()
+        server.close()
+        if watcher:
+            watcher.close()
+        path.unlink(missing_ok=True)
+
+def _answer_client(server: 'socket.socket', table: TaskTable):
+    conn, _ = server.accept()
+    with conn:
+        conn.settimeout(DAEMON_TIMEOUT)
+        try:
+            request = json.loads(conn.makefile('rb').readline())
+            result = answer_request(table.index(), request)
+            reply = {'ok': True, 'result': to_json(result, request.get('fields'))}
+        except (QueryError, KeyError, ValueError) as e:
+            reply = {'ok': False, 'error': str(e)}
+        except OSError:
+            return
+        try:
+            conn.sendall(json.dumps(reply, ensure_ascii=False).encode('utf-8') + b'\n')
+        except OSError:
+            pass
+
+def query_daemon(vault: Path, request: dict):
+    """Ask a running --serve daemon; returns None when none is reachable."""
+    path = socket_path(vault)
+    if not path.exists() or not hasattr(socket, 'AF_UNIX'):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(DAEMON_TIMEOUT)
+            conn.connect(str(path))
+            conn.sendall(json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n')
+            reply = json.loads(conn.makefile('rb').readline())
+    except (OSError, ValueError):
+        return None
+    if not reply.get('ok'):
+        raise QueryError(reply.get('error', 'daemon error'))
+    return reply['result']
+
+def main(argv: list = None):
     parser = argparse.ArgumentParser(description='Parse Obsidian tasks')
     parser.add_argument('--due-today', action='store_true', help='Tasks due today')
     parser.add_argument('--overdue', action='store_true', help='Overdue tasks')
@@ -114,28 +1299,147 @@ def main():
     parser.add_argument('--inbox', action='store_true', help='Tasks with #inbox tag')
     parser.add_argument('--undone', action='store_true', help='All undone tasks')
     parser.add_argument('--path', type=str, help='Custom vault path')
+    parser.add_argument('--no-index', action='store_true',
+                        help=f'Scan the vault directly, bypassing {INDEX_FILE}')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N',
+                        help='Parse files in N worker processes (0 = one per CPU)')
+    parser.add_argument('--query', type=str,
+                        help='Tasks-plugin-style query, one filter per line (e.g. "not done\\ndue before today")')
+    parser.add_argument('--buckets', type=str, metavar='NAMES',
+                        help=f'Comma-separated buckets from one scan: {",".join(BUCKET_QUERIES)}')
+    parser.add_argument('--forecast', type=str, metavar='WINDOW',
+                        help='Undone tasks and load per day/week: N days from today or FROM..TO')
+    parser.add_argument('--forecast-by', choices=FORECAST_PERIODS, default='day',
+                        help='Forecast period (default: day)')
+    parser.add_argument('--since-snapshot', nargs='?', const=SNAPSHOT_FILE, metavar='FILE',
+                        help=f'Print tasks added, completed, rescheduled or deleted since the last '
+                             f'snapshot and store a new one (default: {SNAPSHOT_FILE})')
+    parser.add_argument('--serve', action='store_true',
+                        help=f'Run as a daemon keeping tasks in memory, answering on {SOCKET_FILE}')
+    parser.add_argument('--no-daemon', action='store_true',
+                        help='Do not ask a running --serve daemon, always scan')
+    parser.add_argument('--ndjson', action='store_true',
+                        help='Stream one JSON task per line in path/line order (no priority sort)')
+    parser.add_argument('--fields', type=str, metavar='NAMES',
+                        help=f'Comma-separated task fields to output: {",".join(TASK_FIELDS)}')
+    parser.add_argument('--stats', '--profile', action='store_true',
+                        help='Print phase timings, scan counters, slowest and failed files to stderr as JSON')
+    parser.add_argument('--slowest', type=int, default=SLOWEST_FILES, metavar='N',
+                        help=f'Files listed under slowest_files with --stats (default: {SLOWEST_FILES})')
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
-    vault = Path(args.path) if args.path else VAULT_PATH
-    tasks = collect_tasks(vault)
+    vault = vault_path(args.path)
+    jobs = args.jobs or os.cpu_count() or 1
 
+    filter_type = None
     if args.due_today:
-        tasks = filter_tasks(tasks, 'due-today')
+        filter_type = 'due-today'
     elif args.overdue:
-        tasks = filter_tasks(tasks, 'overdue')
+        filter_type = 'overdue'
     elif args.no_date:
-        tasks = filter_tasks(tasks, 'no-date')
+        filter_type = 'no-date'
     elif args.inbox:
-        tasks = filter_tasks(tasks, 'inbox')
+        filter_type = 'inbox'
     elif args.undone:
-        tasks = filter_tasks(tasks, 'undone')
+        filter_type = 'undone'
+
+    buckets = None
+    if args.buckets:
+        buckets = [name.strip() for name in args.buckets.split(',') if name.strip()]
+        unknown = [name for name in buckets if name not in BUCKET_QUERIES]
+        if unknown:
+            parser.error(f'Unknown bucket(s): {", ".join(unknown)}')
+
+    forecast = None
+    if args.forecast:
+        if buckets:
+            parser.error('--forecast and --buckets are mutually exclusive')
+        forecast = {'window': args.forecast, 'by': args.forecast_by}
+
+    fields = None
+    if args.fields:
+        fields = tuple(name.strip() for name in args.fields.split(',') if name.strip())
+        unknown = [name for name in fields if name not in TASK_FIELDS]
+        if unknown:
+            parser.error(f'Unknown field(s): {", ".join(unknown)}')
 
-    # Sort by priority
-    priority_order = {'⏫': 0, '🔼': 1, '⚡': 1, '': 2, '🔽': 3}
-    tasks.sort(key=lambda t: priority_order.get(t['priority'], 2))
+    if args.serve:
+        if not hasattr(socket, 'AF_UNIX'):
+            parser.error('--serve needs Unix domain sockets')
+        serve(vault, jobs)
+        return
 
-    print(json.dumps(tasks, ensure_ascii=False, indent=2))
+    started = time.perf_counter()
+    stats = new_stats(args.slowest) if args.stats else None
+
+    if args.since_snapshot:
+        changes = project_changes(snapshot_changes(vault, vault / args.since_snapshot, jobs, stats), fields)
+        if args.ndjson:
+            write_ndjson({'change': kind, **task} for kind in CHANGE_KINDS for task in changes[kind])
+        else:
+            print(json.dumps(changes, ensure_ascii=False, indent=2))
+        if stats is not None:
+            print(json.dumps(finish_stats(stats, started)), file=sys.stderr)
+        return
+
+    request = {
+        'filter': filter_type, 'query': args.query, 'buckets': buckets,
+        'forecast': forecast, 'fields': fields, 'today': TODAY,
+        'order': 'path' if args.ndjson else 'priority',
+    }
+    result = None
+    try:
+        if not args.no_daemon:
+            result = query_daemon(vault, request)
+            if result is not None and stats is not None:
+                stats['served_by'] = 'daemon'
+                add_phase(stats, 'daemon', time.perf_counter() - started)
+        if result is None and args.ndjson and not (args.query or buckets or forecast):
+            # Pure pipeline: tasks are written while the scan is still running
+            tasks = stream_tasks(vault, filter_type, use_index=not args.no_index, jobs=jobs, stats=stats)
+            write_ndjson(task.as_dict(fields) for task in tasks)
+            result = []
+        elif result is None:
+            # a forecast only looks at undone tasks: let the index skip the rest
+            load_filter = filter_type or ('undone' if forecast else None)
+            tasks = load_tasks(vault, load_filter, use_index=not args.no_index, jobs=jobs, stats=stats)
+            query_started = time.perf_counter()
+            if args.query or buckets or forecast:
+                # the filter is already applied by load_tasks
+                result = answer_request(TaskQueryIndex(tasks), dict(request, filter=None))
+            else:
+                result = sort_by_priority(tasks)
+            result = to_json(result, fields)
+            add_phase(stats, 'query', time.perf_counter() - query_started)
+    except QueryError as e:
+        parser.error(str(e))
+
+    output_started = time.perf_counter()
+    if not args.ndjson:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    elif isinstance(result, dict) and 'periods' in result:
+        write_ndjson(
+            {'period': period['period'], **task}
+            for period in result['periods']
+            for task in period['tasks']
+        )
+    elif isinstance(result, dict):
+        write_ndjson(
+            {'bucket': name, **task}
+            for name, bucket in result['buckets'].items()
+            for task in bucket['tasks']
+        )
+    else:
+        write_ndjson(result)
+    if stats is not None:
+        add_phase(stats, 'output', time.perf_counter() - output_started)
+        print(json.dumps(finish_stats(stats, started)), file=sys.stderr)
 
 if __name__ == '__main__':
-    main()
+    try:
+        main()
+    except BrokenPipeError:
+        # Output piped into `head` and friends: stop quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Apply a batch of task edits to Obsidian vault notes.
+
+Usage:
+    python task-edit.py [--ops FILE] [--path PATH] [--dry-run] < ops.json
+
+Input: JSON array of operations, one object per task:
+    {"id": "8c8960e4d79b", "file": "Base/Project.md", "line": 3, "hash": "5d41402abc4b",
+     "done": true, "due": "2026-01-20", "priority": "⏫",
+     "add_tags": ["#wait"], "remove_tags": ["#inbox"]}
+
+`id`, `file`, `line` and `hash` come from parse-tasks.py output; every
+other key is optional:
+    done         true marks `- [x]` and appends `✅ YYYY-MM-DD` (today, or
+                 "done_date"); a task already done keeps its date unless
+                 "done_date" is given; false reopens the task and drops it
+    due          "YYYY-MM-DD" sets `📅`, "" removes it
+    priority     one of ⏫ 🔼 🔽 ⚡, or "" to clear
+    add_tags / remove_tags
+                 lists of `#tag`s
+
+Operations are grouped per file: each note is read once, every target
+line is verified by task id (falling back to an id lookup when lines have
+shifted), and the note is written back atomically once. With `hash` the
+operation is rejected when the task line changed since it was read
+(status, dates, priority or tags edited in the meantime), instead of
+overwriting that change.
+
+Output: JSON report with applied/failed operations and files written.
+"""
+
+import importlib.util
+import re
+import sys
+from datetime import date
+from pathlib import Path
+
+from vaultcore import CHECKLIST_PATTERN, TAG_PATTERN, lazy_import, vault_path, write_atomic
+
+argparse = lazy_import('argparse')
+json = lazy_import('json')
+
+TODAY = date.today().isoformat()
+
+DUE_PATTERN = re.compile(r'\s*📅\s*\d{4}-\d{2}-\d{2}')
+DONE_PATTERN = re.compile(r'\s*✅\s*\d{4}-\d{2}-\d{2}')
+PRIORITY_PATTERN = re.compile(r'\s*[⏫🔼🔽⚡]')
+PRIORITIES = ('⏫', '🔼', '🔽', '⚡')
+
+
+def _load_parse_tasks():
+    """Import parse-tasks.py so task ids are computed exactly as it does."""
+    if 'parse_tasks' in sys.modules:
+        return sys.modules['parse_tasks']  # already loaded by day.py
+    path = Path(__file__).with_name('parse-tasks.py')
+    spec = importlib.util.spec_from_file_location('parse_tasks', path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['parse_tasks'] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+parse_tasks = _load_parse_tasks()
+
+
+class EditError(ValueError):
+    """Raised for an operation that cannot be applied."""
+
+
+def _remove_tag(text: str, tag: str) -> str:
+    # `#project/alpha` reads as `#project`, so the whole token goes
+    return re.sub(r'\s*' + re.escape(tag) + r'(?!\w)[\w/-]*', '', text)
+
+
+def _insert_at(text: str, pos: int, token: str) -> str:
+    return f'{text[:pos].rstrip()} {token} {text[pos:].lstrip()}'.strip()
+
+
+def _dates_start(text: str) -> int:
+    """Position of the first 📅/✅ date, or the end of the text."""
+    match = re.search(r'\s*[📅✅]', text)
+    return match.start() if match else len(text)
+
+
+def apply_operation(line: str, op: dict) -> str:
+    """Return the task line with one operation applied."""
+    cr = '\r' if line.endswith('\r') else ''
+    line = line[:len(line) - len(cr)]
+    match = CHECKLIST_PATTERN.match(line)  # the same lines parse-tasks.py reads as tasks
+    if not match:
+        raise EditError('not a task line')
+    status, text = match.group(2), match.group(3).rstrip()
+
+    for key in ('remove_tags', 'add_tags'):
+        tags = op.get(key, [])
+        if not isinstance(tags, list):
+            raise EditError(f'{key} must be a list of tags')
+        for tag in tags:
+            if not isinstance(tag, str) or not TAG_PATTERN.fullmatch(tag):
+                raise EditError(f'not a tag: {tag!r}')
+
+    for tag in op.get('remove_tags', ()):
+        text = _remove_tag(text, tag)
+    for tag in op.get('add_tags', ()):
+        if not re.search(re.escape(tag) + r'(?!\w)', text):
+            tags = list(TAG_PATTERN.finditer(text))
+            text = _insert_at(text, tags[-1].end() if tags else _dates_start(text), tag)
+
+    if 'priority' in op:
+        priority = op['priority']
+        if priority and priority not in PRIORITIES:
+            raise EditError(f'unknown priority: {priority}')
+        text = PRIORITY_PATTERN.sub('', text)
+        if priority:
+            first_tag = TAG_PATTERN.search(text)
+            text = _insert_at(text, first_tag.start() if first_tag else _dates_start(text), priority)
+
+    if 'due' in op:
+        due = op['due']
+        if due:
+            date.fromisoformat(due)  # validate
+        text = DUE_PATTERN.sub('', text)
+        if due:
+            done_match = DONE_PATTERN.search(text)
+            text = _insert_at(text, done_match.start() if done_match else len(text), f'📅 {due}')
+
+    if 'done' in op:
+        done_match = DONE_PATTERN.search(text)
+        if op['done'] and done_match and not op.get('done_date'):
+            status = 'x'  # already done: keep the date it was done on
+        elif op['done']:
+            done_date = op.get('done_date') or TODAY
+            date.fromisoformat(done_date)  # validate
+            status = 'x'
+            text = f'{DONE_PATTERN.sub("", text)} ✅ {done_date}'
+        else:
+            status = ' '
+            text = DONE_PATTERN.sub('', text)
+
+    return f'{line[:match.start(2)]}{status}{line[match.end(2):match.start(3)]}{text.strip()}{cr}'
+
+
+def edit_file(vault: Path, rel: str, ops: list, dry_run: bool = False):
+    """Apply all operations for one file with a single read and write.
+
+    Returns (applied ops, failed ops with errors).
+    """
+    path = vault / rel
+    content = path.read_text(encoding='utf-8')
+    lines = content.split('\n')  # parse-tasks counts lines by '\n' only
+    by_id = {t.id: t for t in parse_tasks.parse_tasks_from_text(content, rel)}
+    by_line = {t.line: t for t in by_id.values()}
+
+    applied, failed = [], []
+    for op in ops:
+        task = by_line.get(op.get('line'))
+        if not task or task.id != op['id']:
+            task = by_id.get(op['id'])  # lines shifted since parse-tasks ran
+        if not task:
+            failed.append(dict(op, error='task not found (edited or removed since it was read)'))
+            continue
+        if op.get('hash') and op['hash'] != task.hash:
+            failed.append(dict(op, error='task changed since it was read'))
+            continue
+        index = task.line - 1
+        try:
+            lines[index] = apply_operation(lines[index], op)
+        except (EditError, ValueError) as e:
+            failed.append(dict(op, error=str(e)))
+            continue
+        applied.append(dict(op, line=task.line))
+
+    if applied and not dry_run:
+        write_atomic(path, '\n'.join(lines))
+    return applied, failed
+
+
+def apply_batch(vault: Path, ops: list, dry_run: bool = False) -> dict:
+    """Group operations by file and apply them, one write per file."""
+    by_file = {}
+    failed = []
+    for op in ops:
+        if not isinstance(op, dict) or not op.get('id') or not op.get('file'):
+            failed.append({'op': op, 'error': 'operation needs "id" and "file"'})
+            continue
+        by_file.setdefault(op['file'], []).append(op)
+
+    applied = []
+    files_written = []
+    for rel, file_ops in by_file.items():
+        try:
+            done, errors = edit_file(vault, rel, file_ops, dry_run)
+        except (OSError, UnicodeDecodeError) as e:
+            failed.extend(dict(op, error=str(e)) for op in file_ops)
+            continue
+        applied.extend(done)
+        failed.extend(errors)
+        if done:
+            files_written.append(rel)
+
+    return {
+        'applied': len(applied),
+        'failed': failed,
+        'files_written': [] if dry_run else files_written,
+        'dry_run': dry_run,
+    }
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description='Apply a batch of edits to Obsidian tasks')
+    parser.add_argument('--ops', type=str, help='JSON file with operations (default: stdin)')
+    parser.add_argument('--path', type=str, help='Custom vault path')
+    parser.add_argument('--dry-run', action='store_true', help='Verify operations without writing')
+
+    args = parser.parse_args(argv)
+    vault = vault_path(args.path)
+
+    try:
+        raw = Path(args.ops).read_text(encoding='utf-8') if args.ops else sys.stdin.read()
+        ops = json.loads(raw)
+    except (OSError, ValueError) as e:
+        parser.error(f'Cannot read operations: {e}')
+    if not isinstance(ops, list):
+        ops = [ops]
+
+    result = apply_batch(vault, ops, args.dry_run)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    sys.exit(0 if not result['failed'] else 1)
+
+
+if __name__ == '__main__':
+    main()
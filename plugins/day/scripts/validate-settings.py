@@ -3,18 +3,23 @@
 Validate Day plugin settings and vault structure.
 
 Usage:
-    python validate-settings.py [--path PATH]
+    python validate-settings.py [--path PATH] [--quiet] [--stats]
 
 Output: JSON with validation status and issues.
+
+`--stats` (alias `--profile`) prints per-phase wall time, files and
+directories checked, bytes read and files that failed to read to stderr
+as JSON.
 """
 
-import argparse
-import json
-import re
+import sys
+import time
 from pathlib import Path
 
-VAULT_PATH = Path.cwd()
-SETTINGS_FILE = '.claude/day-patterns.md'
+from vaultcore import SETTINGS_FILE, find_section, lazy_import, read_settings, vault_path
+
+argparse = lazy_import('argparse')
+json = lazy_import('json')
 
 REQUIRED_SECTIONS = [
     '## Утренняя рутина',
@@ -26,7 +31,7 @@ REQUIRED_DIRS = ['Dailies', 'Base', 'Base/Meetings']
 REQUIRED_FILES = ['Inbox.md']
 
 
-def validate_settings(vault: Path) -> dict:
+def validate_settings(vault: Path, stats: dict = None) -> dict:
     """Validate settings file exists and has required sections."""
     settings_path = vault / SETTINGS_FILE
     result = {
@@ -43,10 +48,21 @@ def validate_settings(vault: Path) -> dict:
         return result
 
     result['exists'] = True
-    content = settings_path.read_text(encoding='utf-8')
+    try:
+        content = read_settings(vault)
+    except (OSError, UnicodeDecodeError) as e:
+        result['sections_missing'] = [s.replace('## ', '') for s in REQUIRED_SECTIONS]
+        result['error'] = f'Cannot read settings file: {e}'
+        if stats is not None:
+            stats['files_failed'] += 1
+            stats['failed_files'].append({'file': SETTINGS_FILE, 'error': f'{type(e).__name__}: {e}'})
+        return result
+    if stats is not None:
+        stats['files_parsed'] += 1
+        stats['bytes_read'] += len(content.encode('utf-8'))
 
     for section in REQUIRED_SECTIONS:
-        if section in content:
+        if find_section(content, section, prefix=True) is not None:  # headings may carry a note
             result['sections_found'].append(section.replace('## ', ''))
         else:
             result['sections_missing'].append(section.replace('## ', ''))
@@ -55,7 +71,7 @@ def validate_settings(vault: Path) -> dict:
     return result
 
 
-def validate_vault_structure(vault: Path) -> dict:
+def validate_vault_structure(vault: Path, stats: dict = None) -> dict:
     """Validate vault has required directories and files."""
     result = {
         'dirs_found': [],
@@ -79,6 +95,10 @@ def validate_vault_structure(vault: Path) -> dict:
         else:
             result['files_missing'].append(file_name)
 
+    if stats is not None:
+        stats['dirs_checked'] += len(REQUIRED_DIRS)
+        stats['files_checked'] += len(REQUIRED_FILES)
+
     result['valid'] = (
         len(result['dirs_missing']) == 0 and
         len(result['files_missing']) == 0
@@ -86,16 +106,42 @@ def validate_vault_structure(vault: Path) -> dict:
     return result
 
 
-def main():
+def timed_phase(stats: dict, phase: str, func, *args):
+    """Call func, charging its wall time to stats['phases'][phase]."""
+    if stats is None:
+        return func(*args)
+    start = time.perf_counter()
+    try:
+        return func(*args, stats=stats)
+    finally:
+        stats['phases'][phase] = round(time.perf_counter() - start, 4)
+
+
+def main(argv: list = None):
     parser = argparse.ArgumentParser(description='Validate Day plugin settings')
     parser.add_argument('--path', type=str, help='Custom vault path')
     parser.add_argument('--quiet', action='store_true', help='Only show errors')
-
-    args = parser.parse_args()
-    vault = Path(args.path) if args.path else VAULT_PATH
-
-    settings = validate_settings(vault)
-    vault_struct = validate_vault_structure(vault)
+    parser.add_argument('--stats', '--profile', action='store_true',
+                        help='Print phase timings and file counters to stderr as JSON')
+
+    args = parser.parse_args(argv)
+    vault = vault_path(args.path)
+
+    started = time.perf_counter()
+    stats = None
+    if args.stats:
+        stats = {
+            'phases': {},
+            'files_checked': 0,
+            'dirs_checked': 0,
+            'files_parsed': 0,
+            'files_failed': 0,
+            'bytes_read': 0,
+            'failed_files': [],
+        }
+
+    settings = timed_phase(stats, 'settings', validate_settings, vault)
+    vault_struct = timed_phase(stats, 'structure', validate_vault_structure, vault)
 
     result = {
         'vault': str(vault),
@@ -109,7 +155,12 @@ def main():
     else:
         print(json.dumps(result, ensure_ascii=False, indent=2))
 
-    exit(0 if result['valid'] else 1)
+    if stats is not None:
+        stats['files_checked'] += 1  # the settings file itself
+        stats['phases']['total'] = round(time.perf_counter() - started, 4)
+        print(json.dumps(stats), file=sys.stderr)
+
+    sys.exit(0 if result['valid'] else 1)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,45 @@
+"""
+Shared core of the vault scripts: markdown checklists, frontmatter,
+`## Section` bodies, vault paths and lazy imports.
+
+Scripts import it from their own directory. An installed plugin cannot
+reach files of another one, so the books plugin ships its own copy
+(skills/extracting-book-toc/scripts/vaultcore); edit both together,
+tests/test_vaultcore.py checks that they stay identical.
+
+Only `re`, `os`, `tempfile`, `pathlib` and `functools` are imported eagerly; modules a
+script needs on some code paths only are bound with lazy_import().
+"""
+
+import importlib.util
+import sys
+
+from .files import SETTINGS_FILE, read_note, read_settings, vault_path, write_atomic
+from .markdown import (
+    CHECKLIST_PATTERN,
+    TAG_PATTERN,
+    ChecklistItem,
+    find_section,
+    iter_checklist,
+    section_text,
+    set_frontmatter,
+    split_frontmatter,
+)
+
+
+def lazy_import(name: str):
+    """Return module `name`, executed on first attribute access.
+
+    Keeps interpreter start-up cheap for code paths that never touch the
+    module (sqlite3 when the daemon answers, argparse when imported as a
+    library, ...).
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
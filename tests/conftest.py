@@ -0,0 +1,22 @@
+"""Load plugin scripts with dashed file names as modules."""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def load_script(relpath: str):
+    """Import a plugin script such as plugins/day/scripts/task-edit.py."""
+    path = REPO_ROOT / relpath
+    name = path.stem.replace('-', '_')
+    if name in sys.modules:
+        return sys.modules[name]
+    if str(path.parent) not in sys.path:
+        sys.path.append(str(path.parent))  # scripts import vaultcore from their directory
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
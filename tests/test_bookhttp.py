@@ -0,0 +1,290 @@
+"""Response cache, circuit breaker and source selection of the extracting-book-toc scripts."""
+
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import load_script
+
+fetch_toc = load_script('plugins/books/skills/extracting-book-toc/scripts/fetch-toc.py')
+
+# bookhttp is importable once load_script has put the scripts folder on sys.path
+from bookhttp import CircuitBreaker, HttpCache, Response, RetryPolicy, breaker, source_ttl  # noqa: E402
+from bookhttp.replay import make_headers  # noqa: E402
+
+URL = 'https://api.example.org/books/1'
+
+
+class FakeClient:
+    """Answers GETs from a script of (status, headers, body) tuples or exceptions."""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def get(self, url, headers=None, timeout=None, consume=None):
+        with self.lock:
+            self.requests.append((url, dict(headers or {})))
+            answer = self.answers.pop(0) if len(self.answers) > 1 else self.answers[0]
+        if isinstance(answer, Exception):
+            raise answer
+        status, headers, body = answer
+        return Response(url, status, make_headers(headers.items()), body)
+
+
+@pytest.fixture
+def http(tmp_path, monkeypatch):
+    """fetch-toc wired to a fake client, an empty cache and a breaker without a file."""
+    def use(*answers, threshold=3):
+        client = FakeClient(*answers)
+        monkeypatch.setattr(fetch_toc, 'CLIENT', client)
+        monkeypatch.setattr(fetch_toc, 'BREAKER', CircuitBreaker(None, threshold=threshold, cooldown=60))
+        return client
+
+    monkeypatch.setattr(fetch_toc, 'CACHE', HttpCache(tmp_path / 'cache'))
+    monkeypatch.setattr(fetch_toc, 'RETRY', RetryPolicy(attempts=1))
+    monkeypatch.setattr(fetch_toc, 'VERBOSE', False)
+    return use
+
+
+def make_stale(cache: HttpCache, url: str):
+    entry = cache.get(url)
+    entry.fetched -= entry.ttl + 1
+    cache.write(entry)
+
+
+# ==================== HttpCache ====================
+
+def test_cache_entry_round_trip_and_ttl(tmp_path):
+    cache = HttpCache(tmp_path)
+    entry = cache.put(URL, 200, b'{"title": "Book"}', {'ETag': '"v1"', 'Last-Modified': 'Mon, 05 Jan 2026 10:00:00 GMT'})
+    stored = cache.get(URL)
+    assert stored == entry
+    assert stored.body == b'{"title": "Book"}'
+    assert stored.validators() == {'If-None-Match': '"v1"', 'If-Modified-Since': 'Mon, 05 Jan 2026 10:00:00 GMT'}
+    assert stored.is_fresh(stored.fetched + stored.ttl - 1)
+    assert not stored.is_fresh(stored.fetched + stored.ttl)
+    assert cache.get(URL + '?other') is None
+
+
+@pytest.mark.parametrize('url, status, ttl', [
+    ('https://www.litres.ru/pages/toc/', 200, 30 * 86400),
+    ('https://openlibrary.org/isbn/1.json', 200, 7 * 86400),
+    ('https://www.googleapis.com/books/v1/volumes', 200, 86400),
+    ('https://notlitres.ru/toc', 200, 86400),
+    ('https://www.litres.ru/pages/toc/', 404, 86400),
+])
+def test_source_ttl(url, status, ttl):
+    assert source_ttl(url, status) == ttl
+
+
+def test_cache_ignores_entries_of_another_version(tmp_path):
+    cache = HttpCache(tmp_path)
+    cache.put(URL, 200, b'body')
+    path = cache.path(URL)
+    meta, body = path.read_bytes().split(b'\n', 1)
+    path.write_bytes(json.dumps(dict(json.loads(meta), version=0)).encode() + b'\n' + body)
+    assert cache.get(URL) is None
+
+
+def test_fresh_entry_is_served_without_request(http):
+    client = http((200, {'ETag': '"v1"'}, b'first'))
+    assert fetch_toc.fetch_url(URL) == 'first'
+    assert fetch_toc.fetch_url(URL) == 'first'
+    assert len(client.requests) == 1
+
+
+def test_stale_entry_is_revalidated(http):
+    client = http((200, {'ETag': '"v1"'}, b'first'), (304, {'ETag': '"v2"'}, b''))
+    fetch_toc.fetch_url(URL)
+    make_stale(fetch_toc.CACHE, URL)
+    assert fetch_toc.fetch_url(URL) == 'first'
+    assert client.requests[1][1] == {'If-None-Match': '"v1"'}
+    entry = fetch_toc.CACHE.get(URL)
+    assert entry.is_fresh() and entry.etag == '"v2"' and entry.body == b'first'
+
+
+def test_stale_entry_is_replaced_by_new_body(http):
+    http((200, {'ETag': '"v1"'}, b'first'), (200, {'ETag': '"v2"'}, b'second'))
+    fetch_toc.fetch_url(URL)
+    make_stale(fetch_toc.CACHE, URL)
+    assert fetch_toc.fetch_url(URL) == 'second'
+    assert fetch_toc.CACHE.get(URL).etag == '"v2"'
+
+
+def test_stale_entry_is_used_when_source_fails(http):
+    http((200, {}, b'first'), (503, {}, b''))
+    fetch_toc.fetch_url(URL)
+    make_stale(fetch_toc.CACHE, URL)
+    assert fetch_toc.fetch_url(URL) == 'first'
+    assert not fetch_toc.CACHE.get(URL).is_fresh()
+
+
+def test_not_found_is_cached(http):
+    client = http((404, {}, b'missing'))
+    assert fetch_toc.fetch_url(URL) is None
+    entry = fetch_toc.CACHE.get(URL)
+    assert entry.status == 404 and entry.body is None
+    assert fetch_toc.fetch_url(URL) is None
+    assert len(client.requests) == 1
+
+
+def test_offline_cache_never_requests(http):
+    client = http((200, {}, b'first'))
+    fetch_toc.fetch_url(URL)
+    make_stale(fetch_toc.CACHE, URL)
+    fetch_toc.CACHE.offline = True
+    assert fetch_toc.fetch_url(URL) == 'first'
+    assert fetch_toc.fetch_url(URL + '/other') is None
+    assert len(client.requests) == 1
+
+
+# ==================== CircuitBreaker ====================
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(breaker, 'time', SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+def test_breaker_opens_after_threshold(clock):
+    b = CircuitBreaker(None, threshold=3, cooldown=60)
+    b.failure('a.org')
+    b.failure('a.org')
+    assert b.allow('a.org') and b.retry_at('a.org') is None
+    b.failure('a.org')
+    assert not b.allow('a.org')
+    assert b.retry_at('a.org') == 1060
+    assert b.allow('b.org')  # hosts are independent
+
+
+def test_breaker_success_resets_failures(clock):
+    b = CircuitBreaker(None, threshold=3, cooldown=60)
+    b.failure('a.org')
+    b.failure('a.org')
+    b.success('a.org')
+    b.failure('a.org')
+    b.failure('a.org')
+    assert b.allow('a.org')
+
+
+def test_breaker_half_open_probe(clock):
+    b = CircuitBreaker(None, threshold=1, cooldown=60)
+    b.failure('a.org')
+    clock.value = 1059
+    assert not b.allow('a.org')
+    clock.value = 1060
+    assert b.allow('a.org')  # one probe after the cooldown
+    assert not b.allow('a.org')  # and only one at a time
+
+    b.release('a.org')  # the probe ended without a verdict
+    assert b.allow('a.org')
+
+    b.failure('a.org')  # failed probe opens the circuit again
+    assert not b.allow('a.org')
+    assert b.retry_at('a.org') == 1120
+
+    clock.value = 1120
+    assert b.allow('a.org')
+    b.success('a.org')  # successful probe closes it
+    assert b.allow('a.org') and b.allow('a.org')
+    assert b.retry_at('a.org') is None
+
+
+def test_breaker_state_survives_restart(tmp_path, clock):
+    path = tmp_path / 'breaker.json'
+    CircuitBreaker(path, threshold=2, cooldown=60).failure('a.org')
+    b = CircuitBreaker(path, threshold=2, cooldown=60)
+    b.failure('a.org')
+    assert not CircuitBreaker(path, threshold=2, cooldown=60).allow('a.org')
+
+    clock.value = 1060
+    b = CircuitBreaker(path, threshold=2, cooldown=60)
+    assert b.allow('a.org')
+    b.success('a.org')
+    assert json.loads(path.read_text(encoding='utf-8')) == {}
+
+
+def test_breaker_ignores_broken_state_file(tmp_path):
+    path = tmp_path / 'breaker.json'
+    path.write_text('{"a.org": {"failures": "many"}, "b.org": 3', encoding='utf-8')
+    assert CircuitBreaker(path).hosts == {}
+    path.write_text('{"a.org": {"failures": "many"}, "b.org": {"failures": 1, "opened": null}}', encoding='utf-8')
+    assert CircuitBreaker(path).hosts == {'b.org': {'failures': 1, 'opened': None}}
+
+
+def test_open_circuit_skips_request(http):
+    client = http((503, {}, b''), threshold=1)
+    assert fetch_toc.fetch_url(URL) is None
+    assert fetch_toc.fetch_url(URL) is None
+    assert len(client.requests) == 1
+
+
+# ==================== first_found ====================
+
+def after(seconds: float, result):
+    def lookup():
+        time.sleep(seconds)
+        return result
+    return lookup
+
+
+def test_first_found_prefers_priority_over_speed():
+    timings = {}
+    lookups = [('slow', after(0.2, 'a')), ('fast', after(0, 'b'))]
+    assert fetch_toc.first_found(lookups, timings=timings) == ('slow', 'a')
+    assert timings['slow']['status'] == timings['fast']['status'] == 'found'
+
+
+def test_first_found_falls_through_empty_and_failed_sources():
+    def broken():
+        raise ValueError('bad JSON')
+
+    timings = {}
+    lookups = [('empty', after(0, None)), ('broken', broken), ('last', after(0.05, 'c'))]
+    assert fetch_toc.first_found(lookups, timings=timings) == ('last', 'c')
+    assert {name: t['status'] for name, t in timings.items()} == {'empty': 'empty', 'broken': 'error', 'last': 'found'}
+    assert fetch_toc.first_found([('none', after(0, None))]) == (None, None)
+
+
+def test_first_found_returns_best_result_at_deadline():
+    timings = {}
+    started = time.monotonic()
+    lookups = [('hung', after(2, 'a')), ('quick', after(0, 'b'))]
+    assert fetch_toc.first_found(lookups, deadline=0.2, timings=timings) == ('quick', 'b')
+    assert time.monotonic() - started < 1
+    assert timings['hung']['status'] == 'timeout'
+
+
+def test_first_found_sequential_stops_at_winner():
+    timings = {}
+    lookups = [('empty', after(0, None)), ('first', after(0, 'a')), ('second', after(0, 'b'))]
+    assert fetch_toc.first_found(lookups, sequential=True, timings=timings) == ('first', 'a')
+    assert timings['second']['status'] == 'skipped'
+
+
+def test_lookup_charges_breaker_once_per_host(http):
+    http((503, {}, b''))
+
+    def lookup():
+        fetch_toc.fetch_url(URL + '/a')
+        fetch_toc.fetch_url(URL + '/b')
+
+    assert fetch_toc.first_found([('source', lookup)]) == (None, None)
+    assert fetch_toc.BREAKER.hosts['api.example.org']['failures'] == 1
+
+
+def test_lookup_does_not_charge_host_that_answered(http):
+    http((503, {}, b''), (200, {}, b'found'))
+
+    def lookup():
+        fetch_toc.fetch_url(URL + '/a')
+        return fetch_toc.fetch_url(URL + '/b')
+
+    assert fetch_toc.first_found([('source', lookup)], sequential=True) == ('source', 'found')
+    assert 'api.example.org' not in fetch_toc.BREAKER.hosts
@@ -0,0 +1,91 @@
+"""parse-tasks.py gives the same answer with and without a --serve daemon."""
+
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from conftest import REPO_ROOT, load_script
+
+parse_tasks = load_script('plugins/day/scripts/parse-tasks.py')
+SCRIPT = REPO_ROOT / 'plugins/day/scripts/parse-tasks.py'
+
+
+def day(offset: int) -> str:
+    return (date.today() + timedelta(days=offset)).isoformat()
+
+
+@pytest.fixture
+def vault(tmp_path):
+    (tmp_path / 'Dailies').mkdir()
+    (tmp_path / 'Base').mkdir()
+    (tmp_path / 'Inbox.md').write_text(
+        '- [ ] Call Bob #task #inbox\n'
+        '- [ ] Mixed case #task #Inbox\n'
+        '- [ ] Mentions #inbox only in a link [[#inbox]] #task\n'
+        '- [ ] Not a tag foo#inbox #task\n', encoding='utf-8')
+    (tmp_path / 'Dailies' / 'today.md').write_text(
+        f'- [ ] Low #task 🔽 📅 {day(0)}\n'
+        f'- [ ] Urgent #task ⏫ 📅 {day(0)}\n'
+        f'- [ ] Late #task 🔼 📅 {day(-3)}\n'
+        '- [ ] Someday #task\n'
+        f'- [x] Done #task ✅ {day(-1)}\n', encoding='utf-8')
+    (tmp_path / 'Base' / 'Project.md').write_text(
+        f'- [ ] Plan #task #work ⏫ 📅 {day(5)}\n'
+        '- [ ] Draft #task #work/alpha\n', encoding='utf-8')
+    return tmp_path
+
+
+def run(vault, *args):
+    result = subprocess.run([sys.executable, str(SCRIPT), '--path', str(vault), *args],
+                            capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+@pytest.fixture
+def daemon(vault):
+    process = subprocess.Popen([sys.executable, str(SCRIPT), '--path', str(vault), '--serve'],
+                               stderr=subprocess.DEVNULL)
+    socket = parse_tasks.socket_path(vault)
+    for _ in range(100):
+        if socket.exists():
+            break
+        time.sleep(0.05)
+    else:
+        process.kill()
+        pytest.fail('daemon did not start')
+    yield process
+    process.terminate()
+    process.wait(timeout=5)
+
+
+@pytest.mark.parametrize('args', [
+    (),
+    ('--ndjson',),
+    ('--inbox',),
+    ('--inbox', '--ndjson'),
+    ('--overdue',),
+    ('--due-today', '--fields', 'text,priority'),
+    ('--query', 'tag includes #work'),
+    ('--query', 'not done\nhas due date', '--ndjson'),
+    ('--buckets', 'due-today,overdue,inbox,dailies'),
+    ('--forecast', '7', '--forecast-by', 'day'),
+])
+def test_daemon_matches_direct_scan(vault, daemon, args):
+    assert run(vault, *args) == run(vault, '--no-daemon', *args)
+
+
+@pytest.mark.parametrize('name', sorted(parse_tasks.FILTERS))
+def test_filters_match_bucket_queries(vault, name):
+    tasks = parse_tasks.collect_tasks(vault)
+    by_predicate = {t.id for t in parse_tasks.filter_tasks(tasks, name)}
+    by_query = {t.id for t in parse_tasks.TaskQueryIndex(tasks).query(parse_tasks.BUCKET_QUERIES[name])}
+    index = parse_tasks.TaskIndex(vault)
+    try:
+        index.refresh()
+        by_sql = {t.id for t in index.tasks(name)}
+    finally:
+        index.close()
+    assert by_predicate == by_query == by_sql
@@ -0,0 +1,165 @@
+"""Progress tree and batch cache of extracting-book-toc/scripts/calculate-progress.py."""
+
+import json
+import os
+
+import pytest
+
+from conftest import load_script
+
+progress = load_script('plugins/books/skills/extracting-book-toc/scripts/calculate-progress.py')
+
+BOOK = '''---
+title: {title}
+status: {status}
+total: 300
+---
+# {title}
+
+{intro}
+
+## Прогресс
+{checklist}
+'''
+CHECKLIST = '''- [x] Часть 1 [1-100]
+    - [x] Глава 1 [1-50]
+    - [x] Глава 2 [51-100]
+- [ ] Часть 2 [101-200]
+    - [x] Глава 3 [101-150]
+    - [ ] Глава 4 [151-200]
+- [ ] Заключение [201-210]'''
+
+
+def book(title='Книга', status='reading', intro='', checklist=CHECKLIST) -> str:
+    return BOOK.format(title=title, status=status, intro=intro, checklist=checklist)
+
+
+@pytest.mark.parametrize('line, expected', [
+    ('- [x] Глава [w:120]', ('Глава', True, 120, None, None)),
+    ('- [ ] Глава [1-89]', ('Глава', False, None, 1, 89)),
+    ('- [X] Глава [w:5] [10-20] конец', ('Глава конец', True, 5, 10, 20)),
+    ('- [ ] Глава [примечание]', ('Глава [примечание]', False, None, None, None)),
+])
+def test_parse_progress_markers(line, expected):
+    item, = progress.parse_progress_text(line)
+    assert (item.title, item.completed, item.weight, item.pages_start, item.pages_end) == expected
+
+
+def test_tree_sums_every_subtree():
+    tree = progress.build_tree(progress.parse_progress_text(CHECKLIST))
+    assert [node.item.title for node in tree.children] == ['Часть 1', 'Часть 2', 'Заключение']
+    assert (tree.totals.items, tree.totals.completed, tree.totals.pages, tree.totals.max_page) == (7, 4, 410, 210)
+    part2 = tree.children[1]
+    assert (part2.totals.items, part2.totals.completed, part2.totals.completed_pages) == (3, 1, 50)
+    assert tree.children[2].totals is None  # leaves carry no totals of their own
+
+
+def test_calculate_progress_by_pages_with_parts():
+    result = progress.calculate_progress(progress.parse_progress_text(CHECKLIST), total_pages=300)
+    assert result['method'] == 'pages'
+    assert (result['completed_pages'], result['total_pages'], result['progress']) == (250, 300, 83.3)
+    assert result['parts'] == [
+        {'title': 'Часть 1', 'progress': 100.0, 'completed_items': 3, 'total_items': 3},
+        {'title': 'Часть 2', 'progress': 25.0, 'completed_items': 1, 'total_items': 3},  # 50 of 100 + 50 + 50
+    ]
+
+
+@pytest.mark.parametrize('checklist, method, value', [
+    ('- [x] А [w:30]\n- [ ] Б [w:10]', 'weight', 75.0),
+    ('- [x] А\n- [ ] Б\n- [ ] В', 'items', 33.3),
+    ('- [x] А [w:0]\n- [ ] Б [w:0]', 'items', 50.0),
+    ('', 'items', 0),
+])
+def test_calculate_progress_method(checklist, method, value):
+    result = progress.calculate_progress(progress.parse_progress_text(checklist))
+    assert (result['method'], result['progress']) == (method, value)
+
+
+def test_section_key_covers_checklist_and_total():
+    key = progress.section_key(CHECKLIST, 300)
+    assert key == progress.section_key(CHECKLIST, 300)
+    assert key != progress.section_key(CHECKLIST, 301)
+    assert key != progress.section_key(CHECKLIST.replace('[ ] Глава 4', '[x] Глава 4'), 300)
+
+
+@pytest.fixture
+def books(tmp_path):
+    directory = tmp_path / 'Base'
+    directory.mkdir()
+    (directory / 'One.md').write_text(book('Один'), encoding='utf-8')
+    (directory / 'Two.md').write_text(book('Два', checklist='- [x] А\n- [ ] Б'), encoding='utf-8')
+    (directory / 'Done.md').write_text(book('Прочитано', status='done'), encoding='utf-8')
+    (directory / 'Note.md').write_text('# Просто заметка\n', encoding='utf-8')
+    return directory
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Count checklists actually parsed by calculate_progress."""
+    calls = []
+    original = progress.calculate_progress
+
+    def counting(items, total_pages=None):
+        calls.append(len(items))
+        return original(items, total_pages)
+
+    monkeypatch.setattr(progress, 'calculate_progress', counting)
+    return calls
+
+
+def touch(path, content: str):
+    st = os.stat(path)
+    path.write_text(content, encoding='utf-8')
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_collect_progress_uses_cache(books, tmp_path, parses):
+    cache_path = tmp_path / 'cache.json'
+    first = progress.collect_progress(books, cache_path=cache_path)
+    assert [b['title'] for b in first] == ['Один', 'Два']
+    assert 'parts' not in first[0]
+    assert len(parses) == 3  # the done book is parsed and cached too
+
+    parses.clear()
+    assert progress.collect_progress(books, cache_path=cache_path) == first
+    assert parses == []
+
+    assert [b['title'] for b in progress.collect_progress(books, statuses=None, cache_path=cache_path)] == [
+        'Один', 'Прочитано', 'Два']
+    assert parses == []
+
+
+def test_edit_outside_progress_section_reuses_result(books, tmp_path, parses):
+    cache_path = tmp_path / 'cache.json'
+    progress.collect_progress(books, cache_path=cache_path)
+    parses.clear()
+
+    touch(books / 'One.md', book('Один', intro='Заметки на полях.'))
+    assert progress.collect_progress(books, cache_path=cache_path)[0]['progress'] == 83.3
+    assert parses == []
+
+
+def test_progress_edit_replaces_cached_section(books, tmp_path, parses):
+    cache_path = tmp_path / 'cache.json'
+    progress.collect_progress(books, cache_path=cache_path)
+    before = set(progress.load_cache(cache_path)[1])
+    parses.clear()
+
+    touch(books / 'Two.md', book('Два', checklist='- [x] А\n- [x] Б'))
+    result = {b['title']: b['progress'] for b in progress.collect_progress(books, cache_path=cache_path)}
+    assert result == {'Один': 83.3, 'Два': 100.0}
+    assert parses == [2]
+
+    files, sections = progress.load_cache(cache_path)
+    assert len(before) == len(sections) == 2  # One.md and Done.md share a checklist
+    assert len(before - set(sections)) == 1  # the old checklist of Two.md is pruned
+    assert {entry['book']['section'] for entry in files.values() if entry['book']} == set(sections)
+
+
+def test_deleted_book_leaves_cache(books, tmp_path):
+    cache_path = tmp_path / 'cache.json'
+    progress.collect_progress(books, cache_path=cache_path)
+    (books / 'Two.md').unlink()
+    assert [b['title'] for b in progress.collect_progress(books, cache_path=cache_path)] == ['Один']
+    cache = json.loads(cache_path.read_text(encoding='utf-8'))
+    assert sorted(os.path.basename(path) for path in cache['files']) == ['Done.md', 'Note.md', 'One.md']
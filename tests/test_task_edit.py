@@ -0,0 +1,100 @@
+"""Write-back engine of plugins/day/scripts/task-edit.py."""
+
+import pytest
+
+from conftest import load_script
+
+task_edit = load_script('plugins/day/scripts/task-edit.py')
+parse_tasks = task_edit.parse_tasks
+
+
+def read_tasks(vault, rel):
+    return parse_tasks.parse_tasks_from_text((vault / rel).read_text(encoding='utf-8'), rel)
+
+
+def op_for(task, **changes):
+    return dict(id=task.id, file=task.file, line=task.line, hash=task.hash, **changes)
+
+
+@pytest.mark.parametrize('line, op, expected', [
+    ('- [ ] Write report', {'done': True, 'done_date': '2026-01-20'},
+     '- [x] Write report ✅ 2026-01-20'),
+    ('  -  [x] Write report ✅ 2026-01-20', {'done': False}, '  -  [ ] Write report'),
+    ('> -\t[ ] Quoted task\r', {'due': '2026-02-01'}, '> -\t[ ] Quoted task 📅 2026-02-01\r'),
+    ('- [ ] Call Bob #inbox 📅 2026-01-10', {'remove_tags': ['#inbox'], 'add_tags': ['#wait']},
+     '- [ ] Call Bob #wait 📅 2026-01-10'),
+    ('- [ ] Plan #project/alpha #work', {'remove_tags': ['#project']}, '- [ ] Plan #work'),
+    ('- [ ] Plan #projects', {'add_tags': ['#project']}, '- [ ] Plan #projects #project'),
+    ('- [ ] Plan #work 📅 2026-01-10', {'priority': '⏫'}, '- [ ] Plan ⏫ #work 📅 2026-01-10'),
+    ('- [x] Report ✅ 2026-01-05', {'done': True}, '- [x] Report ✅ 2026-01-05'),
+    ('- [x] Report ✅ 2026-01-05', {'done': True, 'done_date': '2026-01-06'}, '- [x] Report ✅ 2026-01-06'),
+])
+def test_apply_operation(line, op, expected):
+    assert task_edit.apply_operation(line, op) == expected
+
+
+@pytest.mark.parametrize('line, op', [
+    ('Just a note', {'done': True}),
+    ('- [ ] Task', {'priority': '!!'}),
+    ('- [ ] Task', {'add_tags': ['inbox']}),
+    ('- [ ] Task inbox #inbox', {'remove_tags': ['inbox']}),
+    ('- [ ] Task #inbox', {'remove_tags': ['']}),
+    ('- [ ] Task #inbox', {'remove_tags': '#inbox'}),
+    ('- [ ] Task', {'add_tags': [None]}),
+])
+def test_apply_operation_rejects(line, op):
+    with pytest.raises(task_edit.EditError):
+        task_edit.apply_operation(line, op)
+
+
+def test_every_parsed_task_is_editable(tmp_path):
+    # Lines parse-tasks.py reads as tasks must be lines task-edit.py can write
+    content = '- [ ] One #task\n-  [ ] Two #task\n-\t[x] Three #task\n> - [ ] Four #task\n'
+    (tmp_path / 'Note.md').write_text(content, encoding='utf-8')
+    tasks = read_tasks(tmp_path, 'Note.md')
+    assert len(tasks) == 4
+    result = task_edit.apply_batch(tmp_path, [op_for(t, add_tags=['#wait']) for t in tasks])
+    assert result['applied'] == 4 and not result['failed']
+    assert all('#wait' in t.tags for t in read_tasks(tmp_path, 'Note.md'))
+
+
+def test_edit_follows_shifted_lines(tmp_path):
+    path = tmp_path / 'Note.md'
+    path.write_text('- [ ] Pay rent #task #inbox\n', encoding='utf-8')
+    task, = read_tasks(tmp_path, 'Note.md')
+    path.write_text('# Header\n\n- [ ] Pay rent #task #inbox\n', encoding='utf-8')
+
+    result = task_edit.apply_batch(tmp_path, [op_for(task, remove_tags=['#inbox'])])
+    assert result['applied'] == 1
+    assert path.read_text(encoding='utf-8') == '# Header\n\n- [ ] Pay rent #task\n'
+
+
+def test_edit_rejects_changed_task(tmp_path):
+    path = tmp_path / 'Note.md'
+    path.write_text('- [ ] Pay rent #task #inbox\n', encoding='utf-8')
+    task, = read_tasks(tmp_path, 'Note.md')
+    path.write_text('- [ ] Pay rent #task #inbox 📅 2026-03-01\n', encoding='utf-8')  # edited meanwhile
+
+    result = task_edit.apply_batch(tmp_path, [op_for(task, due='2026-02-01')])
+    assert result['applied'] == 0
+    assert result['failed'][0]['error'] == 'task changed since it was read'
+    assert path.read_text(encoding='utf-8') == '- [ ] Pay rent #task #inbox 📅 2026-03-01\n'
+
+
+def test_one_write_for_many_edits(tmp_path):
+    path = tmp_path / 'Note.md'
+    path.write_text('- [ ] A #task\n- [ ] B #task\n', encoding='utf-8')
+    a, b = read_tasks(tmp_path, 'Note.md')
+    result = task_edit.apply_batch(tmp_path, [op_for(a, done=True, done_date='2026-01-20'),
+                                              op_for(b, priority='🔼')])
+    assert result == {'applied': 2, 'failed': [], 'files_written': ['Note.md'], 'dry_run': False}
+    assert path.read_text(encoding='utf-8') == '- [x] A #task ✅ 2026-01-20\n- [ ] B 🔼 #task\n'
+
+
+def test_invalid_operation_leaves_file_untouched(tmp_path):
+    path = tmp_path / 'Note.md'
+    path.write_text('- [ ] Sort inbox #task #inbox\n', encoding='utf-8')
+    task, = read_tasks(tmp_path, 'Note.md')
+    result = task_edit.apply_batch(tmp_path, [op_for(task, remove_tags=['inbox'])])
+    assert result['applied'] == 0 and result['files_written'] == []
+    assert path.read_text(encoding='utf-8') == '- [ ] Sort inbox #task #inbox\n'
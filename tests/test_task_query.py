@@ -0,0 +1,214 @@
+"""Query grammar, forecast and incremental index of plugins/day/scripts/parse-tasks.py."""
+
+import os
+from datetime import date
+
+import pytest
+
+from conftest import load_script
+
+parse_tasks = load_script('plugins/day/scripts/parse-tasks.py')
+
+TODAY = date(2026, 1, 15)  # a Thursday in ISO week 2026-W03
+NOTES = {
+    'Base/Work.md': (
+        '- [ ] A #task ⏫ 📅 2026-01-10\n'
+        '- [ ] B #task 🔼 📅 2026-01-15\n'
+        '- [ ] C #task #inbox 📅 2026-01-16\n'
+        '- [x] D #task 📅 2026-01-14 ✅ 2026-01-14\n'
+        '- [ ] E #task #work\n'
+    ),
+    'Dailies/2026-01-15.md': (
+        '- [ ] F #task 🔽 📅 2026-01-20\n'
+        '- [ ] G #task #Inbox 📅 2026-02-02\n'
+    ),
+}
+
+
+@pytest.fixture(scope='module')
+def index():
+    tasks = [task for rel, content in NOTES.items() for task in parse_tasks.parse_tasks_from_text(content, rel)]
+    return parse_tasks.TaskQueryIndex(tasks)
+
+
+def texts(tasks) -> list:
+    return [t.text for t in tasks]
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('', 'ABCDEFG'),
+    ('done', 'D'),
+    ('not done', 'ABCEFG'),
+    ('no due date', 'E'),
+    ('has due date', 'ABCDFG'),
+    ('due today', 'B'),
+    ('due tomorrow', 'C'),
+    ('due 2026-01-10', 'A'),
+    ('due on 2026-01-10', 'A'),
+    ('due before today', 'AD'),
+    ('due after 2026-01-16', 'FG'),
+    ('due on or before yesterday', 'AD'),
+    ('due on or after 2026-01-20', 'FG'),
+    ('due in next 5 days', 'BCF'),
+    ('due in next 1 day', 'BC'),
+    ('due between 2026-01-14 and tomorrow', 'BCD'),
+    ('path starts with dailies/', 'FG'),
+    ('path includes WORK', 'ABCDE'),
+    ('path does not include work', 'FG'),
+    ('tag includes #inbox', 'CG'),
+    ('tags do not include #inbox', 'ABDEF'),
+    ('tag includes #work', 'E'),
+    ('priority is high', 'A'),
+    ('priority is medium', 'B'),
+    ('priority is low', 'F'),
+    ('priority is none', 'CDEG'),
+    ('not done\ndue before today', 'A'),
+    ('not done\\nhas due date\\ntag includes #inbox', 'CG'),
+    ('  Not Done  \n\n  Due Today  ', 'B'),
+])
+def test_query_lines(index, query, expected):
+    assert ''.join(sorted(texts(index.query(query, TODAY)))) == expected
+
+
+def test_query_keeps_path_and_line_order(index):
+    assert texts(index.query('not done', TODAY)) == ['A', 'B', 'C', 'E', 'F', 'G']
+
+
+@pytest.mark.parametrize('query', [
+    'frobnicate',
+    'due someday',
+    'due before 2026-13-01',
+    'due between today and next week',
+    'priority is urgent',
+    'not done\ndue whenever',
+])
+def test_unknown_query_lines_raise(index, query):
+    with pytest.raises(parse_tasks.QueryError):
+        index.query(query, TODAY)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('1', ('2026-01-15', '2026-01-15')),
+    ('7', ('2026-01-15', '2026-01-21')),
+    ('today..2026-01-31', ('2026-01-15', '2026-01-31')),
+    ('tomorrow..tomorrow', ('2026-01-16', '2026-01-16')),
+    (' 2026-02-01..2026-02-07 ', ('2026-02-01', '2026-02-07')),
+])
+def test_forecast_window(text, expected):
+    assert parse_tasks.forecast_window(text, TODAY) == expected
+
+
+@pytest.mark.parametrize('text', ['0', 'next week', '2026-02-01..2026-01-01', 'soon..today', '2026-02-01'])
+def test_forecast_window_rejects(text):
+    with pytest.raises(parse_tasks.QueryError):
+        parse_tasks.forecast_window(text, TODAY)
+
+
+def test_forecast_periods_by_day():
+    assert parse_tasks.forecast_periods(date(2026, 1, 30), date(2026, 2, 1), 'day') == [
+        ('2026-01-30', date(2026, 1, 30), date(2026, 1, 30)),
+        ('2026-01-31', date(2026, 1, 31), date(2026, 1, 31)),
+        ('2026-02-01', date(2026, 2, 1), date(2026, 2, 1)),
+    ]
+
+
+def test_forecast_periods_by_iso_week_across_new_year():
+    # 2025-12-29..2026-01-04 is ISO week 1 of 2026; partial weeks are clipped to the window
+    assert parse_tasks.forecast_periods(date(2025, 12, 24), date(2026, 1, 7), 'week') == [
+        ('2025-W52', date(2025, 12, 24), date(2025, 12, 28)),
+        ('2026-W01', date(2025, 12, 29), date(2026, 1, 4)),
+        ('2026-W02', date(2026, 1, 5), date(2026, 1, 7)),
+    ]
+
+
+def period_texts(forecast) -> dict:
+    return {period['period']: texts(period['tasks']) for period in forecast['periods'] if period['tasks']}
+
+
+def test_forecast_carries_overdue_into_first_day(index):
+    forecast = index.forecast('2026-01-15', '2026-01-21', today='2026-01-15')
+    assert period_texts(forecast) == {'2026-01-15': ['A', 'B'], '2026-01-16': ['C'], '2026-01-20': ['F']}
+    assert forecast['carried'] == {'count': 1, 'load': 3.0}
+    assert forecast['total'] == {'count': 4, 'load': 6.5}  # ⏫ 3 + 🔼 2 + plain 1 + 🔽 0.5
+
+
+def test_forecast_later_window_drops_tasks_due_before_it(index):
+    # B and C are due before the window but not overdue yet: they are not carried
+    forecast = index.forecast('2026-01-18', '2026-01-24', today='2026-01-15')
+    assert period_texts(forecast) == {'2026-01-18': ['A'], '2026-01-20': ['F']}
+    assert forecast['carried']['count'] == 1
+    assert forecast['total']['count'] == 2
+
+
+def test_forecast_by_week_narrowed_to_query(index):
+    ids = index.select('tag includes #inbox', TODAY)
+    forecast = index.forecast('2026-01-15', '2026-02-08', 'week', ids, '2026-01-15')
+    assert [p['period'] for p in forecast['periods']] == ['2026-W03', '2026-W04', '2026-W05', '2026-W06']
+    assert period_texts(forecast) == {'2026-W03': ['C'], '2026-W06': ['G']}
+    assert forecast['carried']['count'] == 0
+
+
+def test_answer_request_forecast_applies_filter(index):
+    answer = parse_tasks.answer_request(index, {'filter': 'overdue', 'forecast': {'window': '7'},
+                                                'today': '2026-01-15'})
+    assert answer['date'] == '2026-01-15'
+    assert period_texts(answer) == {'2026-01-15': ['A']}
+    with pytest.raises(parse_tasks.QueryError):
+        parse_tasks.answer_request(index, {'forecast': {'window': '7', 'by': 'month'}, 'today': '2026-01-15'})
+
+
+def write(path, content: str, mtime_ns: int):
+    path.write_text(content, encoding='utf-8')
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_task_index_reparses_only_changed_files(tmp_path):
+    write(tmp_path / 'One.md', '- [ ] First #task\n', 1_000_000_000)
+    write(tmp_path / 'Two.md', '- [ ] Second #task\n', 1_000_000_000)
+    index = parse_tasks.TaskIndex(tmp_path)
+    try:
+        assert index.refresh() == 2
+        assert index.refresh() == 0
+
+        # Same size, new mtime
+        write(tmp_path / 'One.md', '- [x] First #task\n', 2_000_000_000)
+        assert index.refresh() == 1
+        assert [(t.text, t.done) for t in index.tasks()] == [('First', True), ('Second', False)]
+
+        # Same mtime, new size
+        write(tmp_path / 'Two.md', '- [ ] Second #task\n- [ ] Third #task\n', 1_000_000_000)
+        assert index.refresh() == 1
+        assert texts(index.tasks()) == ['First', 'Second', 'Third']
+
+        (tmp_path / 'One.md').unlink()
+        assert index.refresh() == 0
+        assert texts(index.tasks()) == ['Second', 'Third']
+    finally:
+        index.close()
+
+
+def test_snapshot_changes_follow_task_ids(tmp_path):
+    snapshot = tmp_path / '.claude' / 'snapshot.json'
+    write(tmp_path / 'Plan.md', '- [ ] Write #task 📅 2026-01-10\n- [ ] Send #task\n- [ ] Drop #task\n', 1_000_000_000)
+    write(tmp_path / 'Old.md', '- [ ] Archive #task\n', 1_000_000_000)
+    first = parse_tasks.snapshot_changes(tmp_path, snapshot)
+    assert first['since'] is None
+    assert not any(first[kind] for kind in parse_tasks.CHANGE_KINDS)
+
+    # A new line on top moves every task; ids stay, so only real edits are reported
+    write(tmp_path / 'Plan.md',
+          '- [ ] New #task\n- [ ] Write #task 📅 2026-01-12\n- [x] Send #task ✅ 2026-01-11\n',
+          2_000_000_000)
+    (tmp_path / 'Old.md').unlink()
+    changes = parse_tasks.snapshot_changes(tmp_path, snapshot)
+    assert changes['since'] == first['now']
+    assert changes['files_changed'] == 1
+    assert [t['text'] for t in changes['added']] == ['New']
+    assert [t['text'] for t in changes['completed']] == ['Send']
+    assert [(t['text'], t['previous_due'], t['due']) for t in changes['rescheduled']] == [
+        ('Write', '2026-01-10', '2026-01-12')]
+    assert sorted((t['text'], t['file']) for t in changes['deleted']) == [('Archive', 'Old.md'), ('Drop', 'Plan.md')]
+
+    again = parse_tasks.snapshot_changes(tmp_path, snapshot)
+    assert again['files_changed'] == 0
+    assert not any(again[kind] for kind in parse_tasks.CHANGE_KINDS)
@@ -0,0 +1,30 @@
+"""Settings validation of plugins/day/scripts/validate-settings.py."""
+
+import shutil
+
+from conftest import REPO_ROOT, load_script
+
+validate_settings = load_script('plugins/day/scripts/validate-settings.py')
+EXAMPLE = REPO_ROOT / 'plugins/day/settings/patterns.example.md'
+
+
+def write_settings(vault, content=None):
+    path = vault / validate_settings.SETTINGS_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if content is None:
+        shutil.copyfile(EXAMPLE, path)
+    else:
+        path.write_text(content, encoding='utf-8')
+
+
+def test_shipped_example_is_valid(tmp_path):
+    write_settings(tmp_path)
+    result = validate_settings.validate_settings(tmp_path)
+    assert result['valid'], result['sections_missing']
+
+
+def test_heading_must_start_with_section_name(tmp_path):
+    write_settings(tmp_path, '## Утренняя рутинная работа\n\n## Фиксированные регулярные события\n\n'
+                             '## Временные слоты\n')
+    result = validate_settings.validate_settings(tmp_path)
+    assert result['sections_missing'] == ['Утренняя рутина']
@@ -0,0 +1,21 @@
+"""The books plugin's copy of vaultcore matches the day plugin's."""
+
+import pytest
+
+from conftest import REPO_ROOT
+
+DAY = REPO_ROOT / 'plugins/day/scripts/vaultcore'
+BOOKS = REPO_ROOT / 'plugins/books/skills/extracting-book-toc/scripts/vaultcore'
+
+
+def test_books_copy_is_a_directory():
+    assert BOOKS.is_dir() and not BOOKS.is_symlink()  # symlinks across plugins break on install
+
+
+@pytest.mark.parametrize('name', sorted(path.name for path in DAY.glob('*.py')))
+def test_books_copy_matches(name):
+    assert (BOOKS / name).read_bytes() == (DAY / name).read_bytes()
+
+
+def test_no_extra_modules_in_books_copy():
+    assert sorted(p.name for p in BOOKS.glob('*.py')) == sorted(p.name for p in DAY.glob('*.py'))